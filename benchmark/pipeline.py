@@ -0,0 +1,301 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from preprocessing.data_parser import FileOpener
+from preprocessing.functions import DataPreprocessing
+from evaluation.split import Split
+from model.knn import KNNClassifier
+from metrics_results.metrics import MetricsCalculator
+from metrics_results.results import ResultSaver
+
+class PipelineBenchmark:
+    """
+    Misura tempi, throughput e picco di memoria di ogni fase della pipeline
+    (lettura → preprocessing → split → KNN → metriche → salvataggio) su dati sintetici.
+    """
+    # Formato del file sintetico -> (estensione, separatore)
+    FORMATS = {'csv': ('.csv', ','), 'tsv': ('.tsv', '\t'), 'txt': ('.txt', ';'), 'json': ('.json', None), 'xlsx': ('.xlsx', None)}
+    SPLIT_STRATEGIES = ('holdout', 'random_subsampling', 'bootstrap', 'k_fold', 'stratified_k_fold', 'stratified_holdout')
+    INDEX_COL = 'id'
+    TARGET_COLUMN = 'class'
+
+    def __init__(self, rows: int = 10000, features: int = 10, classes: int = 2, file_format: str = 'csv', k: int = 5,
+                 repeat: int = 3, missing: float = 0.05, seed: int = 0, algorithm: str = 'auto'):
+        """
+        Inizializza il benchmark con la dimensione del dataset sintetico.
+
+        Parametri:
+        ----------
+        rows : int, optional
+            Numero di campioni del dataset sintetico (default è 10000).
+        features : int, optional
+            Numero di colonne delle caratteristiche (default è 10).
+        classes : int, optional
+            Numero di classi del target (default è 2).
+        file_format : str, optional
+            Formato del file letto da FileOpener: 'csv', 'tsv', 'txt', 'json' o 'xlsx' (default è 'csv').
+        k : int, optional
+            Numero di vicini del KNN (default è 5).
+        repeat : int, optional
+            Numero di esecuzioni cronometrate di ogni fase (default è 3).
+        missing : float, optional
+            Frazione di valori mancanti inseriti nelle caratteristiche (default è 0.05).
+        seed : int, optional
+            Seme per la generazione dei dati e per gli split (default è 0).
+        algorithm : str, optional
+            Algoritmo di ricerca dei vicini del KNN (default è 'auto').
+        """
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Formato non valido: {file_format}. Le opzioni disponibili sono: {', '.join(self.FORMATS)}")
+        if rows < 2 * classes or features < 1 or classes < 2 or repeat < 1:
+            raise ValueError("Servono almeno due campioni per classe, una caratteristica, due classi e una ripetizione.")
+        if not 0 <= missing < 1:
+            raise ValueError("La frazione di valori mancanti deve essere compresa tra 0 e 1.")
+        self.rows = rows
+        self.features = features
+        self.classes = classes
+        self.file_format = file_format
+        self.k = k
+        self.repeat = repeat
+        self.missing = missing
+        self.seed = seed
+        self.algorithm = algorithm
+
+    def config(self) -> dict:
+        """
+        Restituisce la configurazione del benchmark, salvata insieme ai risultati.
+        """
+        return {'rows': self.rows, 'features': self.features, 'classes': self.classes, 'format': self.file_format,
+                'k': self.k, 'repeat': self.repeat, 'missing': self.missing, 'seed': self.seed, 'algorithm': self.algorithm}
+
+    def synthetic_dataset(self) -> pd.DataFrame:
+        """
+        Genera un dataset con una colonna indice, caratteristiche gaussiane centrate per classe
+        (così il KNN ha un compito realistico), valori mancanti e target testuale.
+
+        return:
+        --------
+        pd.DataFrame:
+            Dataset sintetico con le colonne 'id', 'feature_0', ..., 'class'.
+        """
+        rng = np.random.default_rng(self.seed)
+        labels = rng.integers(0, self.classes, self.rows)
+        centers = rng.normal(scale=2.0, size=(self.classes, self.features))
+        values = np.round(centers[labels] + rng.normal(size=(self.rows, self.features)), 4)
+        values[rng.random(values.shape) < self.missing] = np.nan
+        df = pd.DataFrame(values, columns=[f'feature_{i}' for i in range(self.features)])
+        df.insert(0, self.INDEX_COL, np.arange(self.rows))
+        df[self.TARGET_COLUMN] = np.array([f'class_{i}' for i in range(self.classes)])[labels]
+        return df
+
+    def write_dataset(self, df: pd.DataFrame, directory: str) -> str:
+        """
+        Scrive il dataset sintetico nel formato scelto e ne restituisce il percorso.
+        """
+        extension, separator = self.FORMATS[self.file_format]
+        file_path = os.path.join(directory, 'synthetic' + extension)
+        if self.file_format == 'json':
+            df.to_json(file_path, orient='records')
+        elif self.file_format == 'xlsx':
+            df.to_excel(file_path, index=False)
+        else:
+            df.to_csv(file_path, sep=separator, index=False)
+        return file_path
+
+    def measure(self, function, rows: int, setup=None) -> dict:
+        """
+        Cronometra una fase e ne misura il picco di memoria.
+
+        Le esecuzioni cronometrate avvengono senza tracemalloc, che rallenta le allocazioni;
+        il picco di memoria è misurato in un'esecuzione aggiuntiva. L'output su stdout
+        della fase (es. i messaggi di FileOpener) viene scartato.
+
+        Parametri:
+        ----------
+        function : callable
+            Fase da misurare; riceve gli argomenti restituiti da setup.
+        rows : int
+            Numero di righe elaborate da un'esecuzione, per il throughput.
+        setup : callable, optional
+            Prepara gli argomenti di ogni esecuzione (es. una copia dei dati) fuori dal tempo misurato.
+
+        return:
+        --------
+        dict:
+            Tempo minimo e mediano in secondi, righe, righe al secondo e picco di memoria in byte.
+        """
+        setup = setup or tuple
+        times = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(self.repeat):
+                args = setup()
+                start = time.perf_counter()
+                function(*args)
+                times.append(time.perf_counter() - start)
+            args = setup()
+            tracemalloc.start()
+            try:
+                function(*args)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        best = min(times)
+        return {'seconds': best, 'median_seconds': statistics.median(times), 'rows': rows,
+                'rows_per_second': rows / best if best > 0 else None, 'peak_memory_bytes': peak}
+
+    def run(self) -> dict:
+        """
+        Esegue il benchmark di tutte le fasi.
+
+        return:
+        --------
+        dict:
+            Configurazione, ambiente di esecuzione e risultati di ogni fase.
+        """
+        stages = {}
+        df = self.synthetic_dataset()
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = self.write_dataset(df, directory)
+            stages['open'] = self.measure(lambda: FileOpener().open(file_path), self.rows)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                raw = FileOpener().open(file_path)
+            stages['preprocessing'] = self.measure(
+                lambda preprocessor: preprocessor.preprocessing(self.INDEX_COL, self.TARGET_COLUMN, 'mean'),
+                self.rows, setup=lambda: (DataPreprocessing(raw.copy()),))
+            preprocessor = DataPreprocessing(raw.copy())
+            preprocessor.preprocessing(self.INDEX_COL, self.TARGET_COLUMN, 'mean')
+            X, Y = preprocessor.features_and_target(self.TARGET_COLUMN)
+
+            for strategy in self.SPLIT_STRATEGIES:
+                stages[f'split.{strategy}'] = self.measure(
+                    lambda splitter: getattr(splitter, strategy)(X, Y), len(X), setup=lambda: (Split(seed=self.seed),))
+
+            x_train, y_train, x_test, y_test = Split(seed=self.seed).holdout(X, Y)[0]
+            stages['knn'] = self.measure(lambda: KNNClassifier(self.k, algorithm=self.algorithm).knn(x_train, y_train, x_test), len(x_test))
+
+            # Predizioni di ogni fold, calcolate una volta: la fase delle metriche misura
+            # il calcolo delle metriche su tutti i fold
+            folds = []
+            for xtrain, ytrain, xtest, ytest in Split(seed=self.seed).k_fold(X, Y):
+                knn_classifier = KNNClassifier(self.k, algorithm=self.algorithm).fit(xtrain, ytrain)
+                ypred = knn_classifier.predict(xtest)
+                yscore = knn_classifier.positive_scores(knn_classifier.predict_proba(xtest))
+                confusion_matrix = KNNClassifier.calculate_confusion_matrix(ytest, ypred)
+                folds.append((confusion_matrix, ypred, np.asarray(ytest).ravel(), yscore))
+            stages['metrics'] = self.measure(
+                lambda calculators: [calculator.calculate_metrics([]) for calculator in calculators],
+                sum(len(fold[1]) for fold in folds),
+                setup=lambda: ([MetricsCalculator(*fold) for fold in folds],))
+            lista_metriche = [MetricsCalculator(*fold).calculate_metrics([]) for fold in folds]
+
+            user_choice = list(MetricsCalculator.METRICS)
+            mean_metrics = pd.DataFrame(lista_metriche).mean().to_dict()
+            plot_path = os.path.join(directory, 'metrics_trend.png')
+            excel_path = os.path.join(directory, 'metrics.xlsx')
+            stages['results'] = self.measure(
+                lambda: (ResultSaver.save_plot(lista_metriche, user_choice, lista_metriche, plot_path),
+                         ResultSaver.save_metrics_to_excel(lista_metriche, mean_metrics, excel_path)),
+                len(lista_metriche))
+            if not os.path.exists(plot_path):
+                raise RuntimeError("ResultSaver non ha salvato il grafico delle metriche.")
+        return {'config': self.config(), 'environment': self.environment(), 'stages': stages}
+
+    @staticmethod
+    def environment() -> dict:
+        """
+        Descrive l'ambiente di esecuzione, incluso il commit corrente se disponibile,
+        per confrontare risultati ottenuti su commit diversi.
+        """
+        try:
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                'platform': platform.platform(), 'commit': commit}
+
+    @staticmethod
+    def compare(results: dict, baseline: dict) -> pd.DataFrame:
+        """
+        Confronta i risultati con quelli di un'esecuzione precedente.
+
+        Parametri:
+        ----------
+        results : dict
+            Risultati correnti, come restituiti da run.
+        baseline : dict
+            Risultati di riferimento (es. letti dal JSON di un altro commit).
+
+        return:
+        --------
+        pd.DataFrame:
+            Per ogni fase comune, tempi e picchi di memoria e il rapporto corrente / riferimento
+            (valori maggiori di 1 indicano una regressione).
+        """
+        rows = []
+        for stage, current in results['stages'].items():
+            previous = baseline['stages'].get(stage)
+            if previous is None:
+                continue
+            rows.append({'stage': stage,
+                         'baseline_seconds': previous['seconds'], 'seconds': current['seconds'],
+                         'time_ratio': current['seconds'] / previous['seconds'] if previous['seconds'] else np.nan,
+                         'baseline_peak_bytes': previous['peak_memory_bytes'], 'peak_bytes': current['peak_memory_bytes'],
+                         'memory_ratio': current['peak_memory_bytes'] / previous['peak_memory_bytes'] if previous['peak_memory_bytes'] else np.nan})
+        return pd.DataFrame(rows).set_index('stage') if rows else pd.DataFrame()
+
+    @staticmethod
+    def summary(results: dict) -> pd.DataFrame:
+        """
+        Tabella leggibile dei risultati: una riga per fase.
+        """
+        table = pd.DataFrame(results['stages']).T
+        table['peak_memory_mib'] = table['peak_memory_bytes'] / 1024 ** 2
+        return table[['seconds', 'median_seconds', 'rows', 'rows_per_second', 'peak_memory_mib']]
+
+def main(argv=None):
+    """
+    Punto di ingresso: python -m benchmark.pipeline [opzioni].
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmark.pipeline',
+                                     description='Benchmark della pipeline lettura → preprocessing → split → KNN → metriche su dati sintetici.')
+    parser.add_argument('--rows', type=int, default=10000, help='numero di campioni (default 10000)')
+    parser.add_argument('--features', type=int, default=10, help='numero di caratteristiche (default 10)')
+    parser.add_argument('--classes', type=int, default=2, help='numero di classi (default 2)')
+    parser.add_argument('--format', dest='file_format', choices=sorted(PipelineBenchmark.FORMATS), default='csv', help='formato del file sintetico (default csv)')
+    parser.add_argument('--k', type=int, default=5, help='numero di vicini del KNN (default 5)')
+    parser.add_argument('--algorithm', default='auto', choices=['auto'] + list(KNNClassifier.ALGORITHMS), help='algoritmo di ricerca dei vicini (default auto)')
+    parser.add_argument('--repeat', type=int, default=3, help='esecuzioni cronometrate per fase (default 3)')
+    parser.add_argument('--missing', type=float, default=0.05, help='frazione di valori mancanti (default 0.05)')
+    parser.add_argument('--seed', type=int, default=0, help='seme di dati e split (default 0)')
+    parser.add_argument('--output', default='benchmark_results.json', help='file JSON dei risultati (default benchmark_results.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON di un\'esecuzione precedente da confrontare')
+    args = parser.parse_args(argv)
+
+    benchmark = PipelineBenchmark(rows=args.rows, features=args.features, classes=args.classes, file_format=args.file_format,
+                                  k=args.k, repeat=args.repeat, missing=args.missing, seed=args.seed, algorithm=args.algorithm)
+    results = benchmark.run()
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.4g}'.format):
+        print(PipelineBenchmark.summary(results))
+        if args.compare:
+            with open(args.compare) as file:
+                print(PipelineBenchmark.compare(results, json.load(file)))
+    print(f"Risultati salvati in {args.output}")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import pandas as pd
+import profiling
+from preprocessing.data_parser import FileOpener, DataFrameCache
+from preprocessing.functions import DataPreprocessing
+from evaluation.split import Split
+from model.knn import KNNClassifier
+from model.utility import classification_evaluation
+from metrics_results.metrics import MetricsCalculator
+
+try:
+    import yaml
+except ImportError:
+    # PyYAML è facoltativo: senza, i file di configurazione devono essere in JSON
+    yaml = None
+
+class ExperimentRunner:
+    """
+    Esegue in modo non interattivo una serie di esperimenti (split, valori di k, metriche)
+    riutilizzando i dataset già letti e preprocessati tra un esperimento e l'altro.
+    """
+    # Impostazioni di un esperimento e relativi valori di default
+    DEFAULTS = {
+        'name': None, 'file': None, 'target': None, 'index': None, 'fill': 'mean', 'compact': False,
+        'split': 'holdout', 'percentage': 0.25, 'iterations': 5, 'folds': 5,
+        'k': [5], 'metrics': 'all', 'algorithm': 'auto', 'n_jobs': 1, 'seed': None,
+    }
+    # Strategia di split -> (metodo di Split, True se riceve le etichette invece del numero di campioni)
+    SPLITS = {
+        'holdout': ('holdout_indices', False),
+        'random_subsampling': ('random_subsampling_indices', False),
+        'bootstrap': ('bootstrap_indices', False),
+        'k_fold': ('k_fold_indices', False),
+        'stratified_k_fold': ('stratified_k_fold_indices', True),
+        'stratified_holdout': ('stratified_holdout_indices', True),
+    }
+    FILL_METHODS = ('mean', 'median')
+    # Directory in cui cercare il file se il percorso indicato non esiste, come in main.py
+    DATA_DIRECTORY = 'data'
+
+    def __init__(self, output_dir: str = 'results', save_results: bool = True, cache: DataFrameCache = None):
+        """
+        Inizializza il runner.
+
+        Parametri:
+        ----------
+        output_dir : str, optional
+            Directory dei risultati: riepilogo JSON e, per ogni esperimento e valore di k,
+            grafico e file Excel delle metriche (default è 'results').
+        save_results : bool, optional
+            Se False non vengono salvati grafici e file Excel dei singoli esperimenti (default è True).
+        cache : DataFrameCache, optional
+            Cache su disco dei file letti, condivisa tra esecuzioni diverse.
+        """
+        self.output_dir = output_dir
+        self.save_results = save_results
+        self.file_opener = FileOpener(cache=cache)
+        # (file, target, indice, riempimento, compatto) -> (X, Y) preprocessati
+        self.datasets = {}
+
+    @classmethod
+    def experiment(cls, settings: dict, position: int = 1) -> dict:
+        """
+        Completa con i valori di default e valida le impostazioni di un esperimento.
+
+        Parametri:
+        ----------
+        settings : dict
+            Impostazioni dell'esperimento (chiavi di DEFAULTS).
+        position : int, optional
+            Posizione dell'esperimento nel batch, usata per il nome di default.
+
+        return:
+        --------
+        dict:
+            Impostazioni complete dell'esperimento.
+        """
+        unknown = set(settings) - set(cls.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Impostazioni non valide: {', '.join(sorted(unknown))}. Le opzioni disponibili sono: {', '.join(cls.DEFAULTS)}")
+        experiment = {**cls.DEFAULTS, **settings}
+        for key in ('file', 'target'):
+            if not experiment[key]:
+                raise ValueError(f"L'impostazione '{key}' è obbligatoria.")
+        if experiment['split'] not in cls.SPLITS:
+            raise ValueError(f"Split non valido: {experiment['split']}. Le opzioni disponibili sono: {', '.join(cls.SPLITS)}")
+        if experiment['fill'] not in cls.FILL_METHODS:
+            raise ValueError(f"Metodo di riempimento non valido: {experiment['fill']}. Le opzioni disponibili sono: {', '.join(cls.FILL_METHODS)}")
+        if not 0 < experiment['percentage'] < 1:
+            raise ValueError("La percentuale di test deve essere compresa tra 0 e 1 esclusi.")
+        k_values = experiment['k'] if isinstance(experiment['k'], (list, tuple)) else [experiment['k']]
+        if not k_values or any(not isinstance(k, int) or k < 1 for k in k_values):
+            raise ValueError("I valori di k devono essere interi positivi.")
+        experiment['k'] = list(k_values)
+        metrics = experiment['metrics']
+        if metrics == 'all':
+            metrics = list(MetricsCalculator.METRICS)
+        elif isinstance(metrics, str):
+            metrics = [metrics]
+        invalid_metrics = [metric for metric in metrics if metric not in MetricsCalculator.METRICS]
+        if invalid_metrics or not metrics:
+            raise ValueError(f"Metriche non valide: {', '.join(invalid_metrics)}. Le opzioni disponibili sono: {', '.join(MetricsCalculator.METRICS)}")
+        experiment['metrics'] = list(metrics)
+        if experiment['algorithm'] != 'auto' and experiment['algorithm'] not in KNNClassifier.ALGORITHMS:
+            raise ValueError(f"Algoritmo non valido: {experiment['algorithm']}. Le opzioni disponibili sono: auto, {', '.join(KNNClassifier.ALGORITHMS)}")
+        if experiment['name'] is None:
+            experiment['name'] = f"{position}_{experiment['split']}"
+        return experiment
+
+    def _file_path(self, file: str) -> str:
+        """
+        Restituisce il percorso del file, cercandolo nella directory dei dati se non esiste.
+        """
+        if not os.path.exists(file) and os.path.exists(os.path.join(self.DATA_DIRECTORY, file)):
+            return os.path.join(self.DATA_DIRECTORY, file)
+        return file
+
+    def dataset(self, experiment: dict) -> tuple:
+        """
+        Legge e preprocessa il dataset di un esperimento, oppure lo restituisce dalla memoria
+        se un esperimento precedente ha usato lo stesso file con lo stesso preprocessing.
+
+        return:
+        --------
+        tuple:
+            Features X e target Y.
+        """
+        key = (self._file_path(experiment['file']), experiment['target'], experiment['index'], experiment['fill'], experiment['compact'])
+        if key not in self.datasets:
+            df = self.file_opener.open(key[0])
+            if df is None:
+                raise ValueError(f"Impossibile leggere il file: {key[0]}")
+            preprocessor = DataPreprocessing(df)
+            preprocessor.preprocessing(experiment['index'], experiment['target'], experiment['fill'], compact=experiment['compact'])
+            self.datasets[key] = preprocessor.features_and_target(experiment['target'])
+        return self.datasets[key]
+
+    def index_splits(self, experiment: dict, X: pd.DataFrame, Y: pd.DataFrame):
+        """
+        Restituisce il generatore degli split di indici dell'esperimento.
+        """
+        splitter = Split(percentage=experiment['percentage'], iterations=experiment['iterations'],
+                         folds=experiment['folds'], seed=experiment['seed'])
+        method, by_labels = self.SPLITS[experiment['split']]
+        return getattr(splitter, method)(Y if by_labels else len(X))
+
+    def run_experiment(self, experiment: dict) -> list:
+        """
+        Esegue un esperimento per tutti i valori di k: per ogni split i vicini vengono cercati
+        una sola volta fino al k massimo e riusati per gli altri valori.
+
+        return:
+        --------
+        list:
+            Una riga per valore di k con nome, impostazioni principali e media delle metriche.
+        """
+        X, Y = self.dataset(experiment)
+        index_splits = self.index_splits(experiment, X, Y)
+        output_dir = os.path.join(self.output_dir, experiment['name']) if self.save_results else None
+        results = classification_evaluation.knn_metrics_multi_k_indices(
+            experiment['k'], X, Y, index_splits, experiment['metrics'], algorithm=experiment['algorithm'],
+            n_jobs=experiment['n_jobs'], output_dir=output_dir)
+        return [{'experiment': experiment['name'], 'file': experiment['file'], 'split': experiment['split'],
+                 'k': k, **{metric: float(value) for metric, value in mean_metrics.items()}}
+                for k, mean_metrics in results.items()]
+
+    def run(self, experiments: list) -> pd.DataFrame:
+        """
+        Esegue tutti gli esperimenti in ordine e salva il riepilogo in summary.json.
+
+        Parametri:
+        ----------
+        experiments : list of dict
+            Impostazioni degli esperimenti (vedi experiment).
+
+        return:
+        --------
+        pd.DataFrame:
+            Riepilogo con una riga per esperimento e valore di k.
+        """
+        experiments = [self.experiment(settings, position) for position, settings in enumerate(experiments, start=1)]
+        names = [experiment['name'] for experiment in experiments]
+        if len(set(names)) != len(names):
+            raise ValueError("I nomi degli esperimenti devono essere distinti.")
+        rows = [row for experiment in experiments for row in self.run_experiment(experiment)]
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, 'summary.json'), 'w') as file:
+            json.dump({'experiments': experiments, 'results': rows}, file, indent=2)
+        return pd.DataFrame(rows)
+
+def load_config(file_path: str) -> dict:
+    """
+    Legge un file di configurazione JSON o YAML (.yaml/.yml, richiede PyYAML).
+
+    Parametri:
+    ----------
+    file_path : str
+        Percorso del file di configurazione.
+
+    return:
+    --------
+    dict:
+        Configurazione letta dal file.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    with open(file_path) as file:
+        if ext in ['.yaml', '.yml']:
+            if yaml is None:
+                raise ValueError("Per i file di configurazione YAML è necessario installare PyYAML.")
+            config = yaml.safe_load(file)
+        else:
+            config = json.load(file)
+    if not isinstance(config, dict):
+        raise ValueError("Il file di configurazione deve contenere un oggetto con le impostazioni.")
+    return config
+
+def experiments_from_config(config: dict, overrides: dict = None) -> list:
+    """
+    Costruisce la lista degli esperimenti di una configurazione.
+
+    Le chiavi di primo livello diverse da 'experiments', 'output_dir', 'cache_dir' e 'defaults' (e quelle in
+    'defaults') valgono per tutti gli esperimenti; le impostazioni passate da riga di comando
+    le sostituiscono, mentre quelle di ogni esperimento hanno la precedenza su entrambe.
+    Senza 'experiments' la configurazione descrive un solo esperimento.
+
+    Parametri:
+    ----------
+    config : dict
+        Configurazione letta con load_config.
+    overrides : dict, optional
+        Impostazioni indicate da riga di comando.
+
+    return:
+    --------
+    list:
+        Impostazioni di ogni esperimento.
+    """
+    shared = {key: value for key, value in config.items() if key not in ('experiments', 'output_dir', 'cache_dir', 'defaults')}
+    shared = {**shared, **config.get('defaults', {}), **(overrides or {})}
+    experiments = config.get('experiments') or [{}]
+    if not isinstance(experiments, list) or not all(isinstance(experiment, dict) for experiment in experiments):
+        raise ValueError("'experiments' deve essere una lista di impostazioni.")
+    return [{**shared, **experiment} for experiment in experiments]
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Crea il parser degli argomenti da riga di comando. Le opzioni non indicate restano
+    assenti dal risultato, così non sostituiscono i valori del file di configurazione.
+    """
+    parser = argparse.ArgumentParser(prog='python main.py', argument_default=argparse.SUPPRESS,
+                                     description="Classificazione KNN non interattiva: un esperimento da riga di comando o un batch da file di configurazione.")
+    parser.add_argument('--config', help='file JSON o YAML con uno o più esperimenti')
+    parser.add_argument('--file', help='file del dataset (cercato anche nella directory data)')
+    parser.add_argument('--target', help='nome della colonna target')
+    parser.add_argument('--index', help='nome della colonna da impostare come indice')
+    parser.add_argument('--fill', choices=ExperimentRunner.FILL_METHODS, help='riempimento dei valori mancanti (default mean)')
+    parser.add_argument('--compact', action='store_true', help='features float32 e target intero compatto')
+    parser.add_argument('--split', choices=list(ExperimentRunner.SPLITS), help='strategia di split (default holdout)')
+    parser.add_argument('--percentage', type=float, help='percentuale di dati di test (default 0.25)')
+    parser.add_argument('--iterations', type=int, help='iterazioni di random subsampling e bootstrap (default 5)')
+    parser.add_argument('--folds', type=int, help='numero di fold (default 5)')
+    parser.add_argument('--k', type=int, nargs='+', help='uno o più valori di k (default 5)')
+    parser.add_argument('--metrics', nargs='+', help="metriche da calcolare, oppure 'all' (default)")
+    parser.add_argument('--algorithm', choices=['auto'] + list(KNNClassifier.ALGORITHMS), help='algoritmo di ricerca dei vicini (default auto)')
+    parser.add_argument('--n-jobs', dest='n_jobs', type=int, help='processi per valutare gli split (default 1, -1 per tutte le CPU)')
+    parser.add_argument('--seed', type=int, help='seme degli split')
+    parser.add_argument('--output-dir', dest='output_dir', help='directory dei risultati (default results)')
+    parser.add_argument('--no-save', dest='save_results', action='store_false', help='non salvare grafici e file Excel dei singoli esperimenti')
+    parser.add_argument('--cache-dir', dest='cache_dir', help='directory della cache dei file letti (default OUTPUT_DIR/.cache)')
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false', help='non usare la cache su disco dei file letti')
+    parser.add_argument('--profile', metavar='TRACE', help='profila l\'esecuzione e salva la traccia JSON in TRACE')
+    return parser
+
+def main(argv=None) -> pd.DataFrame:
+    """
+    Punto di ingresso della riga di comando.
+    """
+    args = vars(build_parser().parse_args(argv))
+    config_path = args.pop('config', None)
+    trace_path = args.pop('profile', None)
+    save_results = args.pop('save_results', True)
+    config = load_config(config_path) if config_path else {}
+    output_dir = args.pop('output_dir', None) or config.get('output_dir', 'results')
+    cache_dir = args.pop('cache_dir', None) or config.get('cache_dir') or os.path.join(output_dir, '.cache')
+    cache = DataFrameCache(cache_dir) if args.pop('use_cache', True) else None
+    if args.get('metrics') == ['all']:
+        args['metrics'] = 'all'
+    experiments = experiments_from_config(config, args)
+
+    runner = ExperimentRunner(output_dir=output_dir, save_results=save_results, cache=cache)
+    with profiling.profile() if trace_path else contextlib.nullcontext() as profiler:
+        summary = runner.run(experiments)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(summary)
+        if profiler is not None:
+            print(profiler.summary())
+            profiler.save_trace(trace_path)
+    print(f"Risultati salvati in {os.path.join(output_dir, 'summary.json')}")
+    return summary
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
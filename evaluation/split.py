@@ -1,14 +1,69 @@
 import numpy as np
+from profiling import timed
 
 class Split:
-    def __init__(self, percentage=0.25, iterations=5):
+    def __init__(self, percentage=0.25, iterations=5, folds=5, seed=None):
         """
         percentage : Proporzione del dataset da utilizzare come test set (per holdout e random subsampling)
         iterations: Numero di iterazioni per random subsampling e bootstrap
+        folds: Numero di fold per k-fold e stratified k-fold
+        seed: Seme per la riproducibilità. Se specificato, ogni iterazione usa un numpy.random.Generator
+              con un seme figlio indipendente (SeedSequence.spawn) e ogni chiamata di un metodo
+              restituisce gli stessi split; altrimenti holdout, random subsampling e bootstrap usano
+              lo stato globale di np.random
         """
         self.percentage = percentage
         self.iterations = iterations
+        self.folds = folds
+        self.seed = seed
 
+    def _generators(self, n):
+        """
+        Crea n generatori indipendenti a partire da semi figli del seme dello splitter.
+        I figli sono generati da una nuova SeedSequence a ogni chiamata, così con un seme
+        ogni metodo produce sempre gli stessi split.
+        ---Parametri---
+        n: Numero di generatori
+        return: Lista di numpy.random.Generator
+        """
+        return [np.random.default_rng(child) for child in np.random.SeedSequence(self.seed).spawn(n)]
+
+    def _random_state(self, n):
+        """
+        Restituisce le sorgenti casuali delle n iterazioni: generatori con semi figli se lo
+        splitter ha un seme, altrimenti lo stato globale di np.random.
+        """
+        if self.seed is None:
+            return [np.random] * n
+        return self._generators(n)
+
+    @staticmethod
+    def _take(X, Y, index_splits) -> list:
+        """
+        Materializza gli split di indici in tuple di DataFrame.
+        ---Parametri---
+        X: Dataset delle caratteristiche
+        Y: Etichette
+        index_splits: Coppie (train_indices, test_indices)
+        return: Lista di tuple (x_train, y_train, x_test, y_test)
+        """
+        return [(X.iloc[train], Y.iloc[train], X.iloc[test], Y.iloc[test]) for train, test in index_splits]
+
+    @timed(rows='samples')
+    def holdout_indices(self, samples):
+        """
+        Genera gli indici di training e test per holdout, senza copiare i dati.
+        ---Parametri---
+        samples: Numero di campioni del dataset
+        return: Generatore di una tupla (train_indices, test_indices)
+        """
+        percentage = int(self.percentage * samples)  # Numero di campioni da dedicare al test set
+        indices = np.arange(samples)  # Indice le righe da 0 a samples-1
+        self._random_state(1)[0].shuffle(indices)  # Mescola casualmente l'array di indici
+
+        yield indices[:-percentage], indices[-percentage:]
+
+    @timed(rows='X')
     def holdout(self, X, Y) -> list:
         """
         Il metodo esegue holdout per creare split di training e test.
@@ -18,22 +73,32 @@ class Split:
         return: Lista di una tupla (x_train, y_train, x_test, y_test)
         """
         splits = []
-        samples = len(X)
-        percentage = int(self.percentage * samples)  # Numero di campioni da dedicare al test set
-        indices = np.arange(samples)  # Indice le righe da 0 a samples-1
-        np.random.shuffle(indices)  # Mescola casualmente l'array di indici
+        for train_indices, test_indices in self.holdout_indices(len(X)):
+            X_train = X.iloc[train_indices, :]
+            X_test = X.iloc[test_indices, :]
+            Y_train = Y.iloc[train_indices, :]
+            Y_test = Y.iloc[test_indices, :]
 
-        train_indices = indices[:-percentage]
-        test_indices = indices[-percentage:]
+            splits.append((X_train, Y_train, X_test, Y_test))
+        return splits
 
-        X_train = X.iloc[train_indices, :]
-        X_test = X.iloc[test_indices, :]
-        Y_train = Y.iloc[train_indices, :]
-        Y_test = Y.iloc[test_indices, :]
+    @timed(rows='samples')
+    def random_subsampling_indices(self, samples):
+        """
+        Genera gli indici di training e test del random subsampling, un'iterazione alla volta.
+        ---Parametri---
+        samples: Numero di campioni del dataset
+        return: Generatore di tuple (train_indices, test_indices) per ogni iterazione.
+        """
+        percentage  = int(self.percentage * samples) #numero di campioni da dedicare al test set
 
-        splits.append((X_train, Y_train, X_test, Y_test))
-        return splits
+        for rng in self._random_state(self.iterations):
+            indices = np.arange(samples)
+            rng.shuffle(indices)
 
+            yield indices[:-percentage], indices[-percentage:]
+
+    @timed(rows='X')
     def random_subsampling(self, X, Y) -> list:
         """
         Il metodo esegue random subsampling per n iterazioni.
@@ -42,17 +107,9 @@ class Split:
         Y: Etichette
         return: Lista di tuple (x_train, y_train, x_test, y_test) per ogni iterazione.
         """
-        samples = len(X)
-        percentage  = int(self.percentage * samples) #numero di campioni da dedicare al test set
         splits = []
 
-        for i in range(self.iterations):
-            indices = np.arange(samples)
-            np.random.shuffle(indices)
-
-            train_indices = indices[:-percentage]
-            test_indices = indices[-percentage:]
-
+        for train_indices, test_indices in self.random_subsampling_indices(len(X)):
             X_train = X.iloc[train_indices]
             Y_train = Y.iloc[train_indices]
             X_test = X.iloc[test_indices]
@@ -61,6 +118,23 @@ class Split:
             splits.append((X_train, Y_train, X_test, Y_test))
         return splits
 
+    @timed(rows='campioni')
+    def bootstrap_indices(self, campioni):
+        """
+        Genera gli indici di training e test del bootstrap, un'iterazione alla volta.
+        :param campioni: Numero di campioni del dataset.
+        :return: Generatore di tuple (train_indices, test_indices) per ogni iterazione.
+        """
+        n_train = int(campioni * self.percentage)
+
+        for rng in self._random_state(self.iterations):
+            # Campionamento con ripetizione per ottenere il training set
+            indici_train = rng.choice(campioni, size=n_train, replace=True)
+            indici_test = np.setdiff1d(np.arange(campioni), indici_train)  # Elementi non selezionati per il test set
+
+            yield indici_train, indici_test
+
+    @timed(rows='X')
     def bootstrap(self, X, Y) -> list:
         """
         Esegue il bootstrap per creare split di training e test.
@@ -68,19 +142,176 @@ class Split:
         :param Y:  Etichette.
         :return: Lista di tuple (x_train, y_train, x_test, y_test) per ogni iterazione.
         """
-        n_train = int(len(X) * self.percentage)
-        campioni = len(X)
         splits = []
 
-        for i in range(self.iterations):
-            # Campionamento con ripetizione per ottenere il training set
-            indici_train = np.random.choice(campioni, size=n_train, replace=True)
-            indici_test = np.setdiff1d(np.arange(campioni), indici_train)  # Elementi non selezionati per il test set
-
+        for indici_train, indici_test in self.bootstrap_indices(len(X)):
             X_train = X.iloc[indici_train]
             Y_train = Y.iloc[indici_train]
             X_test = X.iloc[indici_test]
             Y_test = Y.iloc[indici_test]
 
             splits.append((X_train, Y_train, X_test, Y_test))
-        return splits
\ No newline at end of file
+        return splits
+
+    def _bootstrap_draws(self, campioni):
+        """
+        Estrae con ripetizione gli indici di training di tutte le iterazioni in un'unica matrice.
+        Le estrazioni coincidono con quelle di bootstrap_indices a parità di stato casuale.
+        :param campioni: Numero di campioni del dataset.
+        :return: Matrice (iterations × n_train) degli indici di training.
+        """
+        n_train = int(campioni * self.percentage)
+        if self.seed is None:
+            return np.random.choice(campioni, size=(self.iterations, n_train), replace=True)
+        draws = np.empty((self.iterations, n_train), dtype=np.intp)
+        for row, rng in zip(draws, self._generators(self.iterations)):
+            row[...] = rng.choice(campioni, size=n_train, replace=True)
+        return draws
+
+    @staticmethod
+    def _draw_counts(draws, campioni):
+        """
+        Conta quante volte ogni campione è stato estratto in ogni iterazione con un solo bincount.
+        :param draws: Matrice (iterations × n_train) degli indici estratti.
+        :param campioni: Numero di campioni del dataset.
+        :return: Matrice (iterations × campioni) delle molteplicità.
+        """
+        offsets = np.arange(len(draws))[:, None] * campioni
+        counts = np.bincount((draws + offsets).ravel(), minlength=len(draws) * campioni)
+        return counts.reshape(len(draws), campioni)
+
+    @timed(rows='campioni')
+    def bootstrap_batch_indices(self, campioni):
+        """
+        Esegue tutte le iterazioni del bootstrap in un'unica passata vettoriale.
+        :param campioni: Numero di campioni del dataset.
+        :return: Tupla (train_indices, oob_masks): matrice (iterations × n_train) degli indici di
+                 training e matrice booleana (iterations × campioni) dei campioni out-of-bag (test set).
+        """
+        draws = self._bootstrap_draws(campioni)
+        return draws, self._draw_counts(draws, campioni) == 0
+
+    @timed(rows='campioni')
+    def bootstrap_counts(self, campioni):
+        """
+        Esegue il bootstrap restituendo, per ogni iterazione, la molteplicità di ogni campione
+        nel training set; i campioni con molteplicità 0 formano il test set.
+        :param campioni: Numero di campioni del dataset.
+        :return: Matrice (iterations × campioni) delle molteplicità.
+        """
+        return self._draw_counts(self._bootstrap_draws(campioni), campioni)
+
+    @timed(rows='campioni')
+    def weighted_bootstrap_indices(self, campioni):
+        """
+        Genera split di bootstrap pesati: ogni campione estratto compare una sola volta nel
+        training set insieme al numero di volte in cui è stato estratto, così il KNN può usare
+        le molteplicità senza duplicare le righe.
+        :param campioni: Numero di campioni del dataset.
+        :return: Generatore di tuple (train_indices, test_indices, train_weights) per ogni iterazione.
+        """
+        for counts in self.bootstrap_counts(campioni):
+            train = np.flatnonzero(counts)
+            yield train, np.flatnonzero(counts == 0), counts[train]
+
+    def _check_folds(self, samples):
+        """
+        Verifica che il numero di fold sia valido per il numero di campioni.
+        """
+        if not isinstance(self.folds, int) or self.folds < 2:
+            raise ValueError("Il numero di fold deve essere un intero maggiore o uguale a 2.")
+        if self.folds > samples:
+            raise ValueError("Il numero di fold non può superare il numero di campioni.")
+
+    @timed(rows='samples')
+    def k_fold_indices(self, samples):
+        """
+        Genera gli indici di training e test del k-fold cross-validation: una sola permutazione
+        casuale viene divisa in self.folds parti e ogni parte è usata una volta come test set.
+        ---Parametri---
+        samples: Numero di campioni del dataset
+        return: Generatore di tuple (train_indices, test_indices) per ogni fold.
+        """
+        self._check_folds(samples)
+        order = self._generators(1)[0].permutation(samples)
+
+        # Il fold f contiene le posizioni f, f + folds, f + 2*folds, ... della permutazione
+        for f in range(self.folds):
+            yield np.delete(order, np.s_[f::self.folds]), order[f::self.folds]
+
+    @timed(rows='X')
+    def k_fold(self, X, Y) -> list:
+        """
+        Il metodo esegue il k-fold cross-validation.
+        ---Parametri---
+        X: Dataset delle caratteristiche
+        Y: Etichette
+        return: Lista di tuple (x_train, y_train, x_test, y_test) per ogni fold.
+        """
+        return self._take(X, Y, self.k_fold_indices(len(X)))
+
+    def _stratified_order(self, labels):
+        """
+        Restituisce una permutazione degli indici ordinata per classe e casuale all'interno
+        di ogni classe, insieme ai codici delle classi nello stesso ordine.
+        """
+        _, codes = np.unique(np.asarray(labels).ravel(), return_inverse=True)
+        keys = self._generators(1)[0].random(len(codes))
+        order = np.lexsort((keys, codes))
+        return order, codes[order]
+
+    @timed(rows='labels')
+    def stratified_k_fold_indices(self, labels):
+        """
+        Genera gli indici del k-fold stratificato: ogni fold mantiene le proporzioni delle classi.
+        ---Parametri---
+        labels: Etichette del dataset
+        return: Generatore di tuple (train_indices, test_indices) per ogni fold.
+        """
+        self._check_folds(len(labels))
+        order, _ = self._stratified_order(labels)
+
+        # Le classi sono contigue nella permutazione: assegnando i fold a rotazione
+        # ogni classe viene distribuita uniformemente tra i fold
+        for f in range(self.folds):
+            yield np.delete(order, np.s_[f::self.folds]), order[f::self.folds]
+
+    @timed(rows='X')
+    def stratified_k_fold(self, X, Y) -> list:
+        """
+        Il metodo esegue il k-fold cross-validation stratificato rispetto alle etichette Y.
+        ---Parametri---
+        X: Dataset delle caratteristiche
+        Y: Etichette
+        return: Lista di tuple (x_train, y_train, x_test, y_test) per ogni fold.
+        """
+        return self._take(X, Y, self.stratified_k_fold_indices(Y))
+
+    @timed(rows='labels')
+    def stratified_holdout_indices(self, labels):
+        """
+        Genera gli indici di un holdout stratificato: per ogni classe viene destinata al test set
+        la stessa percentuale di campioni.
+        ---Parametri---
+        labels: Etichette del dataset
+        return: Generatore di una tupla (train_indices, test_indices)
+        """
+        order, codes = self._stratified_order(labels)
+        counts = np.bincount(codes)
+        class_start = np.cumsum(counts) - counts
+        # Posizione di ogni campione all'interno della propria classe
+        rank = np.arange(len(order)) - class_start[codes]
+        is_test = rank < (self.percentage * counts).astype(int)[codes]
+
+        yield order[~is_test], order[is_test]
+
+    @timed(rows='X')
+    def stratified_holdout(self, X, Y) -> list:
+        """
+        Il metodo esegue holdout stratificato rispetto alle etichette Y.
+        ---Parametri---
+        X: Dataset delle caratteristiche
+        Y: Etichette
+        return: Lista di una tupla (x_train, y_train, x_test, y_test)
+        """
+        return self._take(X, Y, self.stratified_holdout_indices(Y))
@@ -1,4 +1,5 @@
 from evaluation.split import Split
+from metrics_results.metrics import MetricsCalculator
 import pandas as pd
 
 class InputManager:
@@ -6,7 +7,7 @@ class InputManager:
     Classe per gestire le interazioni con l'utente e raccogliere le sue scelte.
     """
     @staticmethod
-    def get_user_choice_split(X: pd.DataFrame, Y: pd.DataFrame) -> list:
+    def get_user_choice_split(X: pd.DataFrame, Y: pd.DataFrame, as_indices: bool = False) -> list:
         """
         Chiede all'utente di scegliere il tipo di split da utilizzare.
 
@@ -16,16 +17,23 @@ class InputManager:
             DataFrame delle caratteristiche.
         Y : pd.DataFrame
             DataFrame delle etichette.
+        as_indices : bool, optional
+            Se True restituisce un generatore di coppie (train_indices, test_indices)
+            invece delle copie dei DataFrame (default è False).
 
         return:
         --------
         list:
-            Lista di tuple (X_train, Y_train, X_test, Y_test) in base alla scelta dell'utente.
+            Lista di tuple (X_train, Y_train, X_test, Y_test) in base alla scelta dell'utente,
+            oppure generatore di tuple (train_indices, test_indices) se as_indices è True.
         """
         print("Scegli tipologia di split del dataset vuoi utilizzare")
         print("1. Holdout")
         print("2. Random subsampling")
         print("3. Bootstrap")
+        print("4. K-fold cross-validation")
+        print("5. Stratified k-fold cross-validation")
+        print("6. Stratified holdout")
         choice = input("Inserisci il numero della tua scelta: ")
 
         # Input per la percentuale di dati nel set di test
@@ -37,6 +45,8 @@ class InputManager:
         # Gestione della scelta dell'utente
         if choice == "1":
             splitter = Split(percentage=p)
+            if as_indices:
+                return splitter.holdout_indices(len(X))
             splits = splitter.holdout(X, Y)
             return splits
         if choice == "2":
@@ -48,6 +58,8 @@ class InputManager:
                 print("Valore non valido per il numero di iterazioni: il valore deve essere un numero intero positivo. Utilizzato il valore di default 5.")
                 n = 5
             splitter = Split(percentage=p, iterations=n)
+            if as_indices:
+                return splitter.random_subsampling_indices(len(X))
             splits = splitter.random_subsampling(X, Y)
             return splits
         if choice == "3":
@@ -59,12 +71,31 @@ class InputManager:
                 print("Valore non valido per il numero di iterazioni: il valore deve essere un numero intero positivo. Utilizzato il valore di default 5.")
                 n = 5
             splitter = Split(percentage=p, iterations=n)
+            if as_indices:
+                return splitter.bootstrap_indices(len(X))
             splits = splitter.bootstrap(X, Y)
             return splits
+        if choice in ("4", "5"):
+            n = int(input("Inserisci un numero intero a partire da 2 per il numero di fold: "))
+            try:
+                if n < 2 or n > len(X):
+                    raise ValueError
+            except ValueError:
+                print("Valore non valido per il numero di fold. Utilizzato il valore di default 5.")
+                n = 5
+            splitter = Split(percentage=p, folds=n)
+            if choice == "4":
+                return splitter.k_fold_indices(len(X)) if as_indices else splitter.k_fold(X, Y)
+            return splitter.stratified_k_fold_indices(Y) if as_indices else splitter.stratified_k_fold(X, Y)
+        if choice == "6":
+            splitter = Split(percentage=p)
+            return splitter.stratified_holdout_indices(Y) if as_indices else splitter.stratified_holdout(X, Y)
         else:
             splitter = Split(percentage=p)
-            splits = splitter.holdout(X, Y)
             print("Scelta non valida. Eseguito holdout")
+            if as_indices:
+                return splitter.holdout_indices(len(X))
+            splits = splitter.holdout(X, Y)
             return splits
 
     @staticmethod
@@ -132,7 +163,7 @@ class InputManager:
             Lista delle metriche da calcolare.
         """
         if user_choice == "all":
-            user_choice = ['Accuracy Rate','Error Rate','Sensitivity','Specificity','False Alarm Rate','Miss Rate','Geometric Mean','Area Under the Curve']
+            user_choice = list(MetricsCalculator.METRICS)
         elif user_choice:
             user_choice = user_choice
         return user_choice
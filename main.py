@@ -1,10 +1,17 @@
-from preprocessing.data_parser import FileOpener
+from preprocessing.data_parser import FileOpener, DataFrameCache
 from preprocessing.functions import DataPreprocessing
 from model.utility import classification_evaluation
 from input_managing import InputManager
+import cli
 import os
+import sys
 
 if __name__ == "__main__":
+    # Con argomenti da riga di comando l'esecuzione non è interattiva (vedi cli.py)
+    if len(sys.argv) > 1:
+        cli.main(sys.argv[1:])
+        sys.exit()
+
     file = input('Inserisci il nome del file con estensione: ')
     target_column = input('Inserisci il nome della colonna target: ')
     index_col = input('Inserisci il nome della colonna da impostare come indice (se presente): ')
@@ -13,7 +20,10 @@ if __name__ == "__main__":
     csv_directory = "data"
     file_path = os.path.join(csv_directory, file)
 
-    file_opener = FileOpener()
+    # I file già letti vengono serviti dalla cache finché non vengono modificati; come per cli.py
+    # la cache si trova in results/.cache, qui nella directory del progetto e non in quella corrente
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', '.cache')
+    file_opener = FileOpener(cache=DataFrameCache(cache_dir))
     df = file_opener.open(file_path)
 
     preprocessor = DataPreprocessing(df)
@@ -21,10 +31,11 @@ if __name__ == "__main__":
 
     X, Y = preprocessor.features_and_target(target_column)
     
-    splits = InputManager.get_user_choice_split(X, Y)
+    # Gli split sono generati come indici e valutati su un'unica matrice delle caratteristiche
+    splits = InputManager.get_user_choice_split(X, Y, as_indices=True)
 
     k = int(input("Enter the value of k: "))
     
     user_choice = InputManager.get_user_choice()
     user_choice = InputManager.process_user_choice(user_choice)
-    res = classification_evaluation.knn_metrics(k, splits, user_choice)
\ No newline at end of file
+    res = classification_evaluation.knn_metrics_indices(k, X, Y, splits, user_choice)
\ No newline at end of file
@@ -1,4 +1,21 @@
+from functools import wraps
+import warnings
 import numpy as np
+import pandas as pd
+from profiling import timed
+
+def memoized(method):
+    """
+    Decoratore che memorizza per istanza il risultato di un metodo senza argomenti,
+    così le quantità condivise tra più metriche vengono calcolate una sola volta.
+    """
+    @wraps(method)
+    def wrapper(self):
+        cache = self.__dict__.setdefault('_cache', {})
+        if method.__name__ not in cache:
+            cache[method.__name__] = method(self)
+        return cache[method.__name__]
+    return wrapper
 
 class MetricsCalculator:
     """
@@ -12,32 +29,74 @@ class MetricsCalculator:
         Array contenente le predizioni del modello.
     ytest : array
         Array contenente i valori reali del set di test.
+    yscore : array
+        Array dei punteggi della classe positiva (es. probabilità del KNN), usato per la curva ROC.
     """
+    # Classe considerata positiva quando la matrice di confusione è passata in forma quadrata:
+    # il codice 0 mantiene l'ordine [TP, TN, FP, FN] usato finora dalla pipeline
+    POSITIVE_CLASS = 0
+    # Registro delle metriche disponibili: nome -> funzione che riceve il calcolatore
+    METRICS = {}
 
-    def __init__(self, confusion_matrix, ypred, ytest):
+    def __init__(self, confusion_matrix, ypred, ytest, yscore=None):
         """
         Inizializza un'istanza di MetricsCalculator con i dati di confusione, le predizioni e i valori di test.
 
         Parametri
         ----------
-        confusion_matrix : list
-            Lista contenente i valori della matrice di confusione [TP, TN, FP, FN].
+        confusion_matrix : list or np.ndarray
+            Lista contenente i valori della matrice di confusione [TP, TN, FP, FN], oppure
+            matrice quadrata (n_classes × n_classes) come quella di KNNClassifier.calculate_confusion_matrix.
         ypred : array
             Array contenente le predizioni del modello.
         ytest : array
             Array contenente i valori reali del set di test.
+        yscore : array, optional
+            Array dei punteggi della classe positiva (etichetta 1). Se None la curva ROC
+            viene calcolata sulle predizioni ypred.
 
         """
+        if np.ndim(confusion_matrix) == 2:
+            confusion_matrix = self.binary_counts(confusion_matrix, self.POSITIVE_CLASS)
         self.confusion_matrix = confusion_matrix
         self.tp, self.tn, self.fp, self.fn = confusion_matrix
         self.ypred = ypred
         self.ytest = ytest
+        self.yscore = yscore
         for i in [self.tp, self.tn, self.fp, self.fn]:
             if i < 0:
                 raise ValueError("I valori della matrice di confusione non possono essere negativi.")
-        if self.tp and self.tn and self.fp and self.fn == 0:
-            raise ValueError("La matrice di confusione non può contenere solo zeri.")
 
+    @staticmethod
+    def binary_counts(confusion_matrix, positive: int = 0) -> list:
+        """
+        Riduce una matrice di confusione quadrata ai valori [TP, TN, FP, FN] della classe
+        positiva contro tutte le altre (one-vs-rest).
+
+        Parametri
+        ----------
+        confusion_matrix : np.ndarray
+            Matrice (n_classes × n_classes) con le classi vere sulle righe e quelle predette sulle colonne.
+        positive : int, optional
+            Codice della classe positiva (default è 0).
+
+        Return
+        -------
+        list
+            Lista [TP, TN, FP, FN].
+        """
+        matrix = np.asarray(confusion_matrix)
+        if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+            raise ValueError("La matrice di confusione deve essere quadrata.")
+        if not 0 <= positive < len(matrix):
+            raise ValueError(f"La classe positiva {positive} non è presente nella matrice di confusione.")
+        tp = matrix[positive, positive]
+        fn = matrix[positive].sum() - tp
+        fp = matrix[:, positive].sum() - tp
+        tn = matrix.sum() - tp - fn - fp
+        return [int(tp), int(tn), int(fp), int(fn)]
+
+    @memoized
     def accuracy_rate(self) -> float:
         """
         Calcola il tasso di accuratezza.
@@ -49,6 +108,7 @@ class MetricsCalculator:
         """
         return (self.tp + self.tn) / (self.tp + self.tn + self.fp + self.fn)
 
+    @memoized
     def error_rate(self) -> float:
         """
         Calcola il tasso di errore.
@@ -60,6 +120,7 @@ class MetricsCalculator:
         """
         return 1 - self.accuracy_rate()
 
+    @memoized
     def sensitivity(self) -> float:
         """
         Calcola la sensibilità (tasso di veri positivi).
@@ -74,6 +135,7 @@ class MetricsCalculator:
         else:
             raise ValueError("Divisione per zero")
 
+    @memoized
     def specificity(self) -> float:
         """
         Calcola la specificità (tasso di veri negativi).
@@ -88,6 +150,7 @@ class MetricsCalculator:
         else:
             raise ValueError("Divisione per zero")
 
+    @memoized
     def false_alarm_rate(self) -> float:
         """
         Calcola il tasso di falsi allarmi.
@@ -102,6 +165,7 @@ class MetricsCalculator:
         else:
             raise ValueError("Divisione per zero")
 
+    @memoized
     def miss_rate(self) -> float:
         """
         Calcola il tasso di mancate rilevazioni.
@@ -116,6 +180,7 @@ class MetricsCalculator:
         else:
             raise ValueError("Divisione per zero")
 
+    @memoized
     def geometric_mean(self) -> float:
         """
         Calcola la media geometrica.
@@ -129,46 +194,80 @@ class MetricsCalculator:
         spec = self.specificity()
         return np.sqrt(sens * spec)
 
+    @memoized
+    def roc_curve(self) -> tuple:
+        """
+        Calcola la curva ROC esatta con un solo ordinamento dei punteggi e somme cumulative:
+        ogni punteggio distinto è una soglia, la classe positiva è l'etichetta 1.
+
+        Return
+        -------
+        tuple
+            Tupla (fpr, tpr, thresholds) di array, a partire dal punto (0, 0).
+        """
+        positives = np.asarray(self.ytest).ravel() == 1
+        scores = np.asarray(self.ypred if self.yscore is None else self.yscore, dtype=float).ravel()
+
+        order = np.argsort(-scores, kind='stable')
+        scores = scores[order]
+        positives = positives[order]
+        # Ultima posizione di ogni gruppo di punteggi uguali
+        ends = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1] if len(scores) else np.array([], dtype=int)
+        tps = np.r_[0, np.cumsum(positives)[ends]]
+        fps = np.r_[0, ends + 1 - tps[1:]]
+
+        tpr = tps / tps[-1] if tps[-1] > 0 else np.zeros(len(tps))
+        fpr = fps / fps[-1] if fps[-1] > 0 else np.zeros(len(fps))
+        thresholds = np.r_[np.inf, scores[ends]]
+        return fpr, tpr, thresholds
+
+    @memoized
     def auc(self) -> float:
         """
-        Calcola l'area sotto la curva (AUC) usando TP, TN, FP, FN.
+        Calcola l'area sotto la curva ROC (AUC) con la regola dei trapezi.
 
         Return
         -------
         float
             Il valore dell'area sotto la curva (AUC).
         """
-        fpr, tpr = [], []
-        thresholds = np.linspace(0, 1, 10)
-
-        for m in thresholds:
-            tp = sum(1 for y, pred in zip(self.ytest, self.ypred) if y == 1.0 and pred >= m)
-            tn = sum(1 for y, pred in zip(self.ytest, self.ypred) if y == 0.0 and pred < m)
-            fp = sum(1 for y, pred in zip(self.ytest, self.ypred) if y == 0.0 and pred >= m)
-            fn = sum(1 for y, pred in zip(self.ytest, self.ypred) if y == 1.0 and pred < m)
-            tpr_value = tp / (tp + fn) if (tp + fn) > 0 else 0
-            fpr_value = fp / (fp + tn) if (fp + tn) > 0 else 0
-            tpr.append(tpr_value)
-            fpr.append(fpr_value)
-
-        # Ordinare i valori di FPR e TPR in base ai valori di FPR
-        sorted_indices = np.argsort(fpr)
-        fpr = np.array(fpr)[sorted_indices]
-        fpr[0] = 0
-        tpr = np.array(tpr)[sorted_indices]
-        tpr[0] = 0
-        # Calcolare l'area sotto la curva (AUC)
-        auc_value = np.trapz(tpr, fpr)
-        return auc_value
+        fpr, tpr, _ = self.roc_curve()
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+    @classmethod
+    def register_metric(cls, name: str, function=None):
+        """
+        Registra una nuova metrica, calcolabile con calculate_metrics senza modificare la classe.
+        Può essere usato anche come decoratore: @MetricsCalculator.register_metric('Nome').
+
+        Parametri
+        ----------
+        name : str
+            Nome della metrica.
+        function : callable, optional
+            Funzione che riceve l'istanza di MetricsCalculator e restituisce il valore della metrica.
+
+        Return
+        -------
+        callable
+            La funzione registrata (o il decoratore, se function non è specificata).
+        """
+        def register(func):
+            cls.METRICS[name] = func
+            return func
+        return register(function) if function is not None else register
 
+    @timed()
     def calculate_metrics(self, metrics) -> dict:
         """
-        Calcola le metriche richieste.
+        Calcola le metriche richieste. Vengono valutate solo le metriche richieste e le
+        quantità condivise (es. sensibilità e specificità per la media geometrica) sono
+        calcolate una sola volta per istanza.
 
         Parametri
         ----------
         metrics : list of str
-            Lista delle metriche richieste da calcolare.
+            Lista delle metriche richieste da calcolare. Se vuota, vengono calcolate tutte le metriche registrate.
 
         Return
         -------
@@ -178,20 +277,219 @@ class MetricsCalculator:
         if len(self.confusion_matrix) != 4:
             raise ValueError("La matrice di confusione deve contenere esattamente 4 valori: [TP, TN, FP, FN]")
 
-        all_metrics = {
-            'Accuracy Rate': self.accuracy_rate(),
-            'Error Rate': self.error_rate(),
-            'Sensitivity': self.sensitivity(),
-            'Specificity': self.specificity(),
-            'False Alarm Rate': self.false_alarm_rate(),
-            'Miss Rate': self.miss_rate(),
-            'Geometric Mean': self.geometric_mean(),
-            'Area Under the Curve': self.auc()
-        }
         if metrics:
-            invalid_metrics = [metric for metric in metrics if metric not in all_metrics]
+            invalid_metrics = [metric for metric in metrics if metric not in self.METRICS]
             if invalid_metrics:
-                raise ValueError(f"Metriche non valide: {', '.join(invalid_metrics)}. Le opzioni disponibili sono: {', '.join(all_metrics.keys())}")
-            return {metric: all_metrics[metric] for metric in metrics}
+                raise ValueError(f"Metriche non valide: {', '.join(invalid_metrics)}. Le opzioni disponibili sono: {', '.join(self.METRICS.keys())}")
+            return {metric: self.METRICS[metric](self) for metric in metrics}
+
+        return {metric: function(self) for metric, function in self.METRICS.items()}
+
+# Metriche predefinite
+MetricsCalculator.register_metric('Accuracy Rate', MetricsCalculator.accuracy_rate)
+MetricsCalculator.register_metric('Error Rate', MetricsCalculator.error_rate)
+MetricsCalculator.register_metric('Sensitivity', MetricsCalculator.sensitivity)
+MetricsCalculator.register_metric('Specificity', MetricsCalculator.specificity)
+MetricsCalculator.register_metric('False Alarm Rate', MetricsCalculator.false_alarm_rate)
+MetricsCalculator.register_metric('Miss Rate', MetricsCalculator.miss_rate)
+MetricsCalculator.register_metric('Geometric Mean', MetricsCalculator.geometric_mean)
+MetricsCalculator.register_metric('Area Under the Curve', MetricsCalculator.auc)
+
+class BatchMetricsCalculator:
+    """
+    Classe per calcolare le metriche di classificazione su molti split contemporaneamente.
+
+    Attributi
+    ----------
+    tp, tn, fp, fn : np.ndarray
+        Array con i valori [TP, TN, FP, FN] di ogni split.
+    extra_metrics : dict
+        Valori per split di metriche già calcolate altrove (es. l'AUC, che richiede i punteggi).
+    """
+    # Registro delle metriche vettoriali: nome -> funzione che riceve il calcolatore
+    METRICS = {}
+
+    def __init__(self, confusion_matrices, extra_metrics=None):
+        """
+        Inizializza il calcolatore con una pila di matrici di confusione.
+
+        Parametri
+        ----------
+        confusion_matrices : array
+            Matrice (n_splits × 4) dei valori [TP, TN, FP, FN], oppure pila
+            (n_splits × n_classes × n_classes) di matrici di confusione quadrate, ridotte
+            one-vs-rest rispetto a MetricsCalculator.POSITIVE_CLASS.
+        extra_metrics : dict, optional
+            Dizionario {nome metrica: array dei valori per split}.
+        """
+        matrices = np.asarray(confusion_matrices)
+        if matrices.ndim == 3 and matrices.shape[1] == matrices.shape[2]:
+            positive = MetricsCalculator.POSITIVE_CLASS
+            tp = matrices[:, positive, positive]
+            fn = matrices[:, positive, :].sum(axis=1) - tp
+            fp = matrices[:, :, positive].sum(axis=1) - tp
+            tn = matrices.sum(axis=(1, 2)) - tp - fn - fp
+            matrices = np.stack([tp, tn, fp, fn], axis=1)
+        if matrices.ndim != 2 or matrices.shape[1] != 4:
+            raise ValueError("Le matrici di confusione devono avere forma (n_splits × 4) o (n_splits × n_classes × n_classes).")
+        if np.any(matrices < 0):
+            raise ValueError("I valori della matrice di confusione non possono essere negativi.")
+        self.tp, self.tn, self.fp, self.fn = matrices.astype(np.float64).T
+        self.extra_metrics = {name: np.asarray(values, dtype=np.float64) for name, values in (extra_metrics or {}).items()}
+        self._cache = {}
+
+    @staticmethod
+    def _ratio(numerator, denominator) -> np.ndarray:
+        """
+        Divisione elemento per elemento che restituisce NaN dove il denominatore è zero.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(denominator > 0, numerator / denominator, np.nan)
+
+    def _memoize(self, name, compute) -> np.ndarray:
+        """
+        Restituisce il valore memorizzato di una quantità, calcolandolo solo la prima volta.
+        """
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    def accuracy_rate(self) -> np.ndarray:
+        """
+        Calcola il tasso di accuratezza di ogni split.
+
+        Return
+        -------
+        np.ndarray
+            Array dei valori per split (NaN dove la metrica non è definita).
+        """
+        return self._memoize('accuracy_rate', lambda: self._ratio(self.tp + self.tn, self.tp + self.tn + self.fp + self.fn))
+
+    def error_rate(self) -> np.ndarray:
+        """
+        Calcola il tasso di errore di ogni split.
+
+        Return
+        -------
+        np.ndarray
+            Array dei valori per split (NaN dove la metrica non è definita).
+        """
+        return self._memoize('error_rate', lambda: 1 - self.accuracy_rate())
+
+    def sensitivity(self) -> np.ndarray:
+        """
+        Calcola la sensibilità (tasso di veri positivi) di ogni split.
+
+        Return
+        -------
+        np.ndarray
+            Array dei valori per split (NaN dove la metrica non è definita).
+        """
+        return self._memoize('sensitivity', lambda: self._ratio(self.tp, self.tp + self.fn))
+
+    def specificity(self) -> np.ndarray:
+        """
+        Calcola la specificità (tasso di veri negativi) di ogni split.
+
+        Return
+        -------
+        np.ndarray
+            Array dei valori per split (NaN dove la metrica non è definita).
+        """
+        return self._memoize('specificity', lambda: self._ratio(self.tn, self.tn + self.fp))
+
+    def false_alarm_rate(self) -> np.ndarray:
+        """
+        Calcola il tasso di falsi allarmi di ogni split.
+
+        Return
+        -------
+        np.ndarray
+            Array dei valori per split (NaN dove la metrica non è definita).
+        """
+        return self._memoize('false_alarm_rate', lambda: self._ratio(self.fp, self.fp + self.tn))
+
+    def miss_rate(self) -> np.ndarray:
+        """
+        Calcola il tasso di mancate rilevazioni di ogni split.
+
+        Return
+        -------
+        np.ndarray
+            Array dei valori per split (NaN dove la metrica non è definita).
+        """
+        return self._memoize('miss_rate', lambda: self._ratio(self.fn, self.fn + self.tp))
+
+    def geometric_mean(self) -> np.ndarray:
+        """
+        Calcola la media geometrica di sensibilità e specificità di ogni split.
+
+        Return
+        -------
+        np.ndarray
+            Array dei valori per split (NaN dove la metrica non è definita).
+        """
+        return self._memoize('geometric_mean', lambda: np.sqrt(self.sensitivity() * self.specificity()))
+
+    @timed()
+    def calculate_metrics(self, metrics) -> dict:
+        """
+        Calcola le metriche richieste per tutti gli split. Le divisioni per zero producono NaN.
+
+        Parametri
+        ----------
+        metrics : list of str
+            Lista delle metriche richieste. Se vuota, vengono calcolate tutte quelle disponibili.
+
+        Return
+        -------
+        dict
+            Dizionario {nome metrica: array dei valori per split}.
+        """
+        available = {**self.METRICS, **{name: None for name in self.extra_metrics}}
+        metrics = metrics or list(available)
+        invalid_metrics = [metric for metric in metrics if metric not in available]
+        if invalid_metrics:
+            raise ValueError(f"Metriche non valide: {', '.join(invalid_metrics)}. Le opzioni disponibili sono: {', '.join(available.keys())}")
+        return {metric: self.extra_metrics[metric] if metric in self.extra_metrics else self.METRICS[metric](self)
+                for metric in metrics}
+
+    def summary(self, metrics, confidence: float = 0.95) -> pd.DataFrame:
+        """
+        Calcola media, deviazione standard e intervallo di confidenza percentile di ogni metrica,
+        ignorando gli split in cui la metrica non è definita.
+
+        Parametri
+        ----------
+        metrics : list of str
+            Lista delle metriche richieste.
+        confidence : float, optional
+            Livello dell'intervallo di confidenza (default è 0.95).
+
+        Return
+        -------
+        pd.DataFrame
+            Tabella con una riga per metrica e le colonne 'mean', 'std', 'ci_lower', 'ci_upper'.
+        """
+        if not 0 < confidence < 1:
+            raise ValueError("Il livello di confidenza deve essere compreso tra 0 e 1 esclusi.")
+        values = self.calculate_metrics(metrics)
+        alpha = (1 - confidence) / 2 * 100
+        rows = {}
+        with warnings.catch_warnings():
+            # Le metriche non definite in nessuno split restituiscono NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            for metric, array in values.items():
+                lower, upper = np.nanpercentile(array, [alpha, 100 - alpha]) if len(array) else (np.nan, np.nan)
+                rows[metric] = {'mean': np.nanmean(array), 'std': np.nanstd(array), 'ci_lower': lower, 'ci_upper': upper}
+        return pd.DataFrame.from_dict(rows, orient='index', columns=['mean', 'std', 'ci_lower', 'ci_upper'])
 
-        return all_metrics
\ No newline at end of file
+BatchMetricsCalculator.METRICS.update({
+    'Accuracy Rate': BatchMetricsCalculator.accuracy_rate,
+    'Error Rate': BatchMetricsCalculator.error_rate,
+    'Sensitivity': BatchMetricsCalculator.sensitivity,
+    'Specificity': BatchMetricsCalculator.specificity,
+    'False Alarm Rate': BatchMetricsCalculator.false_alarm_rate,
+    'Miss Rate': BatchMetricsCalculator.miss_rate,
+    'Geometric Mean': BatchMetricsCalculator.geometric_mean,
+})
@@ -1,10 +1,12 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from profiling import timed
 
 class ResultSaver:
     @staticmethod
-    def save_plot(lista_metriche: list, user_choice: list, splits: list):
+    @timed()
+    def save_plot(lista_metriche: list, user_choice: list, splits: list, filename='metrics_trend.png'):
         """
         Salva il grafico dell'andamento delle metriche al crescere delle iterazioni.
         """
@@ -24,9 +26,10 @@ class ResultSaver:
         plt.grid(True)
         plt.xticks(np.arange(len(splits)), np.arange(1, len(splits) + 1))
 
-        plt.savefig('metrics_trend.png', dpi=300)
+        plt.savefig(filename, dpi=300)
         plt.close()
 
+    @timed()
     def save_metrics_to_excel(lista_metriche:list, mean_metrics:list, filename='metrics.xlsx'):
         """
         Salva le metriche in un file Excel.
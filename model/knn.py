@@ -1,11 +1,26 @@
+import json
+import os
 import numpy as np
 import pandas as pd
+from model.spatial_index import KDTree, BallTree
+from profiling import timed
 
 class KNNClassifier:
     """
     Classe per implementare l'algoritmo K-Nearest Neighbors (KNN).
     """
-    def __init__(self, k: int):
+    # Memoria massima (in byte) occupata da un blocco di distanze test × train
+    MAX_BLOCK_BYTES = 64 * 1024 ** 2
+    # Righe di test interrogate insieme su un indice ad albero
+    TREE_BLOCK_ROWS = 4096
+    # Con algorithm='auto' si usa il KD-tree solo per dati con poche dimensioni e molti campioni:
+    # oltre queste soglie il calcolo a blocchi con NumPy è più veloce della visita dell'albero
+    AUTO_TREE_MAX_FEATURES = 6
+    AUTO_TREE_MIN_SAMPLES = 10000
+    ALGORITHMS = {'brute': None, 'kdtree': KDTree, 'balltree': BallTree}
+    DTYPES = (np.float32, np.float64)
+
+    def __init__(self, k: int, algorithm: str = 'auto', chunk_size: int = None, leaf_size: int = 40, dtype=None):
         """
         Inizializza la classe KNNClassifier con il numero di vicini k.
 
@@ -13,46 +28,75 @@ class KNNClassifier:
         ----------
         k : int
             Numero di vicini da considerare per la classificazione.
+        algorithm : str, optional
+            Algoritmo di ricerca dei vicini: 'auto', 'brute', 'kdtree' o 'balltree' (default è 'auto').
+        chunk_size : int, optional
+            Numero di righe di test elaborate per blocco. Se None viene calcolato
+            in modo che la matrice delle distanze non superi MAX_BLOCK_BYTES.
+        leaf_size : int, optional
+            Numero massimo di punti per foglia degli indici ad albero (default è 40).
+        dtype : optional
+            Tipo della matrice di training e dei blocchi di test per la ricerca esaustiva:
+            np.float32 dimezza memoria e traffico, np.float64 è il più preciso. Se None
+            (default) si usa float32 per dati già in float32 e float64 negli altri casi.
         """
         if not isinstance(k, int) or k <= 0:
             raise ValueError("Il valore di k deve essere un intero positivo.")
+        if algorithm != 'auto' and algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Algoritmo non valido: {algorithm}. Le opzioni disponibili sono: auto, {', '.join(self.ALGORITHMS)}")
+        if chunk_size is not None and (not isinstance(chunk_size, int) or chunk_size <= 0):
+            raise ValueError("Il valore di chunk_size deve essere un intero positivo.")
+        if dtype is not None and np.dtype(dtype) not in self.DTYPES:
+            raise ValueError("Il valore di dtype deve essere np.float32 o np.float64.")
         self.k = k
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.leaf_size = leaf_size
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.index = None
+        # Ordine delle colonne e parametri di normalizzazione del training set, salvati con il modello
+        self.columns = None
+        self.scale_params = None
 
     @staticmethod
-    def calculate_confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray) -> list:
+    def calculate_confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray, n_classes: int = None) -> np.ndarray:
         """
-        Calcola la matrice di confusione.
+        Calcola la matrice di confusione con un unico bincount, per un numero qualsiasi di classi.
 
         Parametri:
         ----------
         y_true : np.ndarray
-            Array dei valori veri delle etichette.
+            Array dei valori veri delle etichette (codici interi 0, 1, ..., come quelli
+            prodotti da factorize_target_column). Etichette non intere vengono codificate
+            insieme a y_pred secondo il loro ordine crescente.
         y_pred : np.ndarray
             Array dei valori predetti delle etichette.
+        n_classes : int, optional
+            Numero di classi. Se None viene ricavato dalle etichette (almeno 2).
 
         return:
         --------
-        list:
-            Lista contenente i valori [tn, tp, fn, fp] della matrice di confusione.
+        np.ndarray:
+            Matrice (n_classes × n_classes) in cui l'elemento [i, j] conta i campioni
+            della classe i predetti come classe j.
         """
-        tp = tn = fp = fn = 0
-
-        y_true = y_true.values
-        y_pred = y_pred
-
-        y_true_int = [int(value) for value in y_true]
-        y_pred_int = [int(value) for value in y_pred]
-
-        for true, pred in zip(y_true_int, y_pred_int):
-            if true == 1 and pred == 1:
-                tp += 1
-            elif true == 0 and pred == 0:
-                tn += 1
-            elif true == 0 and pred == 1:
-                fp += 1
-            elif true == 1 and pred == 0:
-                fn += 1
-        return [tn, tp, fn, fp]
+        y_true = np.asarray(y_true).ravel()
+        y_pred = np.asarray(y_pred).ravel()
+        if len(y_true) != len(y_pred):
+            raise ValueError("y_true e y_pred devono avere la stessa lunghezza.")
+        labels = np.concatenate([y_true, y_pred])
+        if not np.array_equal(labels, np.round(labels)):
+            # Etichette non intere (es. un target normalizzato in 0, 0.5, 1): la conversione a
+            # intero unirebbe classi diverse, quindi vengono codificate insieme in ordine crescente
+            codes = np.unique(labels, return_inverse=True)[1].ravel()
+            y_true, y_pred = codes[:len(y_true)], codes[len(y_true):]
+        y_true = y_true.astype(np.int64)
+        y_pred = y_pred.astype(np.int64)
+        if (len(y_true) and y_true.min() < 0) or (len(y_pred) and y_pred.min() < 0):
+            raise ValueError("Le etichette devono essere codici interi non negativi.")
+        if n_classes is None:
+            n_classes = max(2, int(max(y_true.max(initial=0), y_pred.max(initial=0))) + 1)
+        return np.bincount(y_true * n_classes + y_pred, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
 
     def euclidean_distance(self, x1: np.ndarray, x2: np.ndarray) -> float:
         """
@@ -72,6 +116,401 @@ class KNNClassifier:
         """
         return np.sqrt(np.sum((np.array(x1) - np.array(x2)) ** 2))
 
+    @staticmethod
+    def squared_distances(x_test: np.ndarray, x_train: np.ndarray, train_sq_norms: np.ndarray = None) -> np.ndarray:
+        """
+        Calcola la matrice delle distanze euclidee al quadrato tra due insiemi di punti,
+        usando lo sviluppo ||a||² + ||b||² - 2ab.
+
+        Parametri:
+        ----------
+        x_test : np.ndarray
+            Matrice (n_test × n_features) dei punti di test.
+        x_train : np.ndarray
+            Matrice (n_train × n_features) dei punti di training.
+        train_sq_norms : np.ndarray, optional
+            Norme al quadrato delle righe di x_train, se già calcolate.
+
+        return:
+        --------
+        np.ndarray:
+            Matrice (n_test × n_train) delle distanze al quadrato.
+        """
+        if train_sq_norms is None:
+            train_sq_norms = np.einsum('ij,ij->i', x_train, x_train)
+        test_sq_norms = np.einsum('ij,ij->i', x_test, x_test)
+        distances = x_test @ x_train.T
+        distances *= -2
+        distances += test_sq_norms[:, None]
+        distances += train_sq_norms[None, :]
+        # Gli errori di arrotondamento possono produrre valori leggermente negativi
+        np.maximum(distances, 0, out=distances)
+        return distances
+
+    @staticmethod
+    def nearest_neighbors(distances: np.ndarray, k: int) -> np.ndarray:
+        """
+        Seleziona, per ogni riga della matrice delle distanze, gli indici dei k vicini più vicini
+        tramite selezione parziale (argpartition) invece di un ordinamento completo.
+
+        I vicini sono restituiti in ordine di distanza crescente; a parità di distanza
+        vince il campione di training con indice minore, come in un ordinamento stabile.
+
+        Parametri:
+        ----------
+        distances : np.ndarray
+            Matrice (n_test × n_train) delle distanze.
+        k : int
+            Numero di vicini da selezionare.
+
+        return:
+        --------
+        np.ndarray:
+            Matrice (n_test × k) degli indici dei vicini.
+        """
+        k = min(k, distances.shape[1])
+        if k == distances.shape[1]:
+            return np.argsort(distances, axis=1, kind='stable')
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        # Ordina i k candidati per distanza e, a parità, per indice
+        order = np.lexsort((nearest, nearest_distances))
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        # Se il k-esimo valore è condiviso da altri campioni la selezione parziale
+        # non garantisce gli indici minori: per queste righe si ordina in modo stabile
+        kth = nearest_distances.max(axis=1)
+        ties = np.count_nonzero(distances <= kth[:, None], axis=1) > k
+        if ties.any():
+            nearest[ties] = np.argsort(distances[ties], axis=1, kind='stable')[:, :k]
+        return nearest
+
+    @staticmethod
+    def majority_vote(neighbor_codes: np.ndarray, n_classes: int, neighbor_weights: np.ndarray = None, k: int = None) -> np.ndarray:
+        """
+        Esegue il voto di maggioranza sui codici delle etichette dei vicini.
+
+        A parità di voti vince la classe che compare per prima tra i vicini ordinati
+        per distanza, come con max(class_counts, key=class_counts.get).
+
+        Parametri:
+        ----------
+        neighbor_codes : np.ndarray
+            Matrice (n_test × n_neighbors) dei codici interi delle etichette dei vicini.
+        n_classes : int
+            Numero di classi distinte.
+        neighbor_weights : np.ndarray, optional
+            Molteplicità intere dei vicini (es. conteggi del bootstrap). Ogni vicino vale
+            come tante copie quante la sua molteplicità, fino a raggiungere k voti.
+        k : int, optional
+            Numero di voti da assegnare quando sono specificate le molteplicità
+            (default è il numero di colonne di neighbor_codes).
+
+        return:
+        --------
+        np.ndarray:
+            Array dei codici delle classi predette.
+        """
+        n_rows, n_neighbors = neighbor_codes.shape
+        rows = np.arange(n_rows)
+        counts, votes = KNNClassifier.vote_counts(neighbor_codes, n_classes, neighbor_weights, k)
+        # Posizione della prima occorrenza (con almeno un voto) di ogni classe tra i vicini
+        first_seen = np.full((n_rows, n_classes), n_neighbors)
+        for j in range(n_neighbors - 1, -1, -1):
+            voting = rows if votes is None else rows[votes[:, j] > 0]
+            first_seen[voting, neighbor_codes[voting, j]] = j
+        winners = counts == counts.max(axis=1, keepdims=True)
+        return np.argmin(np.where(winners, first_seen, n_neighbors), axis=1)
+
+    @staticmethod
+    def vote_counts(neighbor_codes: np.ndarray, n_classes: int, neighbor_weights: np.ndarray = None, k: int = None) -> tuple:
+        """
+        Conta i voti ricevuti da ogni classe con un unico bincount su tutto il blocco di vicini.
+
+        Parametri:
+        ----------
+        neighbor_codes : np.ndarray
+            Matrice (n_test × n_neighbors) dei codici interi delle etichette dei vicini.
+        n_classes : int
+            Numero di classi distinte.
+        neighbor_weights : np.ndarray, optional
+            Molteplicità intere dei vicini.
+        k : int, optional
+            Numero di voti da assegnare quando sono specificate le molteplicità.
+
+        return:
+        --------
+        tuple:
+            Matrice (n_test × n_classes) dei voti e matrice dei voti assegnati a ogni vicino
+            (None se non sono specificate le molteplicità).
+        """
+        n_rows, n_neighbors = neighbor_codes.shape
+        flat_codes = (np.arange(n_rows)[:, None] * n_classes + neighbor_codes).ravel()
+        if neighbor_weights is None:
+            votes = None
+        else:
+            # Le copie di un vicino contano solo finché il totale non supera k
+            k = n_neighbors if k is None else k
+            cumulative = np.cumsum(neighbor_weights, axis=1)
+            votes = np.clip(k - (cumulative - neighbor_weights), 0, neighbor_weights)
+        counts = np.bincount(flat_codes, weights=None if votes is None else votes.ravel(),
+                             minlength=n_rows * n_classes).reshape(n_rows, n_classes)
+        return counts, votes
+
+    def _chunk_rows(self, n_train: int) -> int:
+        """
+        Restituisce il numero di righe di test da elaborare per ogni blocco.
+
+        Parametri:
+        ----------
+        n_train : int
+            Numero di campioni di training.
+
+        return:
+        --------
+        int:
+            Numero di righe per blocco.
+        """
+        if self.chunk_size is not None:
+            return self.chunk_size
+        return max(1, self.MAX_BLOCK_BYTES // (self.x_train.itemsize * max(n_train, 1)))
+
+    def _resolve_algorithm(self, n_samples: int, n_features: int) -> str:
+        """
+        Sceglie l'algoritmo di ricerca in base alle dimensioni del training set.
+
+        Parametri:
+        ----------
+        n_samples : int
+            Numero di campioni di training.
+        n_features : int
+            Numero di caratteristiche.
+
+        return:
+        --------
+        str:
+            L'algoritmo da utilizzare.
+        """
+        if self.algorithm != 'auto':
+            return self.algorithm
+        if n_features <= self.AUTO_TREE_MAX_FEATURES and n_samples >= self.AUTO_TREE_MIN_SAMPLES:
+            return 'kdtree'
+        return 'brute'
+
+    @timed(rows='x_train')
+    def fit(self, x_train: pd.DataFrame, y_train: pd.DataFrame, sample_weight: np.ndarray = None) -> 'KNNClassifier':
+        """
+        Converte il training set una sola volta nello stato usato da tutte le predizioni:
+        matrice contigua di tipo self.dtype, norme al quadrato delle righe, codici interi
+        delle etichette (nel tipo intero più piccolo) e, se richiesto, indice spaziale.
+
+        Parametri:
+        ----------
+        x_train : pd.DataFrame
+            Dataset delle caratteristiche per il training.
+        y_train : pd.DataFrame
+            Etichette per il training.
+        sample_weight : np.ndarray, optional
+            Molteplicità intere dei campioni di training: un campione con peso w equivale
+            a w copie della stessa riga, quelli con peso 0 vengono ignorati.
+
+        return:
+        --------
+        KNNClassifier:
+            L'istanza stessa, addestrata.
+        """
+        self.columns = list(x_train.columns) if isinstance(x_train, pd.DataFrame) else None
+        x_train = np.asarray(x_train)
+        dtype = self.dtype or (np.float32 if x_train.dtype == np.float32 else np.float64)
+        self.x_train = np.ascontiguousarray(x_train, dtype=dtype)
+        if self.x_train.ndim != 2:
+            raise ValueError("x_train deve essere una matrice bidimensionale.")
+        y_codes, self.classes = pd.factorize(np.asarray(y_train).ravel())
+        self.classes = np.asarray(self.classes)
+        self.y_codes = y_codes.astype(np.min_scalar_type(max(len(self.classes) - 1, 0)))
+        if len(self.x_train) != len(self.y_codes):
+            raise ValueError("x_train e y_train devono avere lo stesso numero di campioni.")
+        self.sample_weight = None
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight).ravel()
+            if len(sample_weight) != len(self.x_train):
+                raise ValueError("sample_weight deve avere un valore per ogni campione di training.")
+            if np.any(sample_weight < 0) or np.any(sample_weight != np.round(sample_weight)):
+                raise ValueError("I valori di sample_weight devono essere interi non negativi.")
+            keep = sample_weight > 0
+            self.x_train, self.y_codes = self.x_train[keep], self.y_codes[keep]
+            self.sample_weight = sample_weight[keep].astype(np.int64)
+        self.train_sq_norms = np.einsum('ij,ij->i', self.x_train, self.x_train)
+        self._build_index()
+        return self
+
+    def _build_index(self):
+        """
+        Costruisce l'indice spaziale sul training set se l'algoritmo scelto lo richiede.
+        """
+        algorithm = self._resolve_algorithm(*self.x_train.shape)
+        index_class = self.ALGORITHMS[algorithm]
+        self.index = index_class(self.x_train, self.leaf_size) if index_class is not None else None
+
+    @timed(rows='x_test')
+    def kneighbors(self, x_test: pd.DataFrame, k: int = None) -> np.ndarray:
+        """
+        Trova gli indici dei k vicini più vicini di ogni punto di test, ordinati per distanza.
+
+        Parametri:
+        ----------
+        x_test : pd.DataFrame
+            Dataset delle caratteristiche per il test.
+        k : int, optional
+            Numero di vicini da cercare (default è self.k).
+
+        return:
+        --------
+        np.ndarray:
+            Matrice (n_test × k) degli indici dei vicini nel training set.
+        """
+        if not hasattr(self, 'x_train'):
+            raise ValueError("Il classificatore deve essere addestrato con fit prima della predizione.")
+        k = self.k if k is None else k
+        x_test_values = np.ascontiguousarray(x_test, dtype=self.x_train.dtype)
+        if x_test_values.ndim != 2 or x_test_values.shape[1] != self.x_train.shape[1]:
+            raise ValueError(f"x_test deve avere {self.x_train.shape[1]} colonne come il training set.")
+        nearest = np.empty((len(x_test_values), min(k, len(self.x_train))), dtype=np.intp)
+
+        if self.index is not None:
+            step = self.chunk_size or self.TREE_BLOCK_ROWS
+            for start in range(0, len(x_test_values), step):
+                nearest[start:start + step] = self.index.query(x_test_values[start:start + step], k)[1]
+            return nearest
+
+        step = self._chunk_rows(len(self.x_train))
+        for start in range(0, len(x_test_values), step):
+            block = x_test_values[start:start + step]
+            distances = self.squared_distances(block, self.x_train, self.train_sq_norms)
+            nearest[start:start + step] = self.nearest_neighbors(distances, k)
+        return nearest
+
+    def predict(self, x_test: pd.DataFrame) -> np.ndarray:
+        """
+        Predice la classe per un set di test usando il training set memorizzato da fit.
+
+        Parametri:
+        ----------
+        x_test : pd.DataFrame
+            Dataset delle caratteristiche per il test.
+
+        return:
+        --------
+        np.ndarray:
+            Array delle classi predette per il set di test.
+        """
+        nearest = self.kneighbors(x_test)
+        return self.predict_from_neighbors(nearest)
+
+    @timed(rows='nearest')
+    def predict_from_neighbors(self, nearest: np.ndarray, k: int = None) -> np.ndarray:
+        """
+        Predice la classe a partire dai vicini già ordinati, usando solo i primi k.
+
+        Parametri:
+        ----------
+        nearest : np.ndarray
+            Matrice degli indici dei vicini restituita da kneighbors.
+        k : int, optional
+            Numero di vicini da usare per il voto (default è self.k).
+
+        return:
+        --------
+        np.ndarray:
+            Array delle classi predette.
+        """
+        k = self.k if k is None else k
+        nearest = nearest[:, :k]
+        weights = None if self.sample_weight is None else self.sample_weight[nearest]
+        codes = self.majority_vote(self.y_codes[nearest], len(self.classes), weights, k)
+        return self.classes[codes]
+
+    def predict_proba(self, x_test: pd.DataFrame) -> np.ndarray:
+        """
+        Stima la probabilità di ogni classe come frazione dei voti dei k vicini.
+
+        Parametri:
+        ----------
+        x_test : pd.DataFrame
+            Dataset delle caratteristiche per il test.
+
+        return:
+        --------
+        np.ndarray:
+            Matrice (n_test × n_classes) delle probabilità, con le colonne nell'ordine di self.classes.
+        """
+        return self.predict_proba_from_neighbors(self.kneighbors(x_test))
+
+    @timed(rows='nearest')
+    def predict_proba_from_neighbors(self, nearest: np.ndarray, k: int = None) -> np.ndarray:
+        """
+        Calcola le probabilità delle classi a partire dai vicini già ordinati, usando solo i primi k.
+
+        Parametri:
+        ----------
+        nearest : np.ndarray
+            Matrice degli indici dei vicini restituita da kneighbors.
+        k : int, optional
+            Numero di vicini da usare per il voto (default è self.k).
+
+        return:
+        --------
+        np.ndarray:
+            Matrice (n_test × n_classes) delle probabilità.
+        """
+        k = self.k if k is None else k
+        nearest = nearest[:, :k]
+        weights = None if self.sample_weight is None else self.sample_weight[nearest]
+        counts, _ = self.vote_counts(self.y_codes[nearest], len(self.classes), weights, k)
+        totals = counts.sum(axis=1, keepdims=True)
+        return counts / np.maximum(totals, 1)
+
+    def positive_scores(self, probabilities: np.ndarray, positive_label=1) -> np.ndarray:
+        """
+        Estrae dalle probabilità il punteggio della classe positiva, da usare per la curva ROC.
+
+        Parametri:
+        ----------
+        probabilities : np.ndarray
+            Matrice delle probabilità restituita da predict_proba.
+        positive_label : optional
+            Etichetta della classe positiva (default è 1).
+
+        return:
+        --------
+        np.ndarray:
+            Array dei punteggi (0 se la classe positiva non è presente nel training set).
+        """
+        return probabilities[:, self.classes == positive_label].sum(axis=1)
+
+    def predict_multi_k(self, x_test: pd.DataFrame, k_values: list) -> dict:
+        """
+        Predice la classe per più valori di k con una sola ricerca dei vicini.
+
+        I vicini vengono cercati una volta sola fino a max(k_values): poiché sono ordinati
+        per distanza, i primi k di questa lista coincidono con i k vicini di ogni k minore.
+
+        Parametri:
+        ----------
+        x_test : pd.DataFrame
+            Dataset delle caratteristiche per il test.
+        k_values : list of int
+            Valori di k da valutare.
+
+        return:
+        --------
+        dict:
+            Dizionario {k: array delle classi predette}.
+        """
+        if not k_values or any(not isinstance(k, int) or k <= 0 for k in k_values):
+            raise ValueError("I valori di k devono essere interi positivi.")
+        nearest = self.kneighbors(x_test, max(k_values))
+        return {k: self.predict_from_neighbors(nearest, k) for k in k_values}
+
     def knn(self, x_train: pd.DataFrame, y_train: pd.DataFrame, x_test: pd.DataFrame) -> list:
         """
         Predice la classe per un set di test.
@@ -90,23 +529,108 @@ class KNNClassifier:
         list:
             Lista delle classi predette per il set di test.
         """
-        predictions = []
-        for test_point in x_test.values:
-            distances = []
-            for i, train_point in enumerate(x_train.values):
-                dist = self.euclidean_distance(test_point, train_point)
-                distances.append((dist, y_train.iloc[i]))
-            # Ordina per distanza e seleziona i k vicini più vicini
-            distances.sort(key=lambda x: x[0])
-            k_nearest = distances[:self.k]
-            class_counts = {}
-            for _, label in k_nearest:
-                label = label.item()
-                if label in class_counts:
-                    class_counts[label] += 1
-                else:
-                    class_counts[label] = 1
-            # Trova la classe con il massimo conteggio
-            most_common = max(class_counts, key=class_counts.get)
-            predictions.append(most_common)
-        return predictions
\ No newline at end of file
+        return self.fit(x_train, y_train).predict(x_test).tolist()
+
+    def transform_queries(self, x_test: pd.DataFrame) -> pd.DataFrame:
+        """
+        Prepara nuovi dati di query come il training set: riordina le colonne secondo
+        self.columns e applica la normalizzazione min-max registrata in self.scale_params.
+
+        Parametri:
+        ----------
+        x_test : pd.DataFrame
+            Dati di query con i valori originali (non normalizzati).
+
+        return:
+        --------
+        pd.DataFrame:
+            I dati di query con le colonne del training set, normalizzate.
+        """
+        if self.columns is not None:
+            missing = [column for column in self.columns if column not in x_test.columns]
+            if missing:
+                raise ValueError(f"Colonne mancanti nei dati di query: {missing}")
+            x_test = x_test[self.columns]
+        if self.scale_params:
+            bounds = np.array([self.scale_params[column] for column in x_test.columns], dtype=np.float64)
+            # Le colonne costanti nel training set hanno ampiezza nulla: si divide per 1,
+            # come in PreprocessingPipeline.transform
+            scale = bounds[:, 1] - bounds[:, 0]
+            scale[scale == 0] = 1
+            x_test = (x_test - bounds[:, 0]) / scale
+        return x_test
+
+    def save(self, directory: str, scale_params: dict = None):
+        """
+        Salva il modello addestrato in una directory: le matrici sono file .npy che possono
+        essere riaperti con mmap_mode='r', i parametri del modello sono in metadata.json.
+
+        Parametri:
+        ----------
+        directory : str
+            La directory in cui salvare il modello (viene creata se non esiste).
+        scale_params : dict, optional
+            Minimo e massimo di ogni colonna registrati da DataPreprocessing.scale_columns
+            (default sono quelli già associati al modello).
+        """
+        if not hasattr(self, 'x_train'):
+            raise ValueError("Il classificatore deve essere addestrato con fit prima del salvataggio.")
+        if scale_params is not None:
+            self.scale_params = {column: tuple(bounds) for column, bounds in scale_params.items()}
+        os.makedirs(directory, exist_ok=True)
+        arrays = {'x_train': self.x_train, 'y_codes': self.y_codes, 'train_sq_norms': self.train_sq_norms}
+        if self.sample_weight is not None:
+            arrays['sample_weight'] = self.sample_weight
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(array))
+        metadata = {
+            'k': self.k,
+            'algorithm': self.algorithm,
+            'chunk_size': self.chunk_size,
+            'leaf_size': self.leaf_size,
+            'dtype': self.x_train.dtype.name,
+            'classes': self.classes.tolist(),
+            'columns': self.columns,
+            'scale_params': None if self.scale_params is None else
+                            [[column, list(bounds)] for column, bounds in self.scale_params.items()],
+            'arrays': list(arrays),
+        }
+        with open(os.path.join(directory, 'metadata.json'), 'w', encoding='utf-8') as file:
+            json.dump(metadata, file, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: str = 'r') -> 'KNNClassifier':
+        """
+        Carica un modello salvato con save. Con mmap_mode='r' la matrice di training è mappata
+        in memoria in sola lettura: più processi che caricano lo stesso modello condividono
+        un'unica copia nella page cache invece di rileggere e ripreprocessare il dataset.
+
+        Parametri:
+        ----------
+        directory : str
+            La directory in cui è stato salvato il modello.
+        mmap_mode : str, optional
+            Modalità di apertura dei file .npy passata a np.load (default è 'r';
+            None carica le matrici interamente in memoria).
+
+        return:
+        --------
+        KNNClassifier:
+            Il modello addestrato, pronto per la predizione.
+        """
+        with open(os.path.join(directory, 'metadata.json'), 'r', encoding='utf-8') as file:
+            metadata = json.load(file)
+        model = cls(metadata['k'], metadata['algorithm'], metadata['chunk_size'], metadata['leaf_size'],
+                    np.dtype(metadata['dtype']))
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in metadata['arrays']}
+        model.x_train = arrays['x_train']
+        model.y_codes = arrays['y_codes']
+        model.train_sq_norms = arrays['train_sq_norms']
+        model.sample_weight = arrays.get('sample_weight')
+        model.classes = np.asarray(metadata['classes'])
+        model.columns = metadata['columns']
+        if metadata['scale_params'] is not None:
+            model.scale_params = {column: tuple(bounds) for column, bounds in metadata['scale_params']}
+        model._build_index()
+        return model
@@ -0,0 +1,192 @@
+from abc import ABC, abstractmethod
+import numpy as np
+
+class SpatialIndex(ABC):
+    """
+    Classe astratta per gli indici spaziali binari (KD-tree, ball-tree) usati dal KNN.
+
+    L'indice viene costruito una sola volta sui dati di training: i punti vengono
+    riordinati in modo che ogni nodo corrisponda a un intervallo contiguo [start, end)
+    e le interrogazioni vengono eseguite su interi blocchi di punti di query.
+    """
+    def __init__(self, points: np.ndarray, leaf_size: int = 40):
+        """
+        Costruisce l'indice sui punti specificati.
+
+        Parametri:
+        ----------
+        points : np.ndarray
+            Matrice (n_samples × n_features) dei punti da indicizzare.
+        leaf_size : int, optional
+            Numero massimo di punti contenuti in una foglia (default è 40).
+        """
+        if not isinstance(leaf_size, int) or leaf_size <= 0:
+            raise ValueError("Il valore di leaf_size deve essere un intero positivo.")
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 2 or len(points) == 0:
+            raise ValueError("L'indice richiede una matrice bidimensionale non vuota.")
+        self.leaf_size = leaf_size
+        self.indices = np.arange(len(points))
+        # Struttura dei nodi: intervallo di punti e figli (-1 per le foglie)
+        self.start, self.end, self.left, self.right = [], [], [], []
+        self._build(points)
+        self.points = points[self.indices]
+
+    def _build(self, points: np.ndarray):
+        """
+        Costruisce l'albero suddividendo ricorsivamente (con uno stack esplicito) i punti
+        lungo la dimensione di massima estensione, in corrispondenza della mediana.
+
+        Parametri:
+        ----------
+        points : np.ndarray
+            Matrice dei punti nell'ordine originale.
+        """
+        stack = [(self._new_node(points, 0, len(points)), 0, len(points))]
+        while stack:
+            node, start, end = stack.pop()
+            if end - start <= self.leaf_size:
+                continue
+            segment = points[self.indices[start:end]]
+            dim = np.argmax(segment.max(axis=0) - segment.min(axis=0))
+            mid = (end - start) // 2
+            order = np.argpartition(segment[:, dim], mid)
+            self.indices[start:end] = self.indices[start:end][order]
+            left = self._new_node(points, start, start + mid)
+            right = self._new_node(points, start + mid, end)
+            self.left[node], self.right[node] = left, right
+            stack.append((left, start, start + mid))
+            stack.append((right, start + mid, end))
+
+    def _new_node(self, points: np.ndarray, start: int, end: int) -> int:
+        """
+        Aggiunge un nodo all'albero, ne calcola la regione e ne restituisce l'identificativo.
+        """
+        self._set_bounds(points[self.indices[start:end]])
+        self.start.append(start)
+        self.end.append(end)
+        self.left.append(-1)
+        self.right.append(-1)
+        return len(self.start) - 1
+
+    @abstractmethod
+    def _set_bounds(self, segment: np.ndarray):
+        """
+        Memorizza la regione che racchiude i punti di un nuovo nodo.
+
+        Parametri:
+        ----------
+        segment : np.ndarray
+            Punti contenuti nel nodo.
+        """
+        pass
+
+    @abstractmethod
+    def min_distance(self, node: int, queries: np.ndarray) -> np.ndarray:
+        """
+        Calcola un limite inferiore della distanza al quadrato tra ogni query e i punti del nodo.
+
+        Parametri:
+        ----------
+        node : int
+            Identificativo del nodo.
+        queries : np.ndarray
+            Matrice (n_queries × n_features) dei punti di query.
+
+        return:
+        --------
+        np.ndarray:
+            Array dei limiti inferiori delle distanze al quadrato.
+        """
+        pass
+
+    def query(self, queries: np.ndarray, k: int) -> tuple:
+        """
+        Trova i k vicini più vicini di ogni punto di query.
+
+        L'albero viene visitato una sola volta per l'intero blocco di query: in ogni nodo
+        restano attive solo le query per cui il nodo può ancora contenere un vicino migliore.
+        I vicini sono ordinati per distanza crescente e, a parità, per indice crescente.
+
+        Parametri:
+        ----------
+        queries : np.ndarray
+            Matrice (n_queries × n_features) dei punti di query.
+        k : int
+            Numero di vicini da cercare.
+
+        return:
+        --------
+        tuple:
+            Una tupla (distances, indices) di matrici (n_queries × k) con le distanze
+            al quadrato e gli indici originali dei vicini.
+        """
+        queries = np.asarray(queries, dtype=np.float64)
+        k = min(k, len(self.points))
+        best_distances = np.full((len(queries), k), np.inf)
+        best_indices = np.full((len(queries), k), len(self.points), dtype=np.intp)
+
+        stack = [(0, np.arange(len(queries)))]
+        while stack:
+            node, active = stack.pop()
+            bounds = self.min_distance(node, queries[active])
+            # Visita il nodo solo per le query che potrebbero migliorare il k-esimo vicino;
+            # la tolleranza evita di scartare per arrotondamento vicini a pari distanza
+            active = active[bounds <= best_distances[active, -1] * (1 + 1e-9)]
+            if len(active) == 0:
+                continue
+            if self.left[node] == -1:
+                start, end = self.start[node], self.end[node]
+                diff = queries[active, None, :] - self.points[None, start:end, :]
+                leaf_distances = np.einsum('ijk,ijk->ij', diff, diff)
+                leaf_indices = np.broadcast_to(self.indices[start:end], leaf_distances.shape)
+                candidates_d = np.hstack((best_distances[active], leaf_distances))
+                candidates_i = np.hstack((best_indices[active], leaf_indices))
+                order = np.lexsort((candidates_i, candidates_d))[:, :k]
+                best_distances[active] = np.take_along_axis(candidates_d, order, axis=1)
+                best_indices[active] = np.take_along_axis(candidates_i, order, axis=1)
+                continue
+            left, right = self.left[node], self.right[node]
+            # Il figlio mediamente più vicino viene visitato per primo
+            if self.min_distance(left, queries[active]).mean() <= self.min_distance(right, queries[active]).mean():
+                stack.append((right, active))
+                stack.append((left, active))
+            else:
+                stack.append((left, active))
+                stack.append((right, active))
+        return best_distances, best_indices
+
+class KDTree(SpatialIndex):
+    """
+    KD-tree: ogni nodo è racchiuso nel box allineato agli assi dei suoi punti.
+    """
+    def __init__(self, points: np.ndarray, leaf_size: int = 40):
+        self.lower, self.upper = [], []
+        super().__init__(points, leaf_size)
+
+    def _set_bounds(self, segment: np.ndarray):
+        self.lower.append(segment.min(axis=0))
+        self.upper.append(segment.max(axis=0))
+
+    def min_distance(self, node: int, queries: np.ndarray) -> np.ndarray:
+        gap = np.maximum(self.lower[node] - queries, 0) + np.maximum(queries - self.upper[node], 0)
+        return np.einsum('ij,ij->i', gap, gap)
+
+class BallTree(SpatialIndex):
+    """
+    Ball-tree: ogni nodo è racchiuso in una ipersfera centrata nel baricentro dei suoi punti.
+    """
+    def __init__(self, points: np.ndarray, leaf_size: int = 40):
+        self.centers, self.radii = [], []
+        super().__init__(points, leaf_size)
+
+    def _set_bounds(self, segment: np.ndarray):
+        center = segment.mean(axis=0)
+        diff = segment - center
+        self.centers.append(center)
+        self.radii.append(np.sqrt(np.einsum('ij,ij->i', diff, diff).max()))
+
+    def min_distance(self, node: int, queries: np.ndarray) -> np.ndarray:
+        diff = queries - self.centers[node]
+        gap = np.maximum(np.sqrt(np.einsum('ij,ij->i', diff, diff)) - self.radii[node], 0)
+        return gap ** 2
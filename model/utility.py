@@ -1,10 +1,120 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import numpy as np
-from metrics_results.metrics import MetricsCalculator
+import pandas as pd
+from metrics_results.metrics import MetricsCalculator, BatchMetricsCalculator
 from model.knn import KNNClassifier
 from metrics_results.results import ResultSaver
 
+def _evaluate_predictions(ytest, ypred, yscore, user_choice) -> tuple:
+    """
+    Riduce le predizioni di uno split ai dati necessari per le metriche: i valori [TP, TN, FP, FN]
+    e le metriche che non si ricavano dalla matrice di confusione (es. l'AUC).
+
+    Parametri
+    ----------
+    ytest : array-like
+        Etichette vere del test set.
+    ypred : np.ndarray
+        Etichette predette.
+    yscore : np.ndarray
+        Punteggi della classe positiva.
+    user_choice : list of str
+        Lista delle metriche da calcolare.
+
+    Return
+    -------
+    tuple
+        Lista [TP, TN, FP, FN] e dizionario delle metriche non vettoriali.
+    """
+    confusion_matrix = KNNClassifier.calculate_confusion_matrix(ytest, ypred)
+    calculator = MetricsCalculator(confusion_matrix, ypred, np.asarray(ytest).ravel(), yscore)
+    scalar_metrics = [metric for metric in user_choice if metric not in BatchMetricsCalculator.METRICS]
+    extra = calculator.calculate_metrics(scalar_metrics) if scalar_metrics else {}
+    return calculator.confusion_matrix, extra
+
+def _evaluate_split(k, algorithm, user_choice, xtrain, ytrain, xtest, ytest, sample_weight=None):
+    """
+    Addestra il KNN su uno split e ne valuta le predizioni sul relativo test set.
+
+    Parametri
+    ----------
+    k : int or list of int
+        Numero di vicini da considerare nell'algoritmo KNN. Con una lista di valori i vicini
+        vengono cercati una sola volta fino a max(k) e riusati per ogni k.
+    algorithm : str
+        Algoritmo di ricerca dei vicini.
+    user_choice : list of str
+        Lista delle metriche da calcolare.
+    xtrain, ytrain, xtest, ytest : array-like
+        Dati di training e di test dello split.
+    sample_weight : np.ndarray, optional
+        Molteplicità dei campioni di training (bootstrap pesato).
+
+    Return
+    -------
+    tuple or dict
+        Lista [TP, TN, FP, FN] e dizionario delle metriche non vettoriali, come da _evaluate_predictions;
+        con una lista di valori di k, dizionario {k: risultato}.
+    """
+    k_values = k if isinstance(k, (list, tuple)) else [k]
+    knn_classifier = KNNClassifier(max(k_values), algorithm=algorithm)
+    nearest = knn_classifier.fit(xtrain, ytrain, sample_weight).kneighbors(xtest)
+    results = {}
+    for k_value in k_values:
+        ypred = knn_classifier.predict_from_neighbors(nearest, k_value)
+        yscore = knn_classifier.positive_scores(knn_classifier.predict_proba_from_neighbors(nearest, k_value))
+        results[k_value] = _evaluate_predictions(ytest, ypred, yscore, user_choice)
+    return results if isinstance(k, (list, tuple)) else results[k]
+
+def _feature_matrix(X) -> np.ndarray:
+    """
+    Converte le caratteristiche in una matrice float: le matrici float32 (modalità compatta)
+    restano in float32, tutte le altre diventano float64.
+    """
+    features = np.asarray(X)
+    return features if features.dtype == np.float32 else features.astype(np.float64)
+
+def _share_array(array: np.ndarray) -> tuple:
+    """
+    Copia un array in un blocco di memoria condivisa.
+
+    Return
+    -------
+    tuple
+        Il blocco di memoria condivisa e il descrittore (nome, forma, dtype) per riaprirlo.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def _evaluate_shared_split(task) -> tuple:
+    """
+    Valuta uno split in un processo worker leggendo caratteristiche ed etichette
+    dalla memoria condivisa: il task contiene solo i descrittori e gli indici dello split.
+    """
+    features_desc, labels_desc, classes, train, test, weights, k, algorithm, user_choice = task
+    blocks = [shared_memory.SharedMemory(name=features_desc[0]), shared_memory.SharedMemory(name=labels_desc[0])]
+    try:
+        return _evaluate_shared_views(blocks, features_desc, labels_desc, classes, train, test, weights, k, algorithm, user_choice)
+    finally:
+        for shm in blocks:
+            shm.close()
+
+def _evaluate_shared_views(blocks, features_desc, labels_desc, classes, train, test, weights, k, algorithm, user_choice) -> tuple:
+    """
+    Costruisce le viste sugli array condivisi e valuta lo split. Le viste vengono rilasciate
+    all'uscita dalla funzione, prima della chiusura dei blocchi di memoria.
+    """
+    features = np.ndarray(features_desc[1], dtype=features_desc[2], buffer=blocks[0].buf)
+    labels = np.ndarray(labels_desc[1], dtype=labels_desc[2], buffer=blocks[1].buf)
+    return _evaluate_split(k, algorithm, user_choice,
+                           features[train], classes[labels[train]], features[test], classes[labels[test]], weights)
+
 class classification_evaluation:
-    def knn_metrics(k, splits, user_choice) -> dict:
+    def knn_metrics(k, splits, user_choice, algorithm='auto', n_jobs=1, output_dir='.') -> dict:
         """
         Questa funzione estrae le tuple di test e train dalla lista degli split, derivante da holdout,
         random subsampling e bootstrap, e calcola le metriche richieste dall'utente per ogni split.
@@ -18,6 +128,16 @@ class classification_evaluation:
             Lista di tuple contenenti i dati di test e train.
         user_choice : list of str
             Lista delle metriche scelte dall'utente da calcolare.
+        algorithm : str, optional
+            Algoritmo di ricerca dei vicini ('auto', 'brute', 'kdtree', 'balltree').
+            L'eventuale indice viene costruito una sola volta per split.
+        n_jobs : int, optional
+            Numero di processi con cui valutare gli split in parallelo (default è 1, -1 per
+            usare tutte le CPU). L'ordine dei risultati è lo stesso dell'esecuzione seriale.
+            In parallelo gli split devono essere estratti da un unico DataFrame con indice univoco.
+        output_dir : str, optional
+            Directory in cui salvare grafico e file Excel delle metriche (default è la directory
+            corrente). Se None i risultati non vengono salvati.
 
         Return
         -------
@@ -26,32 +146,360 @@ class classification_evaluation:
 
         """
 
-        metrics_dict = {item: [] for item in user_choice}
-        lista_metriche = []
+        if classification_evaluation._resolve_n_jobs(n_jobs) > 1 and len(splits) > 1:
+            results = classification_evaluation._parallel_split_metrics(k, splits, user_choice, algorithm, n_jobs)
+        else:
+            results = (_evaluate_split(k, algorithm, user_choice, *split) for split in splits)
+
+        return classification_evaluation._save_results(results, user_choice, output_dir)
+
+    def knn_metrics_indices(k, X, Y, index_splits, user_choice, algorithm='auto', n_jobs=1, output_dir='.') -> dict:
+        """
+        Come knn_metrics, ma gli split sono coppie (train_indices, test_indices) riferite a un'unica
+        matrice delle caratteristiche. Gli split vengono consumati uno alla volta, quindi possono
+        essere un generatore (es. Split.bootstrap_indices) e la memoria occupata non dipende
+        dal numero di iterazioni.
+
+        Parametri
+        ----------
+        k : int
+            Numero di vicini da considerare nell'algoritmo KNN.
+        X : pd.DataFrame
+            DataFrame delle caratteristiche.
+        Y : pd.DataFrame
+            DataFrame delle etichette.
+        index_splits : iterable of tuples
+            Coppie (train_indices, test_indices) di indici posizionali, oppure triple
+            (train_indices, test_indices, train_weights) come quelle di Split.weighted_bootstrap_indices.
+        user_choice : list of str
+            Lista delle metriche scelte dall'utente da calcolare.
+        algorithm : str, optional
+            Algoritmo di ricerca dei vicini ('auto', 'brute', 'kdtree', 'balltree').
+        n_jobs : int, optional
+            Numero di processi con cui valutare gli split in parallelo (default è 1, -1 per
+            usare tutte le CPU). L'ordine dei risultati è lo stesso dell'esecuzione seriale.
+        output_dir : str, optional
+            Directory in cui salvare grafico e file Excel delle metriche (default è la directory
+            corrente). Se None i risultati non vengono salvati.
+
+        Return
+        -------
+        dict
+            Dizionario con la media delle metriche calcolate sugli split.
+        """
+        features = _feature_matrix(X)
+        labels = np.asarray(Y).ravel()
+
+        if classification_evaluation._resolve_n_jobs(n_jobs) > 1:
+            codes, classes = pd.factorize(labels)
+            results = classification_evaluation._parallel_metrics(
+                features, codes, np.asarray(classes), index_splits, k, user_choice, algorithm, n_jobs)
+        else:
+            results = (_evaluate_split(k, algorithm, user_choice, features[train], labels[train],
+                                       features[test], labels[test], *weights)
+                       for train, test, *weights in index_splits)
+
+        return classification_evaluation._save_results(results, user_choice, output_dir)
+
+    def _aggregate(results, user_choice) -> dict:
+        """
+        Calcola in un'unica chiamata vettoriale le metriche di tutti gli split.
+
+        Parametri
+        ----------
+        results : iterable of tuples
+            Coppie ([TP, TN, FP, FN], metriche non vettoriali) di ogni split, in ordine.
+        user_choice : list of str
+            Lista delle metriche scelte dall'utente.
+
+        Return
+        -------
+        dict
+            Dizionario {nome metrica: array dei valori per split}.
+        """
+        counts = []
+        extra = {}
+        for split_counts, split_extra in results:
+            counts.append(split_counts)
+            for metric, value in split_extra.items():
+                extra.setdefault(metric, []).append(value)
+        calculator = BatchMetricsCalculator(np.array(counts).reshape(-1, 4), extra)
+        return calculator.calculate_metrics(user_choice) if counts else {metric: np.array([]) for metric in user_choice}
+
+    def _save_results(results, user_choice, output_dir='.') -> dict:
+        """
+        Calcola le metriche di ogni split, ne calcola la media e salva grafico e file Excel.
+
+        Parametri
+        ----------
+        results : iterable of tuples
+            Risultati di ogni split, in ordine, come restituiti da _evaluate_split.
+        user_choice : list of str
+            Lista delle metriche scelte dall'utente.
+        output_dir : str, optional
+            Directory di grafico e file Excel; se None non viene salvato nulla.
+
+        Return
+        -------
+        dict
+            Dizionario con la media delle metriche (gli split in cui una metrica non è definita sono ignorati).
+        """
+        values = classification_evaluation._aggregate(results, user_choice)
+        n_splits = len(next(iter(values.values()), []))
+        lista_metriche = [{metric: values[metric][i] for metric in user_choice} for i in range(n_splits)]
+        mean_metrics = {key: np.nanmean(array) for key, array in values.items() if len(array)}
+
+        if output_dir is not None:
+            # Salva il grafico dell'andamento delle metriche
+            ResultSaver.save_plot(lista_metriche, user_choice, lista_metriche, os.path.join(output_dir, 'metrics_trend.png'))
+
+            # Salva le metriche in un file Excel
+            ResultSaver.save_metrics_to_excel(lista_metriche, mean_metrics, os.path.join(output_dir, 'metrics.xlsx'))
+
+        return mean_metrics
+
+    def _resolve_n_jobs(n_jobs) -> int:
+        """
+        Restituisce il numero effettivo di processi da utilizzare.
+        """
+        if n_jobs is None:
+            return 1
+        if not isinstance(n_jobs, int) or n_jobs == 0 or n_jobs < -1:
+            raise ValueError("Il valore di n_jobs deve essere un intero positivo o -1.")
+        return (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+
+    def _parallel_split_metrics(k, splits, user_choice, algorithm, n_jobs):
+        """
+        Valuta su un pool di processi una lista di split già materializzati, trasformandoli in
+        coppie di indici su un'unica matrice delle caratteristiche (vedi _shared_index_splits).
+        """
+        features, labels, index_splits = classification_evaluation._shared_index_splits(splits)
+        codes, classes = pd.factorize(labels)
+        return classification_evaluation._parallel_metrics(
+            features, codes, np.asarray(classes), index_splits, k, user_choice, algorithm, n_jobs)
+
+    def _shared_index_splits(splits) -> tuple:
+        """
+        Ricostruisce dagli split materializzati (es. con Split.bootstrap) l'unica matrice da cui
+        sono stati estratti: ogni riga viene copiata una sola volta, identificata dall'etichetta
+        dell'indice del DataFrame, e ogni split diventa una coppia (train, test) di posizioni.
+        In questo modo la memoria condivisa non cresce con il numero di iterazioni. Se la stessa
+        etichetta corrisponde a righe diverse (split non estratti da un unico DataFrame con indice
+        univoco) viene sollevato un ValueError.
 
-        for i in range(len(splits)):
-            ytest = splits[i][3]
-            xtrain = splits[i][0]
-            ytrain = splits[i][1]
-            xtest = splits[i][2]
+        Parametri
+        ----------
+        splits : list of tuples
+            Lista di tuple (xtrain, ytrain, xtest, ytest) di DataFrame o Series.
 
-            knn_classifier = KNNClassifier(k)
-            ypred = knn_classifier.knn(xtrain, ytrain, xtest)
-            confusion_matrix = knn_classifier.calculate_confusion_matrix(ytest, ypred)
-            calculator = MetricsCalculator(confusion_matrix, ypred, ytest.values)
+        Return
+        -------
+        tuple
+            Matrice delle caratteristiche, array delle etichette e lista delle coppie (train, test).
+        """
+        index = None
+        feature_blocks, label_blocks = [], []
+        parts = []
+        for xtrain, ytrain, xtest, ytest in splits:
+            for x, y in ((xtrain, ytrain), (xtest, ytest)):
+                if not isinstance(x, (pd.DataFrame, pd.Series)):
+                    raise ValueError("Con n_jobs > 1 gli split devono essere DataFrame; "
+                                     "per array NumPy usare knn_metrics_indices.")
+                # Solo la prima occorrenza delle etichette non ancora viste viene copiata
+                new = ~x.index.duplicated()
+                if index is not None:
+                    new &= ~x.index.isin(index)
+                if new.any():
+                    index = x.index[new] if index is None else index.append(x.index[new])
+                    feature_blocks.append(_feature_matrix(x[new]))
+                    label_blocks.append(np.asarray(y).ravel()[new])
+                parts.append((x, y))
+        features = np.concatenate(feature_blocks)
+        labels = np.concatenate(label_blocks)
 
-            all_results = calculator.calculate_metrics(user_choice)
-            lista_metriche.append(all_results)
+        positions = [index.get_indexer(x.index) for x, _ in parts]
+        for (x, y), rows in zip(parts, positions):
+            if not (np.array_equal(features[rows], _feature_matrix(x), equal_nan=True)
+                    and np.array_equal(labels[rows], np.asarray(y).ravel())):
+                raise ValueError("Gli split non provengono da un unico DataFrame con indice univoco: "
+                                 "con n_jobs > 1 usare knn_metrics_indices con le coppie di indici.")
+        return features, labels, list(zip(positions[::2], positions[1::2]))
 
-            for metric, value in all_results.items():
-                metrics_dict[metric].append(value)
+    def _parallel_metrics(features, labels, classes, index_splits, k, user_choice, algorithm, n_jobs):
+        """
+        Valuta gli split su un pool di processi condividendo caratteristiche ed etichette
+        tramite memoria condivisa. I task vengono inviati a finestre limitate, così gli
+        indici di un generatore di split non vengono materializzati tutti insieme.
 
-        mean_metrics = {key: np.mean(values) for key, values in metrics_dict.items() if values}
+        Parametri
+        ----------
+        features : np.ndarray
+            Matrice delle caratteristiche.
+        labels : np.ndarray
+            Codici interi delle etichette.
+        classes : np.ndarray
+            Valori delle etichette corrispondenti ai codici.
+        index_splits : iterable of tuples
+            Coppie (train, test) di indici o intervalli di righe, eventualmente seguite
+            dalle molteplicità dei campioni di training.
+
+        Return
+        -------
+        generator
+            Generatore dei dizionari delle metriche, nello stesso ordine degli split.
+        """
+        workers = classification_evaluation._resolve_n_jobs(n_jobs)
+        features_shm, features_desc = _share_array(features)
+        labels_shm, labels_desc = _share_array(labels)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for train, test, *weights in index_splits:
+                    task = (features_desc, labels_desc, classes, train, test, *(weights or [None]), k, algorithm, user_choice)
+                    pending.append(executor.submit(_evaluate_shared_split, task))
+                    if len(pending) >= 2 * workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+        finally:
+            for shm in (features_shm, labels_shm):
+                shm.close()
+                shm.unlink()
+
+    def knn_metrics_multi_k_indices(k_values, X, Y, index_splits, user_choice, algorithm='auto', n_jobs=1, output_dir='.') -> dict:
+        """
+        Come knn_metrics_indices per più valori di k: per ogni split i vicini vengono cercati
+        una sola volta fino a max(k_values) e riusati per le predizioni e le metriche di ogni k.
+
+        Parametri
+        ----------
+        k_values : list of int
+            Valori di k da valutare.
+        X : pd.DataFrame
+            DataFrame delle caratteristiche.
+        Y : pd.DataFrame
+            DataFrame delle etichette.
+        index_splits : iterable of tuples
+            Coppie (train_indices, test_indices) di indici posizionali, eventualmente seguite
+            dalle molteplicità dei campioni di training.
+        user_choice : list of str
+            Lista delle metriche scelte dall'utente da calcolare.
+        algorithm : str, optional
+            Algoritmo di ricerca dei vicini ('auto', 'brute', 'kdtree', 'balltree').
+        n_jobs : int, optional
+            Numero di processi con cui valutare gli split in parallelo (default è 1, -1 per
+            usare tutte le CPU).
+        output_dir : str, optional
+            Directory in cui salvare grafico e file Excel delle metriche di ogni k, nella
+            sottodirectory k<k> (default è la directory corrente). Se None i risultati non vengono salvati.
+
+        Return
+        -------
+        dict
+            Dizionario {k: media delle metriche calcolate sugli split}.
+        """
+        if not k_values or any(not isinstance(k, int) or k <= 0 for k in k_values):
+            raise ValueError("I valori di k devono essere interi positivi.")
+        k_values = list(dict.fromkeys(k_values))
+        features = _feature_matrix(X)
+        labels = np.asarray(Y).ravel()
 
-        # Salva il grafico dell'andamento delle metriche
-        ResultSaver.save_plot(lista_metriche, user_choice, splits)
+        if classification_evaluation._resolve_n_jobs(n_jobs) > 1:
+            codes, classes = pd.factorize(labels)
+            results = classification_evaluation._parallel_metrics(
+                features, codes, np.asarray(classes), index_splits, k_values, user_choice, algorithm, n_jobs)
+        else:
+            results = (_evaluate_split(k_values, algorithm, user_choice, features[train], labels[train],
+                                       features[test], labels[test], *weights)
+                       for train, test, *weights in index_splits)
 
-        # Salva le metriche in un file Excel
-        ResultSaver.save_metrics_to_excel(lista_metriche, mean_metrics)
-        
-        return mean_metrics
\ No newline at end of file
+        per_k = {k: [] for k in k_values}
+        for split_results in results:
+            for k in k_values:
+                per_k[k].append(split_results[k])
+
+        mean_metrics = {}
+        for k, k_results in per_k.items():
+            k_dir = None
+            if output_dir is not None:
+                k_dir = os.path.join(output_dir, f'k{k}')
+                os.makedirs(k_dir, exist_ok=True)
+            mean_metrics[k] = classification_evaluation._save_results(k_results, user_choice, k_dir)
+        return mean_metrics
+
+    def knn_metrics_multi_k(k_values, splits, user_choice, algorithm='auto') -> pd.DataFrame:
+        """
+        Valuta il KNN per più valori di k eseguendo una sola ricerca dei vicini per split,
+        fino a max(k_values), e ricavando da essa le predizioni, le matrici di confusione
+        e le metriche di ogni k.
+
+        Parametri
+        ----------
+        k_values : list of int
+            Valori di k da valutare.
+        splits : list of tuples
+            Lista di tuple contenenti i dati di test e train.
+        user_choice : list of str
+            Lista delle metriche scelte dall'utente da calcolare.
+        algorithm : str, optional
+            Algoritmo di ricerca dei vicini ('auto', 'brute', 'kdtree', 'balltree').
+
+        Return
+        -------
+        pd.DataFrame
+            Tabella k × metrica con la media delle metriche sugli split.
+        """
+        if not k_values or any(not isinstance(k, int) or k <= 0 for k in k_values):
+            raise ValueError("I valori di k devono essere interi positivi.")
+        results = {k: [] for k in k_values}
+
+        for split in splits:
+            split_results = _evaluate_split(list(k_values), algorithm, user_choice, *split)
+            for k in k_values:
+                results[k].append(split_results[k])
+
+        table = pd.DataFrame.from_dict(
+            {k: {metric: np.nanmean(array) for metric, array in classification_evaluation._aggregate(k_results, user_choice).items() if len(array)}
+             for k, k_results in results.items()},
+            orient='index', columns=user_choice)
+        table.index.name = 'k'
+        return table
+
+    def compact_accuracy_check(k, X, Y, index_splits, algorithm='auto') -> dict:
+        """
+        Confronta le predizioni del KNN in float32 (modalità compatta) con quelle in float64
+        sugli stessi split, per verificare che la precisione ridotta non cambi i risultati.
+
+        Parametri
+        ----------
+        k : int
+            Numero di vicini da considerare nell'algoritmo KNN.
+        X : pd.DataFrame
+            Dataset delle caratteristiche.
+        Y : pd.DataFrame
+            Etichette.
+        index_splits : iterable
+            Coppie (train_indices, test_indices).
+        algorithm : str, optional
+            Algoritmo di ricerca dei vicini ('auto', 'brute', 'kdtree', 'balltree').
+
+        Return
+        -------
+        dict
+            Frazione di predizioni identiche ('Agreement') e accuratezza in float64 e in float32.
+        """
+        features = np.asarray(X, dtype=np.float64)
+        labels = np.asarray(Y).ravel()
+        matches = correct64 = correct32 = total = 0
+        for train, test, *_ in index_splits:
+            predictions = {}
+            for dtype in (np.float64, np.float32):
+                knn_classifier = KNNClassifier(k, algorithm=algorithm, dtype=dtype)
+                predictions[dtype] = knn_classifier.fit(features[train], labels[train]).predict(features[test])
+            matches += np.count_nonzero(predictions[np.float64] == predictions[np.float32])
+            correct64 += np.count_nonzero(predictions[np.float64] == labels[test])
+            correct32 += np.count_nonzero(predictions[np.float32] == labels[test])
+            total += len(test)
+        if total == 0:
+            raise ValueError("Gli split non contengono campioni di test.")
+        return {'Agreement': matches / total, 'Accuracy float64': correct64 / total, 'Accuracy float32': correct32 / total}
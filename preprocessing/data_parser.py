@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
+import csv
 import json
-import io
 import os
+import re
+import pickle
+import hashlib
+from profiling import timed
 
 class FileOpenerStrategy(ABC):
     """
@@ -25,6 +30,25 @@ class FileOpenerStrategy(ABC):
         """
         pass
 
+    def open_chunks(self, file_path: str, chunksize: int):
+        """
+        Legge il file a blocchi di righe, per elaborare file più grandi della memoria.
+        Di default il formato non supporta la lettura a blocchi.
+
+        Parametri:
+        ----------
+        file_path : str
+            Il percorso del file da aprire.
+        chunksize : int
+            Il numero di righe di ogni blocco.
+
+        return:
+        --------
+        Iterator[pd.DataFrame]:
+            Un iteratore sui blocchi del file.
+        """
+        raise ValueError(f"Lettura a blocchi non supportata per il file: {file_path}")
+
 class CSVFileOpener(FileOpenerStrategy):
     """
     Classe che implementa il parser per i file CSV.
@@ -51,6 +75,9 @@ class CSVFileOpener(FileOpenerStrategy):
             print(f"[CSVFileOpener] Failed to open CSV file: {file_path} - {e}")
             return None
 
+    def open_chunks(self, file_path: str, chunksize: int):
+        return pd.read_csv(file_path, chunksize=chunksize)
+
 class ExcelFileOpener(FileOpenerStrategy):
     """
     Classe che implementa il parser per i file Excel.
@@ -81,6 +108,49 @@ class TextFileOpener(FileOpenerStrategy):
     """
     Classe che implementa il parser per i file di testo.
     """
+    # Caratteri letti all'inizio del file per riconoscere il delimitatore
+    SAMPLE_BYTES = 64 * 1024
+    DELIMITERS = ',\t;|'
+
+    @classmethod
+    def detect_delimiter(cls, sample: str) -> str:
+        """
+        Riconosce il delimitatore di un file di testo a partire da un campione delle prime righe.
+
+        Il campione viene analizzato con csv.Sniffer, che tiene conto dei campi tra virgolette
+        e sceglie il delimitatore presente con frequenza costante nelle righe; se non ne viene
+        riconosciuto nessuno si controlla la prima riga e, in mancanza, si usa lo spazio.
+
+        Parametri:
+        ----------
+        sample : str
+            Le prime righe del file.
+
+        return:
+        --------
+        str:
+            Il delimitatore (',', '\\t', ';', '|' oppure ' ').
+        """
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=cls.DELIMITERS).delimiter
+        except csv.Error:
+            first_line = sample.splitlines()[0] if sample else ''
+            for delimiter in cls.DELIMITERS:
+                if delimiter in first_line:
+                    return delimiter
+            return ' '  # default spazio bianco se non viene trovato un delimitatore
+
+    def _read_delimiter(self, file_path: str) -> str:
+        """
+        Legge solo un campione iniziale del file (fino all'ultima riga completa) e ne
+        riconosce il delimitatore.
+        """
+        with open(file_path, 'r', encoding='utf-8') as file:
+            sample = file.read(self.SAMPLE_BYTES)
+        if len(sample) == self.SAMPLE_BYTES and '\n' in sample:
+            sample = sample[:sample.rindex('\n') + 1]
+        return self.detect_delimiter(sample)
+
     def open_file(self, file_path: str) -> pd.DataFrame:
         """
         Apre un file di testo e restituisce un DataFrame pandas.
@@ -96,23 +166,17 @@ class TextFileOpener(FileOpenerStrategy):
             Il contenuto del file di testo come DataFrame pandas.
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.readlines()
-            # Controlla se è un file di testo csv (comma o tab-separated)
-            first_line = content[0]
-            if ',' in first_line:
-                delimiter = ','
-            elif '\t' in first_line:
-                delimiter = '\t'
-            else:
-                delimiter = ' '  # default spazio bianco se non viene trovato un delimitatore
-            df = pd.read_csv(io.StringIO(''.join(content)), delimiter=delimiter)
+            # Il parser legge direttamente dal file: in memoria resta solo il DataFrame
+            df = pd.read_csv(file_path, delimiter=self._read_delimiter(file_path), encoding='utf-8')
             print(f"[TextFileOpener] Opened text file: {file_path}")
             return df
         except Exception as e:
             print(f"[TextFileOpener] Failed to open text file: {file_path} - {e}")
             return None
 
+    def open_chunks(self, file_path: str, chunksize: int):
+        return pd.read_csv(file_path, delimiter=self._read_delimiter(file_path), chunksize=chunksize, encoding='utf-8')
+
 class TSVFileOpener(FileOpenerStrategy):
     """
     Classe che implementa il parser per i file TSV.
@@ -139,10 +203,313 @@ class TSVFileOpener(FileOpenerStrategy):
             print(f"[TSVFileOpener] Failed to open TSV file: {file_path} - {e}")
             return None
 
+    def open_chunks(self, file_path: str, chunksize: int):
+        return pd.read_csv(file_path, sep='\t', chunksize=chunksize)
+
+class _JSONStream:
+    """
+    Lettore incrementale di valori JSON: il file viene letto a blocchi e ogni valore
+    viene decodificato con json.JSONDecoder.raw_decode, senza caricare tutto il documento.
+    """
+    WHITESPACE = re.compile(r'\s*')
+
+    def __init__(self, file, block_size: int = 1024 ** 2):
+        self.file = file
+        self.block_size = block_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        # Posizione da conservare nel buffer per tornare indietro dopo aver guardato avanti
+        self.mark = None
+
+    def _read(self, size: int = None) -> bool:
+        """
+        Aggiunge un blocco al buffer scartando la parte già consumata; restituisce False a fine file.
+        """
+        if self.eof:
+            return False
+        block = self.file.read(size or self.block_size)
+        if not block:
+            self.eof = True
+            return False
+        cut = self.pos if self.mark is None else min(self.pos, self.mark)
+        self.buffer = self.buffer[cut:] + block
+        self.pos -= cut
+        if self.mark is not None:
+            self.mark -= cut
+        return True
+
+    def peek(self) -> str:
+        """
+        Restituisce il prossimo carattere non di spaziatura senza consumarlo ('' a fine file).
+        """
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._read():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        """
+        Consuma il prossimo carattere, che deve essere uno di quelli specificati.
+        """
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"JSON non valido: atteso uno tra {chars!r}, trovato {char!r}.")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Decodifica il prossimo valore JSON, leggendo altri blocchi se il buffer non lo contiene tutto.
+        """
+        self.peek()
+        size = self.block_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Blocchi di dimensione crescente: un valore grande viene ridecodificato poche volte
+                if not self._read(size):
+                    raise
+                size *= 2
+                continue
+            # Un numero alla fine del buffer potrebbe continuare nel blocco successivo
+            if end == len(self.buffer) and self._read(size):
+                continue
+            self.pos = end
+            return value
+
+    def items(self, closing: str = None):
+        """
+        Genera i valori di un array JSON (separati da virgole, fino a closing) o, se closing
+        è None, di una sequenza di valori separati da spazi come nel formato JSON Lines.
+
+        Il caso comune, un valore interamente contenuto nel buffer, è decodificato senza
+        chiamate intermedie; ai bordi del buffer si passa a value ed expect.
+        """
+        # scan_once è lo scanner in C usato internamente da raw_decode
+        decode, skip = self.decoder.scan_once, self.WHITESPACE.match
+        while True:
+            buffer = self.buffer
+            start = skip(buffer, self.pos).end()
+            try:
+                value, end = decode(buffer, start)
+                following = skip(buffer, end).end()
+                if following == len(buffer) and not self.eof:
+                    raise IndexError
+                separator = buffer[following] if closing is not None else None
+            except (StopIteration, json.JSONDecodeError, IndexError):
+                # Valore o separatore a cavallo di due blocchi
+                self.pos = start
+                if closing is None and self.peek() == '':
+                    return
+                value = self.value()
+                separator = self.expect(',' + closing) if closing is not None else None
+                yield value
+                if closing is not None and separator == closing:
+                    return
+                continue
+            if closing is None:
+                self.pos = following
+            else:
+                if separator not in (',', closing):
+                    raise ValueError(f"JSON non valido: atteso uno tra {',' + closing!r}, trovato {separator!r}.")
+                self.pos = following + 1
+            yield value
+            if closing is not None and separator == closing:
+                return
+
 class JSONFileOpener(FileOpenerStrategy):
     """
     Classe che implementa il parser per i file JSON.
     """
+    # Numero di record convertiti in colonne alla volta dal lettore compatto
+    CHUNK_RECORDS = 10000
+
+    def __init__(self, compact: bool = False, chunk_records: int = CHUNK_RECORDS, lines: bool = False):
+        """
+        Inizializza il parser.
+
+        Parametri:
+        ----------
+        compact : bool, optional
+            Se True il file viene letto in streaming (array di record, JSON Lines o formato
+            a colonne) e le colonne vengono convertite in tipi compatti durante la lettura
+            (default è False, lettura con json.load).
+        chunk_records : int, optional
+            Numero di record accumulati prima di convertirli in colonne (default è 10000).
+        lines : bool, optional
+            Se True il file è sempre letto come sequenza di record JSON Lines, senza
+            riconoscerne il formato (default è False).
+        """
+        self.compact = compact
+        self.chunk_records = chunk_records
+        self.lines = lines
+
+    @staticmethod
+    def _integral_to_int(column: pd.Series) -> pd.Series:
+        """
+        Converte in intero una colonna float senza NaN i cui valori sono tutti interi.
+        """
+        values = column.to_numpy()
+        if len(values) and not np.isnan(values).any() and np.all(values == np.round(values)) \
+                and np.abs(values).max() < 2 ** 53:
+            return column.astype(np.int64)
+        return column
+
+    @classmethod
+    def compact_numeric(cls, column: pd.Series) -> pd.Series:
+        """
+        Riduce una colonna numerica al tipo più piccolo che ne rappresenta esattamente i valori:
+        interi del minor numero di bit, float32 se la conversione non perde precisione.
+
+        Parametri:
+        ----------
+        column : pd.Series
+            Colonna numerica.
+
+        return:
+        --------
+        pd.Series:
+            La colonna con il tipo compatto.
+        """
+        if column.dtype.kind == 'f':
+            column = cls._integral_to_int(column)
+        if column.dtype.kind in 'iu':
+            return pd.to_numeric(column, downcast='integer')
+        if column.dtype == np.float64:
+            as_float32 = column.astype(np.float32)
+            values, restored = column.to_numpy(), as_float32.to_numpy(dtype=np.float64)
+            if np.array_equal(values, restored, equal_nan=True):
+                return as_float32
+        return column
+
+    @staticmethod
+    def _column_piece(values: pd.Series) -> tuple:
+        """
+        Converte i valori di una colonna di un blocco: array numerico se tutti i valori sono
+        numerici (come pd.to_numeric), altrimenti Categorical dei valori originali.
+        """
+        try:
+            numeric = pd.to_numeric(values)
+        except (ValueError, TypeError):
+            numeric = None
+        if numeric is not None and values.dtype != object:
+            return numeric.to_numpy(), None
+        raw = values.to_numpy(dtype=object)
+        try:
+            raw = pd.Categorical(raw)
+        except TypeError:
+            # Valori non hashable (liste o oggetti annidati): restano un array object
+            pass
+        return (None if numeric is None else numeric.to_numpy()), raw
+
+    @classmethod
+    def _assemble_column(cls, pieces: list) -> pd.Series:
+        """
+        Unisce i pezzi di una colonna letti nei vari blocchi e ne sceglie il tipo compatto:
+        numerico se tutti i pezzi sono numerici, category se la colonna contiene solo testo
+        non numerico, altrimenti object come nella lettura standard (anche per liste e oggetti annidati).
+        """
+        if all(numeric is not None for numeric, _ in pieces):
+            return cls.compact_numeric(pd.Series(np.concatenate([numeric for numeric, _ in pieces])))
+        values = np.concatenate([np.asarray(raw, dtype=object) if raw is not None else numeric.astype(object)
+                                 for numeric, raw in pieces])
+        column = pd.Series(values, dtype=object)
+        present = column.dropna()
+        is_text = present.map(type).eq(str).all()
+        # Solo il testo senza valori numerici diventa category: le stringhe numeriche (anche con
+        # la virgola decimale) restano object per le conversioni di DataPreprocessing
+        if is_text and pd.to_numeric(present.str.replace(',', '.', regex=False), errors='coerce').isna().all():
+            return column.astype('category')
+        return column
+
+    def _records_frame(self, stream: _JSONStream, array: bool) -> pd.DataFrame:
+        """
+        Legge un array di record o una sequenza di record JSON Lines, convertendo in colonne
+        un blocco di chunk_records record alla volta.
+        """
+        columns, lengths, batch = {}, [], []
+
+        def flush():
+            frame = pd.DataFrame.from_records(batch)
+            for name in frame.columns:
+                if name not in columns:
+                    # Colonna nuova: nei blocchi precedenti vale NaN
+                    columns[name] = [(np.full(length, np.nan), None) for length in lengths]
+            for name, pieces in columns.items():
+                pieces.append(self._column_piece(frame[name]) if name in frame.columns
+                              else (np.full(len(frame), np.nan), None))
+            lengths.append(len(frame))
+            batch.clear()
+
+        if array:
+            stream.expect('[')
+            if stream.peek() == ']':
+                stream.expect(']')
+                return pd.DataFrame()
+        for record in stream.items(']' if array else None):
+            if not isinstance(record, dict):
+                raise ValueError("Ogni record JSON deve essere un oggetto.")
+            batch.append(record)
+            if len(batch) == self.chunk_records:
+                flush()
+        if batch:
+            flush()
+        return pd.DataFrame({name: self._assemble_column(pieces) for name, pieces in columns.items()})
+
+    def _columns_frame(self, stream: _JSONStream) -> pd.DataFrame:
+        """
+        Legge un oggetto JSON a colonne ({"colonna": [valori]} o {"colonna": {indice: valore}}),
+        convertendo una colonna alla volta. Restituisce None se il file non ha questo formato:
+        un valore che non è una lista o un oggetto, oppure altro contenuto dopo l'oggetto
+        (es. un file JSON Lines il cui primo record inizia con un campo lista).
+        """
+        columns = {}
+        stream.expect('{')
+        if stream.peek() == '}':
+            stream.expect('}')
+            return pd.DataFrame() if stream.peek() == '' else None
+        while True:
+            name = stream.value()
+            stream.expect(':')
+            if stream.peek() not in ('[', '{'):
+                return None
+            values = pd.Series(stream.value())
+            column = self._assemble_column([self._column_piece(values)])
+            column.index = values.index
+            columns[name] = column
+            if stream.expect(',}') == '}':
+                return pd.DataFrame(columns) if stream.peek() == '' else None
+
+    def _open_compact(self, file_path: str) -> pd.DataFrame:
+        """
+        Legge il file JSON in streaming riconoscendo il formato dal primo valore.
+        """
+        with open(file_path, 'r', encoding='utf-8') as file:
+            stream = _JSONStream(file)
+            if self.lines:
+                return self._records_frame(stream, array=False)
+            first = stream.peek()
+            if first == '[':
+                return self._records_frame(stream, array=True)
+            if first != '{':
+                raise ValueError("Il file JSON deve contenere un array di record o un oggetto.")
+            # Il file è nel formato a colonne solo se tutti i valori dell'oggetto sono liste o
+            # oggetti e l'oggetto termina il file; altrimenti si torna all'inizio e lo si legge
+            # come sequenza di record JSON Lines
+            stream.mark = stream.pos
+            try:
+                df = self._columns_frame(stream)
+            except ValueError:
+                df = None
+            if df is not None:
+                stream.mark = None
+                return df
+            stream.pos, stream.mark = stream.mark, None
+            return self._records_frame(stream, array=False)
+
     def open_file(self, file_path: str) -> pd.DataFrame:
         """
         Apre un file JSON e restituisce un DataFrame pandas.
@@ -158,6 +525,10 @@ class JSONFileOpener(FileOpenerStrategy):
             Il contenuto del file JSON come DataFrame pandas.
         """
         try:
+            if self.compact:
+                df = self._open_compact(file_path)
+                print(f"[JSONFileOpener] Opened JSON file: {file_path}")
+                return df
             with open(file_path, 'r', encoding='utf-8') as file:
                 data = json.load(file)
             print(f"[JSONFileOpener] Opened JSON file: {file_path}")
@@ -167,7 +538,7 @@ class JSONFileOpener(FileOpenerStrategy):
                 try:
                     df[column] = pd.to_numeric(df[column])
                     if df[column].dtype == 'float64':
-                        df[column].astype('int64', copy=False)
+                        df[column] = self._integral_to_int(df[column])
                 except (ValueError, TypeError):
                     pass  # Lascia la colonna invariata se non può essere convertita
             return df
@@ -175,11 +546,171 @@ class JSONFileOpener(FileOpenerStrategy):
             print(f"[JSONFileOpener] Failed to open JSON file: {file_path} - {e}")
             return None
 
+class DataFrameCache:
+    """
+    Cache su disco dei DataFrame già letti, per non ripetere il parsing dei file sorgente.
+
+    Ogni voce è identificata da percorso, data di modifica e dimensione del file sorgente e
+    contiene il DataFrame serializzato con pickle protocollo 5: i dati delle colonne sono
+    salvati come buffer out-of-band e riletti senza passare dalla deserializzazione oggetto
+    per oggetto. Quando la directory supera max_bytes vengono eliminate le voci usate meno
+    di recente.
+    """
+    EXTENSION = '.pkl5'
+    # Allineamento dei buffer nel file, per ricostruire array NumPy allineati
+    ALIGNMENT = 64
+
+    def __init__(self, directory: str = '.cache', max_bytes: int = 1024 ** 3):
+        """
+        Inizializza la cache.
+
+        Parametri:
+        ----------
+        directory : str, optional
+            La directory in cui salvare le voci della cache (default è '.cache').
+        max_bytes : int, optional
+            La dimensione massima complessiva delle voci in byte (default è 1 GiB).
+        """
+        if not isinstance(max_bytes, int) or max_bytes <= 0:
+            raise ValueError("Il valore di max_bytes deve essere un intero positivo.")
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, file_path: str, variant: str = '') -> str:
+        """
+        Restituisce il percorso della voce della cache per il file sorgente nel suo stato attuale;
+        variant distingue letture dello stesso file con opzioni diverse.
+        """
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}|{variant}"
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + self.EXTENSION)
+
+    def _padding(self, offset: int) -> int:
+        return -offset % self.ALIGNMENT
+
+    def get(self, file_path: str, variant: str = '') -> pd.DataFrame:
+        """
+        Restituisce il DataFrame in cache per il file specificato, se presente e aggiornato.
+
+        Parametri:
+        ----------
+        file_path : str
+            Il percorso del file sorgente.
+        variant : str, optional
+            Le opzioni di lettura del file (default è '').
+
+        return:
+        --------
+        pd.DataFrame:
+            Il DataFrame in cache, oppure None se la voce non esiste o non è leggibile.
+        """
+        entry = self._entry_path(file_path, variant)
+        try:
+            with open(entry, 'rb') as file:
+                data = bytearray(file.read())
+            view = memoryview(data)
+            n_buffers = int.from_bytes(view[:8], 'little')
+            if 8 * (n_buffers + 2) > len(data):
+                raise ValueError("Intestazione della voce non valida.")
+            lengths = [int.from_bytes(view[8 * (i + 1):8 * (i + 2)], 'little') for i in range(n_buffers + 1)]
+            offset = 8 * (n_buffers + 2)
+            offset += self._padding(offset)
+            chunks = []
+            for length in lengths:
+                chunks.append(view[offset:offset + length])
+                offset += length + self._padding(offset + length)
+            df = pickle.loads(chunks[0], buffers=chunks[1:])
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Voce corrotta o scritta da una versione incompatibile: viene scartata
+            self._remove(entry)
+            return None
+        # Aggiorna la data di ultimo utilizzo per la politica di eliminazione
+        os.utime(entry)
+        return df
+
+    def put(self, file_path: str, df: pd.DataFrame, variant: str = ''):
+        """
+        Salva il DataFrame letto dal file specificato e, se necessario, elimina le voci
+        usate meno di recente.
+
+        Parametri:
+        ----------
+        file_path : str
+            Il percorso del file sorgente.
+        df : pd.DataFrame
+            Il DataFrame da salvare.
+        variant : str, optional
+            Le opzioni di lettura del file (default è '').
+        """
+        buffers = []
+        header = pickle.dumps(df, protocol=5, buffer_callback=buffers.append)
+        chunks = [memoryview(header)] + [buffer.raw() for buffer in buffers]
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self._entry_path(file_path, variant)
+        temporary = f"{entry}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as file:
+            prefix = (len(chunks) - 1).to_bytes(8, 'little')
+            prefix += b''.join(chunk.nbytes.to_bytes(8, 'little') for chunk in chunks)
+            file.write(prefix + b'\0' * self._padding(len(prefix)))
+            for chunk in chunks:
+                file.write(chunk)
+                file.write(b'\0' * self._padding(file.tell()))
+        # La sostituzione atomica evita che altri processi leggano una voce incompleta
+        os.replace(temporary, entry)
+        self._evict()
+
+    def _remove(self, entry: str):
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """
+        Elimina le voci usate meno di recente finché la cache non rientra in max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.EXTENSION):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime_ns, stat.st_size, os.path.join(self.directory, name)))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(entry)
+            total -= size
+
+    def clear(self):
+        """
+        Elimina tutte le voci della cache.
+        """
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(self.EXTENSION):
+                    self._remove(os.path.join(self.directory, name))
+
 class FileOpener:
     """
     Classe che gestisce l'apertura dei file restituendo la strategia appropriata
     in base all'estensione del file.
     """
+    def __init__(self, cache: DataFrameCache = None, compact: bool = False):
+        """
+        Inizializza la classe con una cache opzionale dei file già letti.
+
+        Parametri:
+        ----------
+        cache : DataFrameCache, optional
+            La cache da usare in open (default è None, nessuna cache).
+        compact : bool, optional
+            Se True i file JSON vengono letti in streaming con tipi compatti (default è False).
+        """
+        self.cache = cache
+        self.compact = compact
+
     def get_file_opener(self, file_path: str) -> FileOpenerStrategy:
         """
         Restituisce la strategia di apertura file appropriata in base all'estensione del file.
@@ -206,10 +737,14 @@ class FileOpener:
         elif ext == '.tsv':
             return TSVFileOpener()
         elif ext == '.json':
-            return JSONFileOpener()
+            return JSONFileOpener(compact=self.compact)
+        elif ext in ['.jsonl', '.ndjson']:
+            # Il formato JSON Lines è supportato solo dal lettore in streaming
+            return JSONFileOpener(compact=True, lines=True)
         else:
             raise ValueError(f"Nessuna strategia trovata per il file: {file_path}")
 
+    @timed(rows='return')
     def open(self, file_path: str) -> pd.DataFrame:
         """
         Apre il file specificato utilizzando la strategia appropriata e restituisce un DataFrame pandas.
@@ -225,4 +760,34 @@ class FileOpener:
             Il contenuto del file come DataFrame pandas.
         """
         file_opener = self.get_file_opener(file_path)
-        return file_opener.open_file(file_path)
\ No newline at end of file
+        variant = 'compact' if self.compact else ''
+        if self.cache is not None:
+            df = self.cache.get(file_path, variant)
+            if df is not None:
+                print(f"[FileOpener] Opened cached file: {file_path}")
+                return df
+        df = file_opener.open_file(file_path)
+        if self.cache is not None and df is not None:
+            self.cache.put(file_path, df, variant)
+        return df
+
+    def open_chunks(self, file_path: str, chunksize: int):
+        """
+        Legge il file specificato a blocchi di righe usando la strategia appropriata.
+
+        Parametri:
+        ----------
+        file_path : str
+            Il percorso del file da aprire (CSV, TSV o TXT).
+        chunksize : int
+            Il numero di righe di ogni blocco.
+
+        return:
+        --------
+        Iterator[pd.DataFrame]:
+            Un iteratore sui blocchi del file.
+        """
+        if not isinstance(chunksize, int) or chunksize <= 0:
+            raise ValueError("Il valore di chunksize deve essere un intero positivo.")
+        file_opener = self.get_file_opener(file_path)
+        return file_opener.open_chunks(file_path, chunksize)
@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from profiling import timed
 
 class DataPreprocessing:
     """
@@ -14,7 +16,13 @@ class DataPreprocessing:
             Il DataFrame da preprocessare.
         """
         self.df = df
+        # Minimo e massimo di ogni colonna registrati da scale_columns, per applicare
+        # la stessa normalizzazione ai dati di query
+        self.scale_params = {}
+        # Percentuale di valori numerici di ogni colonna calcolata da filter_columns_by_numeric_percentage
+        self.numeric_ratios = None
 
+    @timed(rows='return')
     def set_column_as_index(self, index_col: str) -> pd.DataFrame:
         """
         Imposta la colonna specificata come indice del DataFrame.
@@ -35,6 +43,7 @@ class DataPreprocessing:
             print(f"La colonna '{index_col}' non è stata trovata. L'indice verrà impostato in automatico.")
         return self.df
 
+    @timed(rows='return')
     def drop_nan_target(self, target_column: str) -> pd.DataFrame:
         """
         Rimuove le righe con valori NaN nella colonna target.
@@ -52,6 +61,7 @@ class DataPreprocessing:
         self.df = self.df.dropna(subset=[target_column])
         return self.df
 
+    @timed(rows='return')
     def factorize_target_column(self, target_column: str) -> pd.DataFrame:
         """
         Sostituisce i valori della colonna target con valori numerici.
@@ -69,6 +79,7 @@ class DataPreprocessing:
         self.df[target_column] = pd.factorize(self.df[target_column])[0]
         return self.df
 
+    @timed(rows='return')
     def remove_commas_to_float(self) -> pd.DataFrame:
         """
         Sostituisce le virgole con i punti e converte le colonne in float.
@@ -84,9 +95,45 @@ class DataPreprocessing:
             pass
         return self.df
 
+    def column_numeric_ratios(self) -> pd.Series:
+        """
+        Calcola per ogni colonna la percentuale di valori numerici (int o float, NaN compresi).
+
+        Le colonne con dtype numerico o booleano valgono 1 senza esaminare i valori e quelle
+        composte solo da stringhe (riconosciute con infer_dtype, senza chiamate Python per cella)
+        valgono 0. Per le colonne miste resta un passaggio map(type) su ogni cella, ma il
+        controllo isinstance viene eseguito una sola volta per ogni tipo distinto.
+
+        return:
+        --------
+        pd.Series:
+            La percentuale di valori numerici di ogni colonna.
+        """
+        total_counts = len(self.df)
+        ratios = {}
+        for position in range(self.df.shape[1]):
+            values = self.df.iloc[:, position]
+            if total_counts == 0:
+                ratios[position] = np.nan
+            elif isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biuf':
+                ratios[position] = 1.0
+            else:
+                # Stessa conversione in array NumPy usata da DataFrame.map (anche per i dtype di pandas)
+                cells = values.array.to_numpy()
+                # pd.to_numeric(errors='coerce') conterebbe come numeriche anche stringhe come '5.3'
+                if pd.api.types.infer_dtype(cells, skipna=False) == 'string':
+                    ratios[position] = 0.0
+                    continue
+                codes, types = pd.factorize(pd.Series(cells, dtype=object).map(type))
+                is_numeric = np.array([issubclass(t, (int, float)) for t in types], dtype=bool)
+                ratios[position] = is_numeric[codes].mean()
+        return pd.Series(list(ratios.values()), index=self.df.columns, dtype=np.float64)
+
+    @timed(rows='return')
     def filter_columns_by_numeric_percentage(self, threshold: float = 0.8) -> pd.DataFrame:
         """
         Mantiene solo le colonne con una percentuale di valori numerici maggiore del 'threshold'.
+        Le percentuali calcolate restano disponibili in self.numeric_ratios.
 
         Parametri:
         ----------
@@ -99,13 +146,12 @@ class DataPreprocessing:
             Il DataFrame filtrato con solo le colonne che superano la soglia di valori numerici.
         """
         # Calcolare la percentuale di valori numerici per ogni colonna
-        numeric_counts = self.df.map(lambda x: isinstance(x, (int, float))).sum()
-        total_counts = len(self.df)
-        numeric_percentage = numeric_counts / total_counts
+        self.numeric_ratios = self.column_numeric_ratios()
         # Filtrare le colonne in base alla percentuale di valori numerici
-        self.df = self.df.loc[:, numeric_percentage >= threshold]
+        self.df = self.df.loc[:, (self.numeric_ratios >= threshold).to_numpy()]
         return self.df
 
+    @timed(rows='return')
     def replace_string_with_nan(self) -> pd.DataFrame:
         """
         Sostituisce le stringhe con valori NaN.
@@ -118,9 +164,14 @@ class DataPreprocessing:
         self.df = self.df.apply(pd.to_numeric, errors='coerce')
         return self.df
 
+    @timed(rows='return')
     def replace_nan(self, method_fill_nan: str, target_column: str) -> pd.DataFrame:
         """
-        Sostituisce i valori NaN con la media o la mediana.
+        Sostituisce i valori NaN con la media o la mediana della classe di appartenenza.
+
+        Le statistiche di tutte le colonne che contengono NaN sono calcolate con un unico
+        groupby().agg e i valori mancanti sono riempiti con un'unica operazione allineata;
+        le colonne senza NaN non vengono modificate.
 
         Parametri:
         ----------
@@ -134,26 +185,25 @@ class DataPreprocessing:
         pd.DataFrame:
             Il DataFrame con i valori NaN sostituiti.
         """
-        if method_fill_nan == 'mean':
-            for column in self.df.loc[:, self.df.columns != target_column]:
-                # Raggruppa il DataFrame in base ai valori della colonna target_column
-                # Per ogni gruppo, seleziona la colonna specificata
-                # e riempe i valori mancanti con la media dei valori presenti in quel gruppo
-                self.df[column] = self.df.groupby(target_column)[column].transform(lambda x: x.fillna(x.mean()))
-        elif method_fill_nan == 'median':
-            for column in self.df.loc[:, self.df.columns != target_column]:
-                # Raggruppa il DataFrame in base ai valori della colonna target_column
-                # Per ogni gruppo, seleziona la colonna specificata
-                # e riempe i valori mancanti con la mediana dei valori presenti in quel gruppo
-                self.df[column] = self.df.groupby(target_column)[column].transform(lambda x: x.fillna(x.median()))
-        else:
+        if method_fill_nan not in ('mean', 'median'):
             method_fill_nan = 'mean'
             print("Metodo non valido. Utilizzata 'mean' di default.")
+        features = self.df.loc[:, self.df.columns != target_column]
+        nan_columns = features.columns[features.isna().any().to_numpy()]
+        if len(nan_columns) == 0:
+            return self.df
+        # Righe = classi, colonne = statistiche delle colonne con NaN
+        statistics = self.df.groupby(target_column)[list(nan_columns)].agg(method_fill_nan)
+        # Valori di riempimento allineati riga per riga alla classe di ogni campione
+        fill = statistics.reindex(self.df[target_column]).to_numpy()
+        values = self.df[nan_columns]
+        self.df[nan_columns] = values.where(values.notna(), pd.DataFrame(fill, index=values.index, columns=nan_columns))
         return self.df
 
+    @timed(rows='return')
     def scale_columns(self) -> pd.DataFrame:
         """
-        Normalizza le colonne.
+        Normalizza le colonne e registra in self.scale_params il minimo e il massimo di ognuna.
 
         return:
         --------
@@ -163,9 +213,34 @@ class DataPreprocessing:
         for column in self.df.columns:
             min_val = self.df[column].min()
             max_val = self.df[column].max()
+            self.scale_params[column] = (float(min_val), float(max_val))
             self.df[column] = (self.df[column] - min_val) / (max_val - min_val)
         return self.df
 
+    @timed(rows='return')
+    def compact_dtypes(self, target_column: str) -> pd.DataFrame:
+        """
+        Riduce la memoria del DataFrame preprocessato: le caratteristiche diventano float32
+        (il KNN calcola allora le distanze in float32) e la colonna target, se contiene
+        codici interi, il tipo intero più piccolo che li rappresenta (es. uint8).
+
+        Parametri:
+        ----------
+        target_column : str
+            Il nome della colonna target.
+
+        return:
+        --------
+        pd.DataFrame:
+            Il DataFrame con i tipi compatti.
+        """
+        features = self.df.columns[self.df.columns != target_column]
+        self.df = self.df.astype({column: np.float32 for column in features})
+        target = self.df[target_column].to_numpy()
+        if len(target) and np.all(target == np.round(target)) and target.min() >= 0:
+            self.df[target_column] = target.astype(np.min_scalar_type(int(target.max())))
+        return self.df
+
     def features_and_target(self, target_column: str) -> tuple:
         """
         Separa le features e il target in un DataFrame.
@@ -186,7 +261,8 @@ class DataPreprocessing:
         target = self.df.iloc[:, self.df.columns == target_column]
         return features, target
 
-    def preprocessing(self, index_col: str, target_column: str, method_fill_nan: str) -> pd.DataFrame:
+    @timed(rows='return')
+    def preprocessing(self, index_col: str, target_column: str, method_fill_nan: str, compact: bool = False) -> pd.DataFrame:
         """
         Esegue il preprocessing dei dati.
 
@@ -198,6 +274,8 @@ class DataPreprocessing:
             Il nome della colonna target.
         method_fill_nan : str
             Il metodo per riempire i valori NaN ('mean' o 'median').
+        compact : bool, optional
+            Se True il risultato usa tipi compatti, vedi compact_dtypes (default è False).
 
         return:
         --------
@@ -216,4 +294,6 @@ class DataPreprocessing:
         self.replace_string_with_nan()
         self.replace_nan(method_fill_nan, target_column)
         self.scale_columns()
+        if compact:
+            self.compact_dtypes(target_column)
         return self.df
\ No newline at end of file
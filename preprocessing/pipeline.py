@@ -0,0 +1,392 @@
+import json
+import numpy as np
+import pandas as pd
+from preprocessing.functions import DataPreprocessing
+
+class PreprocessingPipeline:
+    """
+    Preprocessing con interfaccia fit/transform.
+
+    fit calcola una sola volta, sui dati di training, le colonne da mantenere, i valori con cui
+    riempire i NaN (per classe e globali) e i limiti della normalizzazione min-max; transform
+    applica gli stessi parametri a nuovi dati, senza ricalcolare statistiche sui dati di test.
+    """
+    METHODS = ('mean', 'median')
+
+    def __init__(self, target_column: str, index_col: str = None, method_fill_nan: str = 'mean', threshold: float = 0.8):
+        """
+        Inizializza la pipeline con i parametri del preprocessing.
+
+        Parametri:
+        ----------
+        target_column : str
+            Il nome della colonna target.
+        index_col : str, optional
+            Il nome della colonna da impostare come indice (se presente).
+        method_fill_nan : str, optional
+            Il metodo per riempire i valori NaN ('mean' o 'median', default è 'mean').
+        threshold : float, optional
+            La soglia minima della percentuale di valori numerici di una colonna (default è 0.8).
+        """
+        if method_fill_nan not in self.METHODS:
+            print("Metodo non valido. Utilizzata 'mean' di default.")
+            method_fill_nan = 'mean'
+        self.target_column = target_column
+        self.index_col = index_col
+        self.method_fill_nan = method_fill_nan
+        self.threshold = threshold
+        self.columns = None
+
+    @staticmethod
+    def _to_numeric(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converte le colonne in float: le virgole decimali diventano punti e i valori
+        non numerici diventano NaN.
+
+        Parametri:
+        ----------
+        df : pd.DataFrame
+            Il DataFrame da convertire.
+
+        return:
+        --------
+        pd.DataFrame:
+            Il DataFrame con colonne float64.
+        """
+        columns = {}
+        for column in df.columns:
+            values = df[column]
+            if values.dtype == object:
+                # La virgola decimale è sostituita solo nelle celle di testo: una colonna object
+                # di soli numeri (es. interi e float con None) non ha l'accessor .str.
+                # La sostituzione è per posizione, perché l'indice può avere etichette duplicate
+                mask = (values.map(type) == str).to_numpy()
+                if mask.any():
+                    values = values.copy()
+                    values[mask] = values[mask].str.replace(',', '.', regex=False).to_numpy()
+            columns[column] = pd.to_numeric(values, errors='coerce').astype(np.float64)
+        return pd.DataFrame(columns, index=df.index)
+
+    def _set_index(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Imposta la colonna indice, se specificata e presente nel DataFrame.
+        """
+        if self.index_col and self.index_col in df.columns:
+            return df.set_index(self.index_col)
+        return df
+
+    def fit(self, df: pd.DataFrame) -> 'PreprocessingPipeline':
+        """
+        Calcola i parametri del preprocessing sul DataFrame di training.
+
+        Le colonne vengono selezionate con gli stessi passi di DataPreprocessing.preprocessing;
+        i valori di riempimento e i limiti della normalizzazione sono calcolati sulle sole
+        caratteristiche selezionate.
+
+        Parametri:
+        ----------
+        df : pd.DataFrame
+            Il DataFrame di training, con la colonna target.
+
+        return:
+        --------
+        PreprocessingPipeline:
+            L'istanza stessa, con i parametri calcolati.
+        """
+        if self.target_column not in df.columns:
+            raise ValueError("La colonna non è presente del dataset.")
+        preprocessor = DataPreprocessing(self._set_index(df).dropna(subset=[self.target_column]))
+        codes, classes = pd.factorize(preprocessor.df[self.target_column])
+        self.classes = np.asarray(classes)
+        preprocessor.factorize_target_column(self.target_column)
+        preprocessor.remove_commas_to_float()
+        selected = preprocessor.filter_columns_by_numeric_percentage(self.threshold).columns
+        self.columns = [column for column in selected if column != self.target_column]
+
+        features = self._to_numeric(preprocessor.df[self.columns])
+        # Un solo groupby per tutte le colonne: righe = codici delle classi, colonne = caratteristiche
+        self.class_fill = features.groupby(codes).agg(self.method_fill_nan).reindex(range(len(self.classes)))
+        self.global_fill = features.agg(self.method_fill_nan)
+        filled = self._fill(features, codes)
+        self.scale_min = filled.min()
+        self.scale_max = filled.max()
+        return self
+
+    def _check_fitted(self):
+        if self.columns is None:
+            raise ValueError("La pipeline deve essere addestrata con fit prima di transform.")
+
+    def _fill(self, features: pd.DataFrame, codes: np.ndarray = None) -> pd.DataFrame:
+        """
+        Riempie i NaN con i valori della classe di ogni riga (se i codici sono noti)
+        e poi con i valori globali.
+        """
+        if codes is not None:
+            fill = self.class_fill.to_numpy()[codes]
+            features = features.where(features.notna(), pd.DataFrame(fill, index=features.index, columns=features.columns))
+        return features.fillna(self.global_fill)
+
+    def transform_target(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converte la colonna target nei codici interi registrati da fit.
+
+        Parametri:
+        ----------
+        df : pd.DataFrame
+            Il DataFrame con la colonna target.
+
+        return:
+        --------
+        pd.DataFrame:
+            Un DataFrame con la sola colonna target, codificata.
+        """
+        self._check_fitted()
+        df = self._set_index(df)
+        if self.target_column not in df.columns:
+            raise ValueError("La colonna non è presente del dataset.")
+        codes = pd.Index(self.classes).get_indexer(df[self.target_column])
+        if np.any(codes < 0):
+            raise ValueError("La colonna target contiene classi non viste durante fit.")
+        return pd.DataFrame({self.target_column: codes}, index=df.index)
+
+    def transform(self, df: pd.DataFrame, class_fill: bool = False) -> pd.DataFrame:
+        """
+        Applica a nuovi dati i parametri calcolati da fit in un'unica passata vettoriale:
+        selezione delle colonne, conversione numerica, riempimento dei NaN e normalizzazione.
+
+        Parametri:
+        ----------
+        df : pd.DataFrame
+            Il DataFrame da trasformare.
+        class_fill : bool, optional
+            Se True i NaN vengono riempiti con i valori della classe di ogni riga (richiede la
+            colonna target); altrimenti con i valori globali del training set (default è False).
+
+        return:
+        --------
+        pd.DataFrame:
+            Le caratteristiche trasformate, con le colonne nell'ordine registrato da fit.
+        """
+        self._check_fitted()
+        codes = self.transform_target(df)[self.target_column].to_numpy() if class_fill else None
+        df = self._set_index(df)
+        missing = [column for column in self.columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"Colonne mancanti nel dataset: {missing}")
+        features = self._fill(self._to_numeric(df[self.columns]), codes)
+        scale = (self.scale_max - self.scale_min).replace(0, 1)
+        return (features - self.scale_min) / scale
+
+    def fit_transform(self, df: pd.DataFrame) -> tuple:
+        """
+        Esegue fit e trasforma lo stesso DataFrame, scartando le righe senza target e
+        riempiendo i NaN con i valori di classe come DataPreprocessing.preprocessing.
+
+        Parametri:
+        ----------
+        df : pd.DataFrame
+            Il DataFrame di training, con la colonna target.
+
+        return:
+        --------
+        tuple:
+            Una tupla (features, target) di DataFrame.
+        """
+        self.fit(df)
+        df = self._set_index(df).dropna(subset=[self.target_column])
+        return self.transform(df, class_fill=True), self.transform_target(df)
+
+    def fit_chunks(self, chunks) -> 'PreprocessingPipeline':
+        """
+        Calcola i parametri del preprocessing in una sola passata su un file letto a blocchi
+        (es. FileOpener.open_chunks), tenendo in memoria un solo blocco alla volta.
+
+        Per ogni colonna vengono accumulati i conteggi dei valori numerici, le somme e i
+        conteggi per classe e i minimi/massimi osservati: alla fine si ottengono gli stessi
+        valori di riempimento e limiti di normalizzazione di fit. La mediana richiede tutti
+        i valori e non è supportata. La selezione delle colonne usa gli stessi passi di fit,
+        applicati però a ogni blocco (la conversione in float di remove_commas_to_float
+        riesce o fallisce blocco per blocco).
+
+        Parametri:
+        ----------
+        chunks : Iterable[pd.DataFrame]
+            I blocchi del DataFrame di training, con la colonna target.
+
+        return:
+        --------
+        PreprocessingPipeline:
+            L'istanza stessa, con i parametri calcolati; self.n_rows contiene il numero di
+            righe con target valido.
+        """
+        if self.method_fill_nan != 'mean':
+            raise ValueError("La lettura a blocchi supporta solo il riempimento con la media.")
+        classes = pd.Index([])
+        numeric_counts, totals = None, 0
+        sums = counts = minimums = maximums = has_nan = None
+        for chunk in chunks:
+            if self.target_column not in chunk.columns:
+                raise ValueError("La colonna non è presente del dataset.")
+            chunk = self._set_index(chunk).dropna(subset=[self.target_column])
+            new_classes = pd.Index(pd.unique(chunk[self.target_column])).difference(classes, sort=False)
+            classes = classes.append(new_classes)
+            codes = classes.get_indexer(chunk[self.target_column])
+            preprocessor = DataPreprocessing(chunk.drop(columns=self.target_column))
+            preprocessor.remove_commas_to_float()
+            ratios = preprocessor.column_numeric_ratios().fillna(0)
+            numeric_counts = ratios * len(chunk) if numeric_counts is None else numeric_counts.add(ratios * len(chunk), fill_value=0)
+            totals += len(chunk)
+
+            # Statistiche per classe di tutte le colonne (la selezione è nota solo alla fine)
+            features = self._to_numeric(chunk.drop(columns=self.target_column))
+            grouped = features.groupby(codes)
+            rows = range(len(classes))
+            chunk_stats = [grouped.sum().reindex(rows), grouped.count().reindex(rows), grouped.min().reindex(rows),
+                           grouped.max().reindex(rows), features.isna().groupby(codes).any().reindex(rows, fill_value=False)]
+            if sums is None:
+                sums, counts, minimums, maximums, has_nan = chunk_stats
+            else:
+                sums = sums.reindex(rows).add(chunk_stats[0], fill_value=0)
+                counts = counts.reindex(rows).add(chunk_stats[1], fill_value=0)
+                minimums = minimums.reindex(rows).combine(chunk_stats[2], np.fmin)
+                maximums = maximums.reindex(rows).combine(chunk_stats[3], np.fmax)
+                has_nan = has_nan.reindex(rows, fill_value=False) | chunk_stats[4]
+        if numeric_counts is None or totals == 0:
+            raise ValueError("Il dataset non contiene righe con la colonna target valorizzata.")
+
+        self.classes = np.asarray(classes)
+        self.n_rows = totals
+        self.columns = [column for column in numeric_counts.index if numeric_counts[column] / totals >= self.threshold]
+        sums, counts = sums[self.columns].fillna(0), counts[self.columns].fillna(0)
+        self.class_fill = sums / counts.where(counts > 0)
+        self.global_fill = sums.sum() / counts.sum().where(counts.sum() > 0)
+        # Valore effettivamente usato per i NaN di ogni classe: quello di classe, altrimenti quello globale
+        used_fill = self.class_fill.fillna(self.global_fill).where(has_nan[self.columns])
+        self.scale_min = pd.concat([minimums[self.columns], used_fill]).min()
+        self.scale_max = pd.concat([maximums[self.columns], used_fill]).max()
+        return self
+
+    def transform_to_npy(self, chunks, features_path: str, labels_path: str = None, class_fill: bool = True,
+                         dtype=np.float64) -> tuple:
+        """
+        Trasforma un file letto a blocchi scrivendo le caratteristiche in un file .npy
+        preallocato su disco, così la memoria occupata resta limitata a un blocco.
+
+        Il file può essere riaperto con np.load(features_path, mmap_mode='r') e passato
+        direttamente a KNNClassifier.fit.
+
+        Parametri:
+        ----------
+        chunks : Iterable[pd.DataFrame]
+            I blocchi del DataFrame, con le stesse righe usate da fit_chunks.
+        features_path : str
+            Il percorso del file .npy delle caratteristiche.
+        labels_path : str, optional
+            Il percorso del file .npy dei codici della colonna target (se None non viene scritto).
+        class_fill : bool, optional
+            Se True i NaN vengono riempiti con i valori della classe di ogni riga (default è True).
+        dtype : optional
+            Il tipo delle caratteristiche salvate (default è np.float64).
+
+        return:
+        --------
+        tuple:
+            Una tupla (features, labels) di array mappati in memoria (labels è None se
+            labels_path non è specificato).
+        """
+        self._check_fitted()
+        n_rows = getattr(self, 'n_rows', None)
+        if n_rows is None:
+            raise ValueError("Il numero di righe è noto solo dopo fit_chunks.")
+        features = np.lib.format.open_memmap(features_path, mode='w+', dtype=dtype, shape=(n_rows, len(self.columns)))
+        labels = None
+        if labels_path is not None:
+            labels = np.lib.format.open_memmap(labels_path, mode='w+', dtype=np.int64, shape=(n_rows,))
+        start = 0
+        for chunk in chunks:
+            chunk = self._set_index(chunk).dropna(subset=[self.target_column])
+            end = start + len(chunk)
+            if end > n_rows:
+                raise ValueError("I blocchi contengono più righe di quelle viste da fit_chunks.")
+            features[start:end] = self.transform(chunk, class_fill=class_fill).to_numpy(dtype=dtype)
+            if labels is not None:
+                labels[start:end] = self.transform_target(chunk)[self.target_column].to_numpy()
+            start = end
+        if start != n_rows:
+            raise ValueError("I blocchi contengono meno righe di quelle viste da fit_chunks.")
+        features.flush()
+        if labels is not None:
+            labels.flush()
+        return features, labels
+
+    @property
+    def scale_params(self) -> dict:
+        """
+        Limiti della normalizzazione nel formato di DataPreprocessing.scale_params,
+        da passare a KNNClassifier.save.
+        """
+        self._check_fitted()
+        return {column: (float(self.scale_min[column]), float(self.scale_max[column])) for column in self.columns}
+
+    def to_dict(self) -> dict:
+        """
+        Restituisce i parametri della pipeline come dizionario serializzabile in JSON.
+        """
+        self._check_fitted()
+        return {
+            'target_column': self.target_column,
+            'index_col': self.index_col,
+            'method_fill_nan': self.method_fill_nan,
+            'threshold': self.threshold,
+            'columns': self.columns,
+            'classes': self.classes.tolist(),
+            'class_fill': self.class_fill.to_numpy().tolist(),
+            'global_fill': self.global_fill.tolist(),
+            'scale_min': self.scale_min.tolist(),
+            'scale_max': self.scale_max.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, params: dict) -> 'PreprocessingPipeline':
+        """
+        Ricostruisce una pipeline addestrata dai parametri restituiti da to_dict.
+        """
+        pipeline = cls(params['target_column'], params['index_col'], params['method_fill_nan'], params['threshold'])
+        pipeline.columns = params['columns']
+        pipeline.classes = np.asarray(params['classes'])
+        pipeline.class_fill = pd.DataFrame(np.array(params['class_fill'], dtype=np.float64).reshape(-1, len(pipeline.columns)),
+                                           columns=pipeline.columns)
+        for name in ('global_fill', 'scale_min', 'scale_max'):
+            setattr(pipeline, name, pd.Series(params[name], index=pipeline.columns, dtype=np.float64))
+        return pipeline
+
+    def save(self, file_path: str):
+        """
+        Salva la pipeline in un file JSON, ad esempio nella stessa directory del modello
+        salvato con KNNClassifier.save.
+
+        Parametri:
+        ----------
+        file_path : str
+            Il percorso del file JSON.
+        """
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'PreprocessingPipeline':
+        """
+        Carica una pipeline salvata con save.
+
+        Parametri:
+        ----------
+        file_path : str
+            Il percorso del file JSON.
+
+        return:
+        --------
+        PreprocessingPipeline:
+            La pipeline addestrata.
+        """
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return cls.from_dict(json.load(file))
@@ -0,0 +1,218 @@
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+import inspect
+import json
+import os
+import time
+import pandas as pd
+
+# Profiler attivo; con None la strumentazione si riduce a un controllo per chiamata
+_active = None
+# Contesto vuoto riutilizzato da stage() quando la profilazione è disattivata
+_NULL_STAGE = nullcontext()
+
+class Profiler:
+    """
+    Raccoglie tempo di esecuzione, numero di chiamate e righe elaborate di ogni fase.
+
+    Le fasi annidate (es. KNNClassifier.kneighbors dentro KNNClassifier.predict) sono misurate
+    ciascuna per intero, quindi i tempi del riepilogo sono inclusivi.
+    """
+    def __init__(self):
+        # nome fase -> [chiamate, secondi, righe]
+        self.stats = {}
+        # Eventi nell'ordine di completamento, per la traccia JSON
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def record(self, name: str, start: float, seconds: float, rows: int = None):
+        """
+        Registra una chiamata completata di una fase.
+
+        Parametri:
+        ----------
+        name : str
+            Nome della fase.
+        start : float
+            Istante di inizio (time.perf_counter).
+        seconds : float
+            Durata della chiamata in secondi.
+        rows : int, optional
+            Righe elaborate dalla chiamata.
+        """
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = [0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] += rows or 0
+        self.events.append((name, start - self.origin, seconds, rows))
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        """
+        Context manager che misura il blocco di codice come una chiamata della fase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, rows)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Riepilogo per fase, ordinato per tempo totale decrescente.
+
+        return:
+        --------
+        pd.DataFrame:
+            Chiamate, secondi totali e medi, righe e righe al secondo di ogni fase.
+        """
+        table = pd.DataFrame.from_dict(self.stats, orient='index', columns=['calls', 'seconds', 'rows'])
+        table.index.name = 'stage'
+        table['mean_seconds'] = table['seconds'] / table['calls']
+        table['rows_per_second'] = (table['rows'] / table['seconds']).where(table['rows'] > 0)
+        return table[['calls', 'seconds', 'mean_seconds', 'rows', 'rows_per_second']].sort_values('seconds', ascending=False)
+
+    def trace(self) -> dict:
+        """
+        Traccia degli eventi nel formato Trace Event (visualizzabile con chrome://tracing o Perfetto).
+
+        return:
+        --------
+        dict:
+            Dizionario {'traceEvents': [...]} con un evento completo ('ph': 'X') per chiamata,
+            tempi in microsecondi e righe elaborate in 'args'.
+        """
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': seconds * 1e6, 'pid': pid, 'tid': 0,
+                   'args': {} if rows is None else {'rows': rows}}
+                  for name, start, seconds, rows in sorted(self.events, key=lambda event: event[1])]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save_trace(self, file_path: str) -> str:
+        """
+        Salva la traccia JSON degli eventi e ne restituisce il percorso.
+        """
+        with open(file_path, 'w') as file:
+            json.dump(self.trace(), file)
+        return file_path
+
+def enable(profiler: Profiler = None) -> Profiler:
+    """
+    Attiva la profilazione e restituisce il profiler che raccoglie le misure.
+    """
+    global _active
+    _active = profiler if profiler is not None else Profiler()
+    return _active
+
+def disable() -> Profiler:
+    """
+    Disattiva la profilazione e restituisce il profiler che era attivo (o None).
+    """
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+@contextmanager
+def profile(profiler: Profiler = None):
+    """
+    Attiva la profilazione per la durata del blocco with, ripristinando poi lo stato precedente.
+
+    Esempio:
+    --------
+    with profiling.profile() as profiler:
+        classification_evaluation.knn_metrics(k, splits, user_choice)
+    print(profiler.summary())
+    """
+    global _active
+    previous = _active
+    profiler = enable(profiler)
+    try:
+        yield profiler
+    finally:
+        _active = previous
+
+def stage(name: str, rows: int = None):
+    """
+    Context manager per misurare un blocco di codice; senza profilazione attiva è un contesto vuoto.
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name, rows)
+
+def _count_rows(value) -> int:
+    """
+    Numero di righe di un argomento: il valore stesso per un intero, altrimenti la lunghezza.
+    """
+    if isinstance(value, int):
+        return value
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+def timed(name: str = None, rows: str = None):
+    """
+    Decoratore che registra ogni chiamata della funzione come una fase del profiler attivo.
+
+    Senza profilazione attiva la funzione viene chiamata direttamente dopo un solo controllo.
+    Per le funzioni generatrici viene misurato solo il tempo speso a produrre gli elementi,
+    non quello del codice che li consuma, e la fase è registrata una volta esaurito il generatore.
+
+    Parametri:
+    ----------
+    name : str, optional
+        Nome della fase. Se None si usa il nome qualificato della funzione (es. 'KNNClassifier.fit').
+    rows : str, optional
+        Argomento da cui ricavare le righe elaborate (la sua lunghezza, o il valore se intero),
+        oppure 'return' per usare il valore restituito.
+    """
+    def decorator(function):
+        stage_name = name or function.__qualname__
+        parameters = list(inspect.signature(function).parameters)
+        position = parameters.index(rows) if rows in parameters else None
+
+        def count(args, kwargs, result=None):
+            if rows == 'return':
+                return _count_rows(result)
+            if rows is None:
+                return None
+            if position is not None and position < len(args):
+                return _count_rows(args[position])
+            return _count_rows(kwargs[rows]) if rows in kwargs else None
+
+        if inspect.isgeneratorfunction(function):
+            @wraps(function)
+            def generator_wrapper(*args, **kwargs):
+                profiler = _active
+                if profiler is None:
+                    return (yield from function(*args, **kwargs))
+                iterator = function(*args, **kwargs)
+                start = time.perf_counter()
+                seconds = 0.0
+                try:
+                    while True:
+                        begin = time.perf_counter()
+                        try:
+                            item = next(iterator)
+                        except StopIteration as stop:
+                            return stop.value
+                        finally:
+                            seconds += time.perf_counter() - begin
+                        yield item
+                finally:
+                    profiler.record(stage_name, start, seconds, count(args, kwargs))
+            return generator_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            profiler.record(stage_name, start, time.perf_counter() - start, count(args, kwargs, result))
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,38 @@
+import unittest
+import json
+import os
+import tempfile
+from benchmark.pipeline import PipelineBenchmark, main
+
+class TestPipelineBenchmark(unittest.TestCase):
+
+    def test_synthetic_dataset(self):
+        # Test che il dataset sintetico abbia le dimensioni richieste e i valori mancanti
+        df = PipelineBenchmark(rows=200, features=4, classes=3, missing=0.1).synthetic_dataset()
+        self.assertEqual(df.shape, (200, 6))
+        self.assertEqual(df['class'].nunique(), 3)
+        self.assertTrue(df.drop(columns=['id', 'class']).isna().any().any())
+
+    def test_run_writes_json_and_compares(self):
+        # Test che ogni fase sia misurata e che il confronto con un'esecuzione precedente sia possibile
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            results = main(['--rows', '200', '--features', '3', '--repeat', '1', '--output', output])
+            with open(output) as file:
+                saved = json.load(file)
+            expected = ['open', 'preprocessing'] + [f'split.{s}' for s in PipelineBenchmark.SPLIT_STRATEGIES] + ['knn', 'metrics', 'results']
+            self.assertEqual(list(saved['stages']), expected)
+            for stage in saved['stages'].values():
+                self.assertGreater(stage['seconds'], 0)
+                self.assertGreater(stage['peak_memory_bytes'], 0)
+            self.assertEqual(saved['config']['rows'], 200)
+            comparison = PipelineBenchmark.compare(results, saved)
+            self.assertEqual(list(comparison.index), expected)
+            self.assertTrue((comparison['time_ratio'] == 1).all())
+
+    def test_invalid_configuration(self):
+        # Test che formati e dimensioni non validi sollevino un errore
+        with self.assertRaises(ValueError):
+            PipelineBenchmark(file_format='parquet')
+        with self.assertRaises(ValueError):
+            PipelineBenchmark(classes=1)
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from preprocessing.data_parser import FileOpener, DataFrameCache
+
+class TestDataFrameCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_directory = os.path.join(self.directory.name, 'cache')
+        self.file_path = os.path.join(self.directory.name, 'data.csv')
+        self.df = pd.DataFrame({'a': [1, 2, 3], 'b': [0.5, np.nan, 1.5], 'c': ['x', 'y', 'z']})
+        self.df.to_csv(self.file_path, index=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_open_uses_cache(self):
+        # La seconda apertura non deve rileggere il file sorgente
+        file_opener = FileOpener(cache=DataFrameCache(self.cache_directory))
+        first = file_opener.open(self.file_path)
+        with patch('pandas.read_csv') as mock_read_csv:
+            second = file_opener.open(self.file_path)
+            mock_read_csv.assert_not_called()
+        pd.testing.assert_frame_equal(first, second)
+        # Il DataFrame restituito dalla cache deve essere modificabile
+        second.loc[0, 'a'] = 10
+
+    def test_modified_file_is_reparsed(self):
+        cache = DataFrameCache(self.cache_directory)
+        cache.put(self.file_path, self.df)
+        pd.DataFrame({'a': [7]}).to_csv(self.file_path, index=False)
+        self.assertIsNone(cache.get(self.file_path))
+
+    def test_corrupted_entry_is_discarded(self):
+        cache = DataFrameCache(self.cache_directory)
+        cache.put(self.file_path, self.df)
+        with open(cache._entry_path(self.file_path), 'wb') as file:
+            file.write(b'corrupted')
+        self.assertIsNone(cache.get(self.file_path))
+        self.assertFalse(os.path.exists(cache._entry_path(self.file_path)))
+
+    def test_eviction_removes_least_recently_used(self):
+        # Con un limite pari a una sola voce resta solo quella scritta per ultima
+        other_path = os.path.join(self.directory.name, 'other.csv')
+        self.df.to_csv(other_path, index=False)
+        cache = DataFrameCache(self.cache_directory)
+        cache.put(self.file_path, self.df)
+        cache.max_bytes = os.path.getsize(cache._entry_path(self.file_path))
+        os.utime(cache._entry_path(self.file_path), ns=(0, 0))
+        cache.put(other_path, self.df)
+        self.assertIsNone(cache.get(self.file_path))
+        pd.testing.assert_frame_equal(cache.get(other_path), self.df)
+
+    def test_invalid_max_bytes(self):
+        with self.assertRaises(ValueError):
+            DataFrameCache(self.cache_directory, max_bytes=0)
@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import cli
+import profiling
+from cli import ExperimentRunner, experiments_from_config, load_config
+
+class TestExperimentRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        labels = rng.integers(0, 2, 60)
+        df = pd.DataFrame(rng.normal(size=(60, 3)) + labels[:, None] * 2, columns=['a', 'b', 'c'])
+        df.insert(0, 'id', np.arange(60))
+        df['target'] = np.where(labels == 1, 'maligno', 'benigno')
+        self.file_path = os.path.join(self.directory.name, 'dataset.csv')
+        df.to_csv(self.file_path, index=False)
+        self.output_dir = os.path.join(self.directory.name, 'results')
+        self.base = {'file': self.file_path, 'target': 'target', 'index': 'id', 'seed': 0}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_experiment_defaults_and_validation(self):
+        # Test che le impostazioni siano completate con i default e che quelle non valide sollevino un errore
+        experiment = ExperimentRunner.experiment({**self.base, 'k': 3, 'metrics': 'Accuracy Rate'})
+        self.assertEqual(experiment['k'], [3])
+        self.assertEqual(experiment['metrics'], ['Accuracy Rate'])
+        self.assertEqual(experiment['name'], '1_holdout')
+        invalid = [{'split': 'leave_one_out'}, {'k': [0]}, {'metrics': ['Precision']}, {'fill': 'mode'},
+                   {'percentage': 1.5}, {'learning_rate': 0.1}, {'target': None}]
+        for settings in invalid:
+            with self.assertRaises(ValueError):
+                ExperimentRunner.experiment({**self.base, **settings})
+
+    def test_config_precedence(self):
+        # Test che le impostazioni dell'esperimento prevalgano su riga di comando e valori comuni
+        config = {'file': 'a.csv', 'k': [1], 'defaults': {'seed': 1, 'split': 'k_fold'},
+                  'experiments': [{'name': 'uno'}, {'name': 'due', 'seed': 3}]}
+        experiments = experiments_from_config(config, {'seed': 2, 'n_jobs': 2})
+        self.assertEqual([e['seed'] for e in experiments], [2, 3])
+        self.assertTrue(all(e['file'] == 'a.csv' and e['split'] == 'k_fold' and e['n_jobs'] == 2 for e in experiments))
+        self.assertEqual(experiments_from_config({'file': 'a.csv'}), [{'file': 'a.csv'}])
+
+    def test_dataset_reused_across_experiments(self):
+        # Test che un dataset sia letto e preprocessato una sola volta per tutti gli esperimenti
+        runner = ExperimentRunner(output_dir=self.output_dir, save_results=False)
+        experiments = [{**self.base, 'name': 'holdout', 'k': [1, 3]},
+                       {**self.base, 'name': 'kfold', 'split': 'stratified_k_fold', 'folds': 3, 'metrics': ['Accuracy Rate']}]
+        with patch.object(runner.file_opener, 'open', wraps=runner.file_opener.open) as mock_open:
+            summary = runner.run(experiments)
+        mock_open.assert_called_once()
+        self.assertEqual(len(runner.datasets), 1)
+        self.assertEqual(list(summary['experiment']), ['holdout', 'holdout', 'kfold'])
+        self.assertEqual(list(summary['k']), [1, 3, 5])
+        self.assertTrue(summary['Accuracy Rate'].between(0, 1).all())
+        with open(os.path.join(self.output_dir, 'summary.json')) as file:
+            self.assertEqual(len(json.load(file)['results']), 3)
+        self.assertEqual(os.listdir(self.output_dir), ['summary.json'])
+
+    def test_single_neighbor_search_for_all_k(self):
+        # Test che i vicini siano cercati una sola volta per split anche con più valori di k
+        runner = ExperimentRunner(output_dir=self.output_dir, save_results=False)
+        with profiling.profile() as profiler:
+            summary = runner.run([{**self.base, 'split': 'k_fold', 'folds': 4, 'k': [1, 3, 5, 7]}])
+        self.assertEqual(list(summary['k']), [1, 3, 5, 7])
+        self.assertEqual(profiler.stats['KNNClassifier.kneighbors'][0], 4)
+
+    def test_main_with_config_and_overrides(self):
+        # Test dell'esecuzione da riga di comando con file di configurazione e salvataggio dei risultati
+        config_path = os.path.join(self.directory.name, 'config.json')
+        with open(config_path, 'w') as file:
+            json.dump({**self.base, 'output_dir': self.output_dir, 'experiments': [{'name': 'bootstrap', 'split': 'bootstrap', 'iterations': 2}]}, file)
+        cache_dir = os.path.join(self.directory.name, 'cache')
+        summary = cli.main(['--config', config_path, '--k', '2', '--metrics', 'all', '--cache-dir', cache_dir])
+        # La cache dei file letti è nella directory indicata, non nella directory corrente
+        self.assertTrue(any(name.endswith('.pkl5') for name in os.listdir(cache_dir)))
+        self.assertEqual(list(summary['k']), [2])
+        self.assertIn('Area Under the Curve', summary.columns)
+        result_dir = os.path.join(self.output_dir, 'bootstrap', 'k2')
+        self.assertTrue(os.path.exists(os.path.join(result_dir, 'metrics_trend.png')))
+        self.assertTrue(os.path.exists(os.path.join(result_dir, 'metrics.xlsx')))
+
+    def test_main_cache_under_output_dir(self):
+        # Test che la cache predefinita sia nella directory dei risultati e che --no-cache la disattivi
+        arguments = ['--file', self.file_path, '--target', 'target', '--index', 'id', '--no-save']
+        cli.main(arguments + ['--output-dir', self.output_dir])
+        self.assertTrue(os.listdir(os.path.join(self.output_dir, '.cache')))
+        other = os.path.join(self.directory.name, 'other')
+        cli.main(arguments + ['--output-dir', other, '--no-cache'])
+        self.assertFalse(os.path.exists(os.path.join(other, '.cache')))
+
+    @unittest.skipIf(cli.yaml is None, "PyYAML non installato")
+    def test_load_yaml_config(self):
+        # Test della lettura di un file di configurazione YAML
+        config_path = os.path.join(self.directory.name, 'config.yaml')
+        with open(config_path, 'w') as file:
+            file.write("file: dataset.csv\nexperiments:\n  - name: uno\n    k: [1, 3]\n")
+        self.assertEqual(load_config(config_path), {'file': 'dataset.csv', 'experiments': [{'name': 'uno', 'k': [1, 3]}]})
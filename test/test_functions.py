@@ -51,6 +51,25 @@ class TestDataPreprocessing(unittest.TestCase):
         df = self.preprocessor.filter_columns_by_numeric_percentage(0.6)
         self.assertGreaterEqual(len(df.columns), 1)  # Almeno una colonna deve essere presente
 
+    def test_column_numeric_ratios(self):
+        '''
+        Testa se le percentuali di valori numerici coincidono con il controllo isinstance cella per cella.
+        '''
+        df = pd.DataFrame({
+            'Mixed': [1, np.int64(2), 'x', None, np.float64(3.5)],
+            'Bool': [True, False, True, None, 1],
+            'Text': ['a', 'b', 'c', 'd', 'e'],
+            'NumericText': ['1', '2.5', '3', '4', '5'],
+            'StringDtype': pd.array(['a', None, 'c', 'd', 'e'], dtype='string'),
+            'Float': [1.0, np.nan, 3.0, 4.0, 5.0],
+            'Nullable': pd.array([1, None, 3, 4, 5], dtype='Int64')
+        })
+        expected = df.map(lambda x: isinstance(x, (int, float))).sum() / len(df)
+        preprocessor = DataPreprocessing(df)
+        filtered = preprocessor.filter_columns_by_numeric_percentage(0.8)
+        pd.testing.assert_series_equal(preprocessor.numeric_ratios, expected.astype(float))
+        self.assertEqual(list(filtered.columns), ['Bool', 'Float', 'Nullable'])
+
     def test_replace_string_with_nan(self):
         '''
         Testa se la funzione replace_string_with_nan mantiene la colonna 'Feature2' dopo la conversione delle stringhe in NaN.
@@ -65,6 +84,24 @@ class TestDataPreprocessing(unittest.TestCase):
         df = self.preprocessor.replace_nan('mean', 'Target')
         self.assertFalse(df.isna().any().any())
 
+    def test_replace_nan_by_class(self):
+        '''
+        Testa i valori di riempimento per classe, le colonne senza NaN e il metodo non valido.
+        '''
+        df = pd.DataFrame({
+            'Feature1': [1.0, np.nan, 3.0, 10.0, np.nan, 30.0],
+            'Feature2': [1, 2, 3, 4, 5, 6],
+            'Target': [0, 0, 0, 1, 1, 1]
+        })
+        median = DataPreprocessing(df.copy()).replace_nan('median', 'Target')
+        self.assertEqual(median['Feature1'].tolist(), [1.0, 2.0, 3.0, 10.0, 20.0, 30.0])
+        self.assertEqual(median['Feature2'].dtype, df['Feature2'].dtype)
+        # Un metodo non valido usa la media
+        invalid = DataPreprocessing(df.copy()).replace_nan('mode', 'Target')
+        mean = DataPreprocessing(df.copy()).replace_nan('mean', 'Target')
+        pd.testing.assert_frame_equal(invalid, mean)
+        self.assertFalse(invalid.isna().any().any())
+
     def test_scale_columns(self):
         '''
         Testa se la funzione scale_columns normalizza correttamente le colonne tra 0 e 1.
@@ -73,6 +110,10 @@ class TestDataPreprocessing(unittest.TestCase):
         for col in df.columns:
             self.assertGreaterEqual(df[col].min(), 0)
             self.assertLessEqual(df[col].max(), 1)
+        # Minimo e massimo registrati per ogni colonna normalizzata
+        self.assertEqual(list(self.preprocessor.scale_params), list(df.columns))
+        for min_val, max_val in self.preprocessor.scale_params.values():
+            self.assertLessEqual(min_val, max_val)
 
     def test_features_and_target(self):
         '''
@@ -92,4 +133,15 @@ class TestDataPreprocessing(unittest.TestCase):
         self.assertIn('Target', df.columns)  # Verifica che la colonna target esista ancora
         for col in df.columns:
             self.assertGreaterEqual(df[col].min(), 0)
-            self.assertLessEqual(df[col].max(), 1)
\ No newline at end of file
+            self.assertLessEqual(df[col].max(), 1)
+
+    def test_compact_dtypes(self):
+        '''
+        Testa se la modalità compatta converte le features in float32 e il target nel più piccolo intero.
+        '''
+        df = DataPreprocessing(self.df.copy()).preprocessing('ID', 'Target', 'mean', compact=True)
+        features = df.drop(columns=['Target'])
+        self.assertTrue((features.dtypes == np.float32).all())
+        self.assertEqual(df['Target'].dtype, np.uint8)
+        full = DataPreprocessing(self.df.copy()).preprocessing('ID', 'Target', 'mean')
+        np.testing.assert_allclose(features.values, full.drop(columns=['Target']).values, rtol=1e-6)
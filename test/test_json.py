@@ -1,7 +1,11 @@
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, mock_open
+import numpy as np
 import pandas as pd
-from preprocessing.data_parser import JSONFileOpener
+from preprocessing.data_parser import FileOpener, JSONFileOpener, _JSONStream
 
 class TestJSONFileOpener(unittest.TestCase):
 
@@ -43,4 +47,73 @@ class TestJSONFileOpener(unittest.TestCase):
 
         # Verifica che open sia stato chiamato
         mock_file.assert_called_once_with(file_path, 'r', encoding='utf-8')
-        mock_json_load.assert_called_once()
\ No newline at end of file
+        mock_json_load.assert_called_once()
+
+class TestCompactJSONFileOpener(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.records = [{'a': i, 'b': i / 2, 'c': 'xyz'[i % 3], 'd': str(i)} for i in range(25)]
+        self.expected = JSONFileOpener().open_file(self._write('records.json', json.dumps(self.records)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, text):
+        file_path = os.path.join(self.directory.name, name)
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return file_path
+
+    def _assert_compact(self, df):
+        # Stessi valori della lettura standard, con tipi compatti
+        pd.testing.assert_frame_equal(df, self.expected, check_dtype=False, check_categorical=False)
+        self.assertEqual(df['a'].dtype, np.int8)
+        self.assertEqual(df['b'].dtype, np.float32)
+        self.assertIsInstance(df['c'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['d'].dtype, np.int8)
+
+    def test_records(self):
+        file_path = self._write('records.json', json.dumps(self.records, indent=1))
+        self._assert_compact(JSONFileOpener(compact=True, chunk_records=4).open_file(file_path))
+
+    def test_json_lines(self):
+        file_path = self._write('records.jsonl', '\n'.join(json.dumps(record) for record in self.records))
+        self._assert_compact(FileOpener().open(file_path))
+
+    def test_json_lines_with_nested_first_field(self):
+        # Un primo campo lista non deve far leggere il file JSON Lines come formato a colonne
+        records = [{'tags': [i, i + 1], 'x': i} for i in range(5)]
+        text = '\n'.join(json.dumps(record) for record in records)
+        for df in (FileOpener().open(self._write('nested.jsonl', text)),
+                   JSONFileOpener(compact=True).open_file(self._write('nested.json', text))):
+            self.assertEqual(df.shape, (5, 2))
+            self.assertEqual(df['x'].tolist(), list(range(5)))
+            self.assertEqual(df['tags'].tolist(), [[i, i + 1] for i in range(5)])
+        # Un solo record il cui valore è una lista è comunque un oggetto a colonne
+        df = JSONFileOpener(compact=True).open_file(self._write('single.json', json.dumps({'x': [1, 2, 3]})))
+        self.assertEqual(df['x'].tolist(), [1, 2, 3])
+
+    def test_columns(self):
+        columns = {key: [record[key] for record in self.records] for key in self.records[0]}
+        self._assert_compact(JSONFileOpener(compact=True).open_file(self._write('columns.json', json.dumps(columns))))
+
+    def test_small_blocks(self):
+        # Valori a cavallo di più blocchi di lettura
+        file_path = self._write('records.json', json.dumps(self.records))
+        with open(file_path, 'r', encoding='utf-8') as file:
+            stream = _JSONStream(file, block_size=7)
+            stream.expect('[')
+            self.assertEqual(list(stream.items(']')), self.records)
+
+    def test_compact_numeric_is_lossless(self):
+        column = pd.Series([0.1, 0.5, np.nan])
+        self.assertEqual(JSONFileOpener.compact_numeric(column).dtype, np.float64)
+        self.assertEqual(JSONFileOpener.compact_numeric(pd.Series([1.0, 300.0])).dtype, np.int16)
+
+    def test_integral_floats_become_int64(self):
+        # La lettura standard converte davvero in int64 le colonne float con valori interi
+        file_path = self._write('floats.json', json.dumps({'a': [1.0, 2.0], 'b': [1.5, None]}))
+        df = JSONFileOpener().open_file(file_path)
+        self.assertEqual(df['a'].dtype, np.int64)
+        self.assertEqual(df['b'].dtype, np.float64)
@@ -1,4 +1,7 @@
 import unittest
+import os
+import tempfile
+import numpy as np
 import pandas as pd
 from model.knn import KNNClassifier
 
@@ -31,4 +34,181 @@ class TestKNNClassifier(unittest.TestCase):
     def test_calculate_confusion_matrix(self):
         # Test della funzione di calcolo della matrice di confusione
         confusion_matrix = self.knn.calculate_confusion_matrix(self.y_true, self.y_pred)
-        self.assertEqual(confusion_matrix, [1, 1, 0, 0])
\ No newline at end of file
+        np.testing.assert_array_equal(confusion_matrix, [[1, 0], [0, 1]])
+
+    def test_calculate_confusion_matrix_float_labels(self):
+        # Test che etichette non intere (target normalizzato) restino classi distinte
+        confusion_matrix = self.knn.calculate_confusion_matrix([0.5, 1.0, 0.0], [0.5, 0.5, 0.0])
+        np.testing.assert_array_equal(confusion_matrix, [[1, 0, 0], [0, 1, 0], [0, 1, 0]])
+        # Etichette intere in float restano i propri codici
+        confusion_matrix = self.knn.calculate_confusion_matrix([1.0, 1.0], [1.0, 0.0])
+        np.testing.assert_array_equal(confusion_matrix, [[0, 0], [1, 1]])
+
+    def test_calculate_confusion_matrix_multiclass(self):
+        # Test della matrice di confusione con più di due classi
+        y_true = np.array([0, 1, 2, 2, 1, 0])
+        y_pred = np.array([0, 2, 2, 1, 1, 0])
+        confusion_matrix = self.knn.calculate_confusion_matrix(y_true, y_pred)
+        np.testing.assert_array_equal(confusion_matrix, [[2, 0, 0], [0, 1, 1], [0, 1, 1]])
+        self.assertEqual(confusion_matrix.sum(), len(y_true))
+
+    def test_knn_matches_reference_loop(self):
+        # Test che il calcolo a blocchi restituisca le stesse predizioni del ciclo punto per punto
+        rng = np.random.default_rng(0)
+        x_train = pd.DataFrame(rng.integers(0, 4, size=(60, 3)).astype(float))
+        y_train = pd.DataFrame(rng.integers(0, 3, size=(60, 1)))
+        x_test = pd.DataFrame(rng.integers(0, 4, size=(25, 3)).astype(float))
+
+        expected = []
+        for test_point in x_test.values:
+            distances = [(self.knn.euclidean_distance(test_point, p), y_train.iloc[i].item())
+                         for i, p in enumerate(x_train.values)]
+            distances.sort(key=lambda x: x[0])
+            class_counts = {}
+            for _, label in distances[:5]:
+                class_counts[label] = class_counts.get(label, 0) + 1
+            expected.append(max(class_counts, key=class_counts.get))
+
+        predictions = KNNClassifier(k=5, chunk_size=7).knn(x_train, y_train, x_test)
+        self.assertEqual(predictions, expected)
+
+    def test_squared_distances(self):
+        # Test della matrice delle distanze al quadrato
+        distances = KNNClassifier.squared_distances(np.array([[1.0, 1.0]]), np.array([[4.0, 5.0], [1.0, 1.0]]))
+        np.testing.assert_allclose(distances, [[25.0, 0.0]])
+
+    def test_nearest_neighbors_ties(self):
+        # Test che a parità di distanza vengano scelti i campioni con indice minore
+        distances = np.array([[3.0, 1.0, 1.0, 0.0, 1.0, 2.0]])
+        nearest = KNNClassifier.nearest_neighbors(distances, 3)
+        np.testing.assert_array_equal(nearest, [[3, 1, 2]])
+
+    def test_majority_vote_tie_breaking(self):
+        # Test che in caso di parità vinca la classe del vicino più vicino
+        codes = np.array([[1, 0, 0, 1], [2, 2, 0, 1]])
+        np.testing.assert_array_equal(KNNClassifier.majority_vote(codes, 3), [1, 2])
+
+    def test_fit_predict_algorithms(self):
+        # Test che tutti gli algoritmi di ricerca producano le stesse predizioni
+        rng = np.random.default_rng(1)
+        x_train = rng.integers(0, 4, size=(200, 3)).astype(float)
+        y_train = rng.integers(0, 2, size=200)
+        x_test = rng.integers(0, 4, size=(50, 3)).astype(float)
+        expected = KNNClassifier(k=5, algorithm='brute').fit(x_train, y_train).predict(x_test)
+        for algorithm in ['kdtree', 'balltree', 'auto']:
+            knn = KNNClassifier(k=5, algorithm=algorithm, leaf_size=10).fit(x_train, y_train)
+            np.testing.assert_array_equal(knn.predict(x_test), expected)
+
+    def test_invalid_algorithm(self):
+        # Test che un algoritmo non valido sollevi un errore
+        with self.assertRaises(ValueError):
+            KNNClassifier(k=3, algorithm='grid')
+
+    def test_predict_without_fit(self):
+        # Test che la predizione senza addestramento sollevi un errore
+        with self.assertRaises(ValueError):
+            KNNClassifier(k=3).predict(self.x_test)
+
+    def test_predict_multi_k(self):
+        # Test che le predizioni per più k coincidano con quelle di classificatori separati
+        rng = np.random.default_rng(2)
+        x_train = rng.random((80, 3))
+        y_train = rng.integers(0, 3, size=80)
+        x_test = rng.random((20, 3))
+        predictions = KNNClassifier(k=1).fit(x_train, y_train).predict_multi_k(x_test, [1, 4, 9])
+        for k in [1, 4, 9]:
+            expected = KNNClassifier(k=k).fit(x_train, y_train).predict(x_test)
+            np.testing.assert_array_equal(predictions[k], expected)
+
+    def test_sample_weight_matches_duplicated_rows(self):
+        # Test che le molteplicità diano le stesse predizioni delle righe duplicate
+        rng = np.random.default_rng(3)
+        x = rng.random((40, 2))
+        y = rng.integers(0, 2, size=40)
+        x_test = rng.random((30, 2))
+        weights = rng.integers(0, 4, size=40)
+        duplicated = np.repeat(np.arange(40), weights)
+        expected = KNNClassifier(k=5).fit(x[duplicated], y[duplicated]).predict(x_test)
+        predictions = KNNClassifier(k=5).fit(x, y, sample_weight=weights).predict(x_test)
+        np.testing.assert_array_equal(predictions, expected)
+
+    def test_invalid_sample_weight(self):
+        # Test che molteplicità negative sollevino un errore
+        with self.assertRaises(ValueError):
+            KNNClassifier(k=3).fit(self.x_train, self.y_train, sample_weight=[1, -1, 1, 1, 1])
+
+    def test_predict_proba(self):
+        # Test che le probabilità siano le frazioni dei voti dei vicini
+        probabilities = self.knn.fit(self.x_train, self.y_train).predict_proba(self.x_test)
+        np.testing.assert_allclose(probabilities, [[2 / 3, 1 / 3], [1 / 3, 2 / 3]])
+        np.testing.assert_allclose(self.knn.positive_scores(probabilities), [1 / 3, 2 / 3])
+
+
+    def test_fit_precomputes_training_state(self):
+        # Test che fit converta una sola volta il training set in matrice contigua, norme e codici
+        knn = KNNClassifier(k=3, dtype=np.float32).fit(self.x_train, self.y_train)
+        self.assertEqual(knn.x_train.dtype, np.float32)
+        self.assertTrue(knn.x_train.flags['C_CONTIGUOUS'])
+        np.testing.assert_allclose(knn.train_sq_norms, (self.x_train.values ** 2).sum(axis=1))
+        np.testing.assert_array_equal(knn.classes[knn.y_codes], self.y_train.values)
+
+    def test_float32_matches_float64(self):
+        # Test che le predizioni in float32 coincidano con quelle in float64 su più blocchi di query
+        rng = np.random.default_rng(1)
+        x_train = rng.normal(size=(200, 4))
+        y_train = rng.integers(0, 3, size=200)
+        knn32 = KNNClassifier(k=5, dtype=np.float32).fit(x_train, y_train)
+        knn64 = KNNClassifier(k=5).fit(x_train, y_train)
+        for _ in range(3):
+            x_test = rng.normal(size=(10, 4))
+            np.testing.assert_array_equal(knn32.predict(x_test), knn64.predict(x_test))
+
+    def test_dtype_inferred_from_training_set(self):
+        # Test che senza dtype esplicito un training set float32 resti in float32 e i codici siano compatti
+        x_train = self.x_train.astype(np.float32)
+        knn = KNNClassifier(k=3).fit(x_train, self.y_train)
+        self.assertEqual(knn.x_train.dtype, np.float32)
+        self.assertEqual(knn.y_codes.dtype, np.uint8)
+        self.assertEqual(KNNClassifier(k=3).fit(self.x_train.astype(int), self.y_train).x_train.dtype, np.float64)
+
+    def test_invalid_dtype_and_columns(self):
+        # Test che dtype non supportati e query con un numero errato di colonne sollevino un errore
+        with self.assertRaises(ValueError):
+            KNNClassifier(k=3, dtype=np.int32)
+        self.knn.fit(self.x_train, self.y_train)
+        with self.assertRaises(ValueError):
+            self.knn.predict(np.ones((2, 3)))
+
+
+    def test_save_and_load_memory_mapped(self):
+        # Test che il modello salvato e ricaricato con mmap_mode='r' dia le stesse predizioni
+        scale_params = {'feature1': (0.0, 10.0), 'feature2': (0.0, 5.0)}
+        self.knn.fit(self.x_train, self.y_train)
+        with tempfile.TemporaryDirectory() as directory:
+            self.knn.save(directory, scale_params)
+            self.assertTrue(os.path.isfile(os.path.join(directory, 'x_train.npy')))
+            loaded = KNNClassifier.load(directory)
+            self.assertIsInstance(loaded.x_train, np.memmap)
+            self.assertEqual(loaded.columns, ['feature1', 'feature2'])
+            self.assertEqual(loaded.scale_params, scale_params)
+            np.testing.assert_array_equal(loaded.predict(self.x_test), self.knn.predict(self.x_test))
+            del loaded
+
+    def test_transform_queries(self):
+        # Test che le query vengano riordinate e normalizzate come il training set
+        self.knn.fit(self.x_train, self.y_train)
+        self.knn.scale_params = {'feature1': (0.0, 10.0), 'feature2': (0.0, 5.0)}
+        queries = pd.DataFrame({'feature2': [5.0], 'extra': [1.0], 'feature1': [5.0]})
+        transformed = self.knn.transform_queries(queries)
+        self.assertEqual(list(transformed.columns), ['feature1', 'feature2'])
+        np.testing.assert_allclose(transformed.values, [[0.5, 1.0]])
+        with self.assertRaises(ValueError):
+            self.knn.transform_queries(queries[['feature1']])
+
+    def test_transform_queries_constant_column(self):
+        # Test che una colonna costante nel training set non produca NaN o infiniti
+        self.knn.fit(self.x_train, self.y_train)
+        self.knn.scale_params = {'feature1': (2.0, 2.0), 'feature2': (0.0, 5.0)}
+        queries = pd.DataFrame({'feature1': [2.0, 3.0], 'feature2': [5.0, 0.0]})
+        transformed = self.knn.transform_queries(queries)
+        np.testing.assert_allclose(transformed.values, [[0.0, 1.0], [1.0, 0.0]])
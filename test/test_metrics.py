@@ -1,5 +1,6 @@
 import unittest
-from metrics_results.metrics import MetricsCalculator
+from unittest.mock import patch
+from metrics_results.metrics import MetricsCalculator, BatchMetricsCalculator
 import numpy as np
 
 class TestMetricsCalculator(unittest.TestCase):
@@ -86,6 +87,13 @@ class TestMetricsCalculator(unittest.TestCase):
         with self.assertRaises(ValueError):
             MetricsCalculator([50, -10, -5, 5], self.ypred, self.ytest)
 
+    def test_no_false_negatives(self):
+        # Uno split senza falsi negativi (sensibilità perfetta) è una matrice valida
+        calculator = MetricsCalculator([50, 40, 10, 0], self.ypred, self.ytest)
+        self.assertEqual(calculator.sensitivity(), 1)
+        self.assertEqual(calculator.miss_rate(), 0)
+        self.assertAlmostEqual(calculator.accuracy_rate(), 0.9)
+
     def test_division_by_zero(self):
         calculator = MetricsCalculator([0, 0, 0, 0], self.ypred, self.ytest)
         with self.assertRaises(ValueError):
@@ -95,4 +103,107 @@ class TestMetricsCalculator(unittest.TestCase):
         with self.assertRaises(ValueError):
             calculator.false_alarm_rate()
         with self.assertRaises(ValueError):
-            calculator.miss_rate()
\ No newline at end of file
+            calculator.miss_rate()
+
+    def test_square_confusion_matrix(self):
+        # La matrice quadrata viene ridotta a [TP, TN, FP, FN] rispetto alla classe 0
+        calculator = MetricsCalculator(np.array([[50, 5], [10, 40]]), self.ypred, self.ytest)
+        self.assertEqual(calculator.confusion_matrix, [50, 40, 10, 5])
+        self.assertAlmostEqual(calculator.accuracy_rate(), self.calculator.accuracy_rate())
+
+    def test_binary_counts_multiclass(self):
+        # Riduzione one-vs-rest di una matrice con tre classi
+        matrix = np.array([[5, 1, 0], [2, 6, 1], [0, 3, 7]])
+        self.assertEqual(MetricsCalculator.binary_counts(matrix, positive=1), [6, 12, 4, 3])
+
+    def test_auc_with_scores(self):
+        # L'AUC calcolata dai punteggi coincide con la probabilità che un positivo abbia punteggio maggiore di un negativo
+        ytest = np.array([1, 0, 1, 1, 0, 0, 1, 0])
+        yscore = np.array([0.9, 0.8, 0.8, 0.6, 0.4, 0.4, 0.2, 0.1])
+        calculator = MetricsCalculator(self.confusion_matrix, (yscore >= 0.5).astype(int), ytest, yscore)
+        pos, neg = yscore[ytest == 1], yscore[ytest == 0]
+        expected = np.mean([(p > n) + 0.5 * (p == n) for p in pos for n in neg])
+        self.assertAlmostEqual(calculator.auc(), expected)
+
+    def test_roc_curve(self):
+        # La curva ROC parte da (0, 0), termina in (1, 1) ed è monotona
+        calculator = MetricsCalculator(self.confusion_matrix, self.ypred, self.ytest, np.array([0.7, 0.2, 0.9, 0.4, 0.6]))
+        fpr, tpr, thresholds = calculator.roc_curve()
+        self.assertEqual((fpr[0], tpr[0]), (0, 0))
+        self.assertEqual((fpr[-1], tpr[-1]), (1, 1))
+        self.assertTrue(np.all(np.diff(fpr) >= 0) and np.all(np.diff(tpr) >= 0))
+        self.assertEqual(len(thresholds), len(fpr))
+
+    def test_calculate_metrics_is_lazy(self):
+        # Le metriche non richieste non vengono calcolate
+        calculator = MetricsCalculator([0, 5, 0, 5], self.ypred, self.ytest)
+        with patch.object(MetricsCalculator, 'roc_curve', side_effect=AssertionError("AUC non richiesta")):
+            metrics = calculator.calculate_metrics(['Accuracy Rate'])
+        self.assertEqual(metrics, {'Accuracy Rate': 0.5})
+
+    def test_metrics_are_memoized(self):
+        # Sensibilità e specificità vengono calcolate una sola volta anche se usate dalla media geometrica
+        calculator = MetricsCalculator(self.confusion_matrix, self.ypred, self.ytest)
+        calculator.calculate_metrics(['Sensitivity', 'Geometric Mean'])
+        self.assertIn('sensitivity', calculator._cache)
+        calculator.tp = 0  # Il valore memorizzato non viene ricalcolato
+        self.assertEqual(calculator.sensitivity(), calculator._cache['sensitivity'])
+
+    def test_register_metric(self):
+        # Una nuova metrica registrata è disponibile in calculate_metrics
+        @MetricsCalculator.register_metric('Precision')
+        def precision(calculator):
+            return calculator.tp / (calculator.tp + calculator.fp)
+        try:
+            metrics = self.calculator.calculate_metrics(['Precision'])
+            self.assertAlmostEqual(metrics['Precision'], 50 / 60)
+        finally:
+            del MetricsCalculator.METRICS['Precision']
+
+
+class TestBatchMetricsCalculator(unittest.TestCase):
+    def setUp(self):
+        self.confusion_matrices = np.array([[50, 40, 10, 5], [30, 20, 5, 15], [10, 60, 20, 10]])
+        self.calculator = BatchMetricsCalculator(self.confusion_matrices)
+        self.metrics = ['Accuracy Rate', 'Error Rate', 'Sensitivity', 'Specificity',
+                        'False Alarm Rate', 'Miss Rate', 'Geometric Mean']
+
+    def test_matches_scalar_calculator(self):
+        # Le metriche vettoriali coincidono con quelle calcolate split per split
+        values = self.calculator.calculate_metrics(self.metrics)
+        for i, confusion_matrix in enumerate(self.confusion_matrices):
+            expected = MetricsCalculator(list(confusion_matrix), None, None).calculate_metrics(self.metrics)
+            for metric in self.metrics:
+                self.assertAlmostEqual(values[metric][i], expected[metric])
+
+    def test_square_matrices(self):
+        # Una pila di matrici quadrate viene ridotta come in MetricsCalculator
+        matrices = np.array([[[50, 5], [10, 40]], [[30, 15], [5, 20]]])
+        values = BatchMetricsCalculator(matrices).calculate_metrics(['Sensitivity'])
+        np.testing.assert_allclose(values['Sensitivity'], [50 / 55, 30 / 45])
+
+    def test_division_by_zero_is_nan(self):
+        # Le metriche non definite valgono NaN invece di sollevare un errore
+        values = BatchMetricsCalculator([[0, 5, 5, 0]]).calculate_metrics(['Sensitivity', 'Specificity'])
+        self.assertTrue(np.isnan(values['Sensitivity'][0]))
+        self.assertAlmostEqual(values['Specificity'][0], 0.5)
+
+    def test_extra_metrics(self):
+        # Le metriche per split calcolate altrove sono restituite insieme alle altre
+        calculator = BatchMetricsCalculator(self.confusion_matrices, {'Area Under the Curve': [0.9, 0.8, 0.7]})
+        values = calculator.calculate_metrics(['Area Under the Curve', 'Accuracy Rate'])
+        np.testing.assert_allclose(values['Area Under the Curve'], [0.9, 0.8, 0.7])
+        with self.assertRaises(ValueError):
+            self.calculator.calculate_metrics(['Area Under the Curve'])
+
+    def test_summary(self):
+        # Il riepilogo contiene media, deviazione standard e intervallo di confidenza
+        summary = self.calculator.summary(['Accuracy Rate'], confidence=0.9)
+        accuracy = self.calculator.accuracy_rate()
+        self.assertAlmostEqual(summary.loc['Accuracy Rate', 'mean'], accuracy.mean())
+        self.assertAlmostEqual(summary.loc['Accuracy Rate', 'std'], accuracy.std())
+        self.assertLessEqual(summary.loc['Accuracy Rate', 'ci_lower'], summary.loc['Accuracy Rate', 'ci_upper'])
+
+    def test_invalid_shape(self):
+        with self.assertRaises(ValueError):
+            BatchMetricsCalculator([[1, 2, 3]])
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from preprocessing.data_parser import FileOpener
+from preprocessing.functions import DataPreprocessing
+from preprocessing.pipeline import PreprocessingPipeline
+
+class TestPreprocessingPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'ID': range(1, 9),
+            'Feature1': [1.0, 2.0, np.nan, 4.0, 5.0, 6.0, np.nan, 8.0],
+            'Feature2': [1.5, 2.5, '5.3', 8.1, 3.3, np.nan, 4.0, 1.2],
+            'Text': ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h'],
+            'Target': ['A', 'B', 'A', 'B', 'A', 'B', np.nan, 'A']
+        })
+        self.pipeline = PreprocessingPipeline('Target', 'ID', 'mean')
+
+    def test_fit_transform_matches_preprocessing(self):
+        # Test che fit_transform produca lo stesso risultato di DataPreprocessing.preprocessing
+        preprocessor = DataPreprocessing(self.df.copy())
+        preprocessor.preprocessing('ID', 'Target', 'mean')
+        expected_x, expected_y = preprocessor.features_and_target('Target')
+        x, y = self.pipeline.fit_transform(self.df)
+        self.assertEqual(list(x.columns), list(expected_x.columns))
+        np.testing.assert_allclose(x.values, expected_x.values)
+        np.testing.assert_array_equal(y.values, expected_y.values)
+
+    def test_numeric_object_column(self):
+        # Test che una colonna object di soli numeri (interi e float con None) sia convertita senza errori
+        df = self.df.copy()
+        df['Numeric'] = pd.Series([1, 2.5, None, 4, 5, 6, 7, 8], dtype=object)
+        preprocessor = DataPreprocessing(df.copy())
+        preprocessor.preprocessing('ID', 'Target', 'mean')
+        expected_x, _ = preprocessor.features_and_target('Target')
+        x, _ = PreprocessingPipeline('Target', 'ID', 'mean').fit_transform(df)
+        self.assertIn('Numeric', x.columns)
+        self.assertEqual(list(x.columns), list(expected_x.columns))
+        np.testing.assert_allclose(x.values, expected_x.values)
+
+    def test_duplicate_index_mixed_column(self):
+        # Test che le virgole decimali siano sostituite per posizione anche con etichette di indice duplicate
+        df = pd.DataFrame({'a': ['1,5', '2,5', np.nan, 4.0]}, index=[7, 7, 8, 8])
+        converted = PreprocessingPipeline._to_numeric(df)
+        np.testing.assert_array_equal(converted['a'].to_numpy(), [1.5, 2.5, np.nan, 4.0])
+        self.assertEqual(list(converted.index), [7, 7, 8, 8])
+        df = self.df.copy()
+        df['ID'] = [1, 1, 2, 2, 3, 3, 4, 4]
+        df['Feature2'] = ['1,5', 2.5, 5.3, 8.1, 3.3, np.nan, 4.0, 1.2]
+        x, _ = PreprocessingPipeline('Target', 'ID', 'mean').fit_transform(df)
+        self.assertIn('Feature2', x.columns)
+        self.assertFalse(x.isna().any().any())
+
+    def test_transform_uses_training_statistics(self):
+        # Test che i nuovi dati siano riempiti e normalizzati con i parametri del training set
+        self.pipeline.fit(self.df)
+        new = pd.DataFrame({'ID': [20, 21], 'Feature1': [np.nan, 8.0], 'Feature2': [1.2, 'x']})
+        x = self.pipeline.transform(new)
+        scale_min, scale_max = self.pipeline.scale_min, self.pipeline.scale_max
+        expected = (self.pipeline.global_fill - scale_min) / (scale_max - scale_min)
+        self.assertAlmostEqual(x.loc[20, 'Feature1'], expected['Feature1'])
+        self.assertAlmostEqual(x.loc[21, 'Feature1'], 1.0)
+        self.assertAlmostEqual(x.loc[21, 'Feature2'], expected['Feature2'])
+        self.assertEqual(list(x.index), [20, 21])
+
+    def test_save_and_load(self):
+        # Test che la pipeline salvata e ricaricata trasformi i dati allo stesso modo
+        self.pipeline.fit(self.df)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'preprocessing.json')
+            self.pipeline.save(file_path)
+            loaded = PreprocessingPipeline.load(file_path)
+        pd.testing.assert_frame_equal(loaded.transform(self.df), self.pipeline.transform(self.df))
+        self.assertEqual(loaded.scale_params, self.pipeline.scale_params)
+
+    def test_invalid_inputs(self):
+        # Test degli errori: pipeline non addestrata, colonne mancanti e classi sconosciute
+        with self.assertRaises(ValueError):
+            self.pipeline.transform(self.df)
+        self.pipeline.fit(self.df)
+        with self.assertRaises(ValueError):
+            self.pipeline.transform(self.df.drop(columns='Feature1'))
+        with self.assertRaises(ValueError):
+            self.pipeline.transform_target(pd.DataFrame({'Target': ['C']}))
+
+    def test_fit_chunks_matches_fit(self):
+        # Test che la lettura a blocchi produca gli stessi parametri e dati di fit_transform
+        df = self.df.drop(columns='Text')
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'data.csv')
+            df.to_csv(file_path, index=False)
+            streaming = PreprocessingPipeline('Target', 'ID').fit_chunks(FileOpener().open_chunks(file_path, 3))
+            expected = PreprocessingPipeline('Target', 'ID').fit(pd.read_csv(file_path))
+            self.assertEqual(streaming.columns, expected.columns)
+            self.assertEqual(streaming.n_rows, 7)
+            pd.testing.assert_frame_equal(streaming.class_fill, expected.class_fill, check_names=False)
+            pd.testing.assert_series_equal(streaming.scale_min, expected.scale_min)
+            pd.testing.assert_series_equal(streaming.scale_max, expected.scale_max)
+
+            features, labels = streaming.transform_to_npy(FileOpener().open_chunks(file_path, 3),
+                                                          os.path.join(directory, 'x.npy'),
+                                                          os.path.join(directory, 'y.npy'))
+            expected_x, expected_y = expected.fit_transform(pd.read_csv(file_path))
+            np.testing.assert_allclose(np.load(os.path.join(directory, 'x.npy'), mmap_mode='r'), expected_x.values)
+            np.testing.assert_array_equal(labels, expected_y.values.ravel())
+            del features, labels
+
+    def test_fit_chunks_median_not_supported(self):
+        with self.assertRaises(ValueError):
+            PreprocessingPipeline('Target', method_fill_nan='median').fit_chunks([self.df])
@@ -0,0 +1,80 @@
+import unittest
+import json
+import os
+import tempfile
+import numpy as np
+import profiling
+from profiling import Profiler, timed
+from evaluation.split import Split
+from model.knn import KNNClassifier
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x_train = rng.random((30, 3))
+        self.y_train = rng.integers(0, 2, 30)
+        self.x_test = rng.random((8, 3))
+
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_records_nothing(self):
+        # Test che senza profilazione attiva le funzioni strumentate non registrino nulla
+        profiler = Profiler()
+        KNNClassifier(k=3).fit(self.x_train, self.y_train).predict(self.x_test)
+        self.assertEqual(profiler.stats, {})
+        self.assertIsNone(profiling.disable())
+
+    def test_knn_stages(self):
+        # Test che chiamate e righe di fit e kneighbors siano registrate
+        with profiling.profile() as profiler:
+            knn = KNNClassifier(k=3).fit(self.x_train, self.y_train)
+            knn.predict(self.x_test)
+            knn.predict(self.x_test)
+        self.assertEqual(profiler.stats['KNNClassifier.fit'][0], 1)
+        self.assertEqual(profiler.stats['KNNClassifier.fit'][2], 30)
+        self.assertEqual(profiler.stats['KNNClassifier.kneighbors'][0], 2)
+        self.assertEqual(profiler.stats['KNNClassifier.kneighbors'][2], 16)
+        summary = profiler.summary()
+        self.assertEqual(summary.loc['KNNClassifier.kneighbors', 'calls'], 2)
+        self.assertTrue((summary['seconds'] >= 0).all())
+        self.assertIsNone(profiling._active)
+
+    def test_generator_timed_once_exhausted(self):
+        # Test che un generatore di split sia registrato una sola volta, a generatore esaurito
+        with profiling.profile() as profiler:
+            splits = Split(folds=3, seed=0).k_fold_indices(12)
+            self.assertNotIn('Split.k_fold_indices', profiler.stats)
+            self.assertEqual(len(list(splits)), 3)
+        self.assertEqual(profiler.stats['Split.k_fold_indices'][0::2], [1, 12])
+
+    def test_stage_and_timed(self):
+        # Test del context manager stage, del decoratore con rows='return' e del ripristino del profiler precedente
+        @timed(name='doppio', rows='return')
+        def doppio(values):
+            return values * 2
+
+        outer = profiling.enable()
+        with profiling.profile() as inner:
+            with profiling.stage('blocco', rows=5):
+                doppio([1, 2])
+        self.assertIs(profiling._active, outer)
+        self.assertEqual(inner.stats['blocco'][0::2], [1, 5])
+        self.assertEqual(inner.stats['doppio'][0::2], [1, 4])
+        self.assertEqual(outer.stats, {})
+        self.assertIs(profiling.disable(), outer)
+        # Senza profilazione attiva stage restituisce sempre lo stesso contesto vuoto
+        self.assertIs(profiling.stage('blocco'), profiling.stage('altro'))
+
+    def test_save_trace(self):
+        # Test che la traccia JSON contenga un evento completo per chiamata
+        with profiling.profile() as profiler:
+            KNNClassifier(k=3).fit(self.x_train, self.y_train).predict(self.x_test)
+        with tempfile.TemporaryDirectory() as directory:
+            with open(profiler.save_trace(os.path.join(directory, 'trace.json'))) as file:
+                trace = json.load(file)
+        names = [event['name'] for event in trace['traceEvents']]
+        self.assertIn('KNNClassifier.kneighbors', names)
+        self.assertEqual(len(names), len(profiler.events))
+        self.assertTrue(all(event['ph'] == 'X' and event['dur'] >= 0 for event in trace['traceEvents']))
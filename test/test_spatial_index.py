@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+from model.knn import KNNClassifier
+from model.spatial_index import KDTree, BallTree
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        # Valori interi per avere distanze esatte e molti pareggi
+        rng = np.random.default_rng(0)
+        self.points = rng.integers(0, 5, size=(300, 3)).astype(float)
+        self.queries = rng.integers(0, 5, size=(40, 3)).astype(float)
+        distances = KNNClassifier.squared_distances(self.queries, self.points)
+        self.expected = KNNClassifier.nearest_neighbors(distances, 6)
+
+    def test_kdtree_query(self):
+        # Test che il KD-tree restituisca gli stessi vicini della ricerca esaustiva
+        distances, indices = KDTree(self.points, leaf_size=8).query(self.queries, 6)
+        np.testing.assert_array_equal(indices, self.expected)
+        self.assertTrue(np.all(np.diff(distances, axis=1) >= 0))
+
+    def test_balltree_query(self):
+        # Test che il ball-tree restituisca gli stessi vicini della ricerca esaustiva
+        _, indices = BallTree(self.points, leaf_size=8).query(self.queries, 6)
+        np.testing.assert_array_equal(indices, self.expected)
+
+    def test_k_greater_than_samples(self):
+        # Test che con k maggiore del numero di punti vengano restituiti tutti i punti
+        _, indices = KDTree(self.points[:4]).query(self.queries[:2], 10)
+        self.assertEqual(indices.shape, (2, 4))
+
+    def test_invalid_leaf_size(self):
+        # Test che un leaf_size non valido sollevi un errore
+        with self.assertRaises(ValueError):
+            KDTree(self.points, leaf_size=0)
@@ -73,4 +73,98 @@ class TestSplit(unittest.TestCase):
             splits = splitter.bootstrap(self.X, self.Y)
             for X_train, Y_train, X_test, Y_test in splits:
                 self.assertEqual(len(X_train), int(len(self.X) * perc))
-                self.assertTrue(len(X_test) > 0)
\ No newline at end of file
+                self.assertTrue(len(X_test) > 0)
+
+    def test_bootstrap_indices_generator(self):
+        """Verifica che bootstrap_indices generi coppie di indici coerenti con bootstrap."""
+        np.random.seed(0)
+        splits = self.splitter.bootstrap(self.X, self.Y)
+        np.random.seed(0)
+        index_splits = self.splitter.bootstrap_indices(len(self.X))
+        self.assertFalse(isinstance(index_splits, list))  # Gli split sono generati in modo pigro
+        for (X_train, _, X_test, _), (train, test) in zip(splits, index_splits):
+            pd.testing.assert_frame_equal(X_train, self.X.iloc[train])
+            pd.testing.assert_frame_equal(X_test, self.X.iloc[test])
+
+    def test_random_subsampling_indices(self):
+        """Verifica che random_subsampling_indices generi indici di train e test disgiunti."""
+        index_splits = list(self.splitter.random_subsampling_indices(len(self.X)))
+        self.assertEqual(len(index_splits), 3)
+        for train, test in index_splits:
+            self.assertEqual(len(test), 20)
+            self.assertFalse(set(train) & set(test))
+
+    def test_k_fold(self):
+        """Verifica che k-fold usi ogni campione come test esattamente una volta."""
+        splitter = Split(folds=4, seed=0)
+        splits = splitter.k_fold(self.X, self.Y)
+        self.assertEqual(len(splits), 4)
+        test_indices = np.concatenate([X_test.index for _, _, X_test, _ in splits])
+        self.assertEqual(sorted(test_indices), list(self.X.index))
+        for X_train, _, X_test, _ in splits:
+            self.assertEqual(len(X_train) + len(X_test), 100)
+            self.assertFalse(set(X_train.index) & set(X_test.index))
+
+    def test_stratified_k_fold(self):
+        """Verifica che ogni fold stratificato mantenga le proporzioni delle classi."""
+        Y = pd.DataFrame({'Label': [0] * 80 + [1] * 20})
+        splits = Split(folds=5, seed=1).stratified_k_fold(self.X, Y)
+        for _, _, _, Y_test in splits:
+            self.assertEqual(len(Y_test), 20)
+            self.assertEqual(int(Y_test['Label'].sum()), 4)
+
+    def test_stratified_holdout(self):
+        """Verifica che l'holdout stratificato destini al test la stessa percentuale di ogni classe."""
+        Y = pd.DataFrame({'Label': [0] * 70 + [1] * 30})
+        X_train, Y_train, X_test, Y_test = Split(percentage=0.2, seed=2).stratified_holdout(self.X, Y)[0]
+        self.assertEqual(len(X_test), 20)
+        self.assertEqual(int(Y_test['Label'].sum()), 6)
+        self.assertFalse(set(X_train.index) & set(X_test.index))
+
+    def test_seed_reproducibility(self):
+        """Verifica che a parità di seme gli split siano identici, indipendentemente da np.random."""
+        first = list(Split(percentage=0.2, iterations=3, seed=7).bootstrap_indices(100))
+        np.random.seed(123)
+        second = list(Split(percentage=0.2, iterations=3, seed=7).bootstrap_indices(100))
+        for (train_a, test_a), (train_b, test_b) in zip(first, second):
+            np.testing.assert_array_equal(train_a, train_b)
+            np.testing.assert_array_equal(test_a, test_b)
+        # Ogni iterazione usa un seme figlio diverso
+        self.assertFalse(np.array_equal(first[0][0], first[1][0]))
+
+    def test_seed_reproducible_across_calls(self):
+        """Verifica che chiamare due volte lo stesso metodo di uno splitter con seme dia gli stessi split."""
+        Y = pd.DataFrame({'Label': np.tile([0, 1], 25)})
+        splitter = Split(percentage=0.2, iterations=3, folds=5, seed=11)
+        for method, argument in [('holdout_indices', 50), ('random_subsampling_indices', 50), ('bootstrap_indices', 50),
+                                 ('k_fold_indices', 50), ('stratified_k_fold_indices', Y), ('stratified_holdout_indices', Y)]:
+            first = list(getattr(splitter, method)(argument))
+            second = list(getattr(splitter, method)(argument))
+            for (train_a, test_a), (train_b, test_b) in zip(first, second):
+                np.testing.assert_array_equal(train_a, train_b)
+                np.testing.assert_array_equal(test_a, test_b)
+        np.testing.assert_array_equal(splitter.bootstrap_counts(50), splitter.bootstrap_counts(50))
+
+    def test_invalid_folds(self):
+        """Verifica che un numero di fold non valido sollevi un errore."""
+        with self.assertRaises(ValueError):
+            list(Split(folds=1).k_fold_indices(10))
+
+    def test_bootstrap_batch_indices(self):
+        """Verifica che il bootstrap vettoriale coincida con quello iterativo."""
+        np.random.seed(5)
+        expected = list(self.splitter.bootstrap_indices(100))
+        np.random.seed(5)
+        train_indices, oob_masks = self.splitter.bootstrap_batch_indices(100)
+        self.assertEqual(train_indices.shape, (3, 20))
+        for (train, test), batch_train, oob in zip(expected, train_indices, oob_masks):
+            np.testing.assert_array_equal(batch_train, train)
+            np.testing.assert_array_equal(np.flatnonzero(oob), test)
+
+    def test_weighted_bootstrap_indices(self):
+        """Verifica che le molteplicità del bootstrap pesato sommino alla dimensione del training set."""
+        for train, test, weights in Split(percentage=0.5, iterations=4, seed=3).weighted_bootstrap_indices(60):
+            self.assertEqual(weights.sum(), 30)
+            self.assertTrue(np.all(weights > 0))
+            self.assertFalse(set(train) & set(test))
+            self.assertEqual(len(train) + len(test), 60)
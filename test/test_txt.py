@@ -40,4 +40,24 @@ class TestTextFileOpener(unittest.TestCase):
         self.assertIsNone(result)
 
         # Verifica che read_csv sia stato chiamato con i dati corretti
-        mock_read_csv.assert_called_once()
\ No newline at end of file
+        mock_read_csv.assert_called_once()
+
+    @patch('builtins.open', new_callable=mock_open, read_data="col1;col2\n1;3\n2;4\n")
+    @patch('pandas.read_csv')
+    def test_open_file_reads_from_path(self, mock_read_csv, mock_open_file):
+        # Il file viene letto dal parser direttamente dal percorso, con il delimitatore riconosciuto
+        self.file_opener.open_file("test.txt")
+        mock_read_csv.assert_called_once_with("test.txt", delimiter=';', encoding='utf-8')
+        mock_open_file().read.assert_called_once_with(TextFileOpener.SAMPLE_BYTES)
+
+    def test_detect_delimiter(self):
+        samples = {
+            'a,b\n1,2\n': ',',
+            'a\tb\n1\t2\n': '\t',
+            'a;b;c\n1;"x;y";3\n': ';',
+            'a|b\n1|2\n': '|',
+            '"x, y"\tz\n"1, 2"\t3\n': '\t',
+            'a b\n1 2\n': ' ',
+        }
+        for sample, delimiter in samples.items():
+            self.assertEqual(TextFileOpener.detect_delimiter(sample), delimiter)
@@ -1,6 +1,7 @@
 import unittest
 import numpy as np
 from model.utility import classification_evaluation
+from evaluation.split import Split
 import pandas as pd
 
 class TestClassificationEvaluation(unittest.TestCase):
@@ -66,4 +67,85 @@ class TestClassificationEvaluation(unittest.TestCase):
     def test_knn_metrics_handles_empty_splits(self):
         empty_splits = []
         result = classification_evaluation.knn_metrics(self.k, empty_splits, self.user_choice)
-        self.assertEqual(result, {})
\ No newline at end of file
+        self.assertEqual(result, {})
+
+    def test_knn_metrics_multi_k(self):
+        """Verifica che la tabella multi-k abbia una riga per ogni k e una colonna per ogni metrica."""
+        table = classification_evaluation.knn_metrics_multi_k([1, 3, 5], self.splits, self.user_choice)
+        self.assertEqual(list(table.index), [1, 3, 5])
+        self.assertEqual(list(table.columns), self.user_choice)
+        self.assertTrue(((table >= 0) & (table <= 1)).all().all())
+
+    def test_knn_metrics_parallel_matches_serial(self):
+        """Verifica che l'esecuzione parallela degli split restituisca gli stessi risultati di quella seriale."""
+        X = pd.DataFrame(np.random.rand(40, 3))
+        Y = pd.DataFrame(np.random.randint(0, 2, (40, 1)))
+        splits = Split(percentage=0.8, iterations=4, seed=0).bootstrap(X, Y)
+        serial = classification_evaluation.knn_metrics(self.k, splits, self.user_choice, output_dir=None)
+        parallel = classification_evaluation.knn_metrics(self.k, splits, self.user_choice, n_jobs=2, output_dir=None)
+        self.assertEqual(serial, parallel)
+        # La memoria condivisa contiene ogni riga una sola volta, non le righe di ogni split
+        features, labels, index_splits = classification_evaluation._shared_index_splits(splits)
+        self.assertLessEqual(len(features), len(X))
+        for (xtrain, ytrain, xtest, ytest), (train, test) in zip(splits, index_splits):
+            np.testing.assert_array_equal(features[train], xtrain.values)
+            np.testing.assert_array_equal(labels[test], ytest.values.ravel())
+
+    def test_knn_metrics_parallel_independent_splits(self):
+        """Verifica che split non estratti da un unico DataFrame non siano accettati in parallelo."""
+        with self.assertRaises(ValueError):
+            classification_evaluation.knn_metrics(self.k, self.splits, self.user_choice, n_jobs=2, output_dir=None)
+
+    def test_knn_metrics_invalid_n_jobs(self):
+        """Verifica che un valore non valido di n_jobs sollevi un errore."""
+        with self.assertRaises(ValueError):
+            classification_evaluation.knn_metrics(self.k, self.splits, self.user_choice, n_jobs=0)
+
+    def test_knn_metrics_indices_matches_splits(self):
+        """Verifica che la valutazione su indici coincida con quella sugli split materializzati."""
+        X = pd.DataFrame(np.random.rand(40, 3))
+        Y = pd.DataFrame(np.random.randint(0, 2, (40, 1)))
+        index_splits = [(np.arange(0, 30), np.arange(30, 40)), (np.arange(10, 40), np.arange(0, 10))]
+        splits = [(X.iloc[train], Y.iloc[train], X.iloc[test], Y.iloc[test]) for train, test in index_splits]
+        expected = classification_evaluation.knn_metrics(self.k, splits, self.user_choice, output_dir=None)
+        result = classification_evaluation.knn_metrics_indices(self.k, X, Y, iter(index_splits), self.user_choice, output_dir=None)
+        self.assertEqual(result, expected)
+        parallel = classification_evaluation.knn_metrics_indices(self.k, X, Y, iter(index_splits), self.user_choice, n_jobs=2, output_dir=None)
+        self.assertEqual(parallel, expected)
+
+    def test_knn_metrics_weighted_bootstrap(self):
+        """Verifica che il bootstrap pesato sia valutato sia in serie sia in parallelo."""
+        X = pd.DataFrame(np.random.rand(50, 3))
+        Y = pd.DataFrame(np.random.randint(0, 2, (50, 1)))
+        splitter = Split(percentage=0.8, iterations=3, seed=0)
+        serial = classification_evaluation.knn_metrics_indices(self.k, X, Y, splitter.weighted_bootstrap_indices(50), ['Accuracy Rate'], output_dir=None)
+        splitter = Split(percentage=0.8, iterations=3, seed=0)
+        parallel = classification_evaluation.knn_metrics_indices(self.k, X, Y, splitter.weighted_bootstrap_indices(50), ['Accuracy Rate'], n_jobs=2, output_dir=None)
+        self.assertEqual(serial, parallel)
+        self.assertGreaterEqual(serial['Accuracy Rate'], 0)
+        self.assertLessEqual(serial['Accuracy Rate'], 1)
+
+    def test_knn_metrics_multi_k_indices(self):
+        """Verifica che la valutazione multi-k coincida con una valutazione separata per ogni k."""
+        X = pd.DataFrame(np.random.rand(40, 3))
+        Y = pd.DataFrame(np.random.randint(0, 2, (40, 1)))
+        index_splits = list(Split(folds=4, seed=0).k_fold_indices(40))
+        expected = {k: classification_evaluation.knn_metrics_indices(k, X, Y, index_splits, self.user_choice, output_dir=None)
+                    for k in (1, 3, 5)}
+        result = classification_evaluation.knn_metrics_multi_k_indices([1, 3, 5], X, Y, index_splits, self.user_choice, output_dir=None)
+        self.assertEqual(result, expected)
+        parallel = classification_evaluation.knn_metrics_multi_k_indices([1, 3, 5], X, Y, iter(index_splits), self.user_choice, n_jobs=2, output_dir=None)
+        self.assertEqual(parallel, expected)
+        with self.assertRaises(ValueError):
+            classification_evaluation.knn_metrics_multi_k_indices([0], X, Y, index_splits, self.user_choice)
+
+    def test_compact_accuracy_check(self):
+        """Verifica che le predizioni in float32 coincidano con quelle in float64."""
+        X = pd.DataFrame(np.random.rand(60, 3))
+        Y = pd.DataFrame(np.random.randint(0, 2, (60, 1)))
+        index_splits = Split(folds=3, seed=0).k_fold_indices(60)
+        result = classification_evaluation.compact_accuracy_check(self.k, X, Y, index_splits)
+        self.assertEqual(result['Agreement'], 1.0)
+        self.assertEqual(result['Accuracy float32'], result['Accuracy float64'])
+        with self.assertRaises(ValueError):
+            classification_evaluation.compact_accuracy_check(self.k, X, Y, [])